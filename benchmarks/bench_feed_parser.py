@@ -0,0 +1,77 @@
+"""
+Micro-benchmark: streaming bounded parser vs. BeautifulSoup full DOM
+
+Each fixture in benchmarks/fixtures is inflated to a large full-content
+feed by repeating its items, then parsed with both paths keeping only the
+first 10 items.
+
+Usage:
+    python benchmarks/bench_feed_parser.py [--items 500] [--repeat 5] [extra_feed.xml ...]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from feed_parser import parse_feed, parse_feed_soup
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+ITEM_PATTERN = re.compile(rb'<(item|entry)\b.*?</\1>', re.S)
+
+
+def inflate(content, target_items):
+    """Repeat the fixture's items until the document has `target_items` items"""
+    items = [m.group(0) for m in ITEM_PATTERN.finditer(content)]
+    if not items or len(items) >= target_items:
+        return content
+
+    last = list(ITEM_PATTERN.finditer(content))[-1]
+    body = b''.join(items[i % len(items)] for i in range(target_items))
+    first = ITEM_PATTERN.search(content)
+    return content[:first.start()] + body + content[last.end():]
+
+
+def best_of(func, content, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(content)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=500, help='items per inflated feed')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement (best is reported)')
+    parser.add_argument('feeds', nargs='*', help='extra recorded feeds to benchmark')
+    args = parser.parse_args()
+
+    paths = sorted(
+        os.path.join(FIXTURES_DIR, name) for name in os.listdir(FIXTURES_DIR) if name.endswith('.xml')
+    ) + args.feeds
+
+    print(f"{'fixture':<28}{'size':>10}{'soup (ms)':>12}{'stream (ms)':>14}{'speedup':>10}")
+    for path in paths:
+        with open(path, 'rb') as f:
+            content = inflate(f.read(), args.items)
+
+        soup_time, soup_items = best_of(parse_feed_soup, content, args.repeat)
+        stream_time, stream_items = best_of(parse_feed, content, args.repeat)
+
+        if [i['title'] for i in soup_items] != [i['title'] for i in stream_items]:
+            print(f"WARNING: {os.path.basename(path)} parsers disagree on titles")
+
+        print(
+            f"{os.path.basename(path):<28}{len(content) / 1024:>8.0f}KB"
+            f"{soup_time * 1000:>12.1f}{stream_time * 1000:>14.2f}{soup_time / stream_time:>9.0f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
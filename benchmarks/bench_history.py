@@ -0,0 +1,90 @@
+"""
+Micro-benchmark: HistoryManager dedup cost as history grows
+
+For each history size, a batch of fetched items (half already sent) is run
+through main.filter_new_items. The indexed lookup should stay flat while the
+old linear scan grows with the history.
+
+Usage:
+    python benchmarks/bench_history.py [--sizes 1000,10000,100000,200000] [--batch 1000] [--backend json|sqlite]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from history import HistoryManager
+
+# 线性扫描只在较小的历史规模上测量，否则单次运行要数分钟
+LINEAR_MAX_SIZE = 20000
+
+
+def make_item(i):
+    return {
+        'title': f"Item {i}",
+        'url': f"https://example.com/articles/{i}",
+        'guid': f"guid-{i}",
+        'timestamp': '2025-01-01T00:00:00'
+    }
+
+
+def build_history(size, path, backend):
+    manager = HistoryManager(path, max_items=size, backend=backend)
+    for i in range(size):
+        manager.add(make_item(i))
+    manager.save_history()
+    return manager
+
+
+def indexed_dedup(manager, items):
+    return [item for item in items if not manager.is_sent(item['url'], item.get('guid'))]
+
+
+def linear_dedup(manager, items):
+    # 改造前的 is_sent：逐条比较 URL
+    return [item for item in items if not any(h.url == item['url'] for h in manager.store.records)]
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000,100000,200000', help='comma-separated history sizes')
+    parser.add_argument('--batch', type=int, default=1000, help='fetched items per run')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement (best is reported)')
+    parser.add_argument('--backend', default='json', choices=('json', 'sqlite'), help='history storage backend')
+    args = parser.parse_args()
+
+    print(f"{'history':>10}{'build (s)':>12}{'indexed (ms)':>15}{'linear (ms)':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(s) for s in args.sizes.split(',')):
+            start = time.perf_counter()
+            manager = build_history(size, os.path.join(tmp, f"history_{size}.{args.backend}"), args.backend)
+            build_time = time.perf_counter() - start
+
+            # 一半已发送（取自历史末尾），一半是新条目
+            half = args.batch // 2
+            items = [make_item(size - 1 - i) for i in range(half)] + [make_item(size + i) for i in range(half)]
+
+            indexed = best_of(lambda: indexed_dedup(manager, items), args.repeat)
+            assert len(indexed_dedup(manager, items)) == args.batch - half
+            linear = '-'
+            if args.backend == 'json' and size <= LINEAR_MAX_SIZE:
+                linear = f"{best_of(lambda: linear_dedup(manager, items), 1) * 1000:.1f}"
+
+            print(f"{size:>10}{build_time:>12.2f}{indexed * 1000:>15.2f}{linear:>14}")
+            manager.close()
+
+
+if __name__ == '__main__':
+    main()
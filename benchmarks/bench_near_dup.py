@@ -0,0 +1,75 @@
+"""
+Micro-benchmark: near-duplicate title lookup vs. window size
+
+Fills the NearDuplicateIndex window with N synthetic titles and times
+contains() for a batch of incoming titles (half near-duplicates of window
+titles, half new). LSH lookups should stay roughly flat as N grows; the
+pairwise baseline (Jaccard against every window title) grows linearly.
+
+Usage:
+    python benchmarks/bench_near_dup.py [--sizes 1000,5000,20000] [--queries 500]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from near_dup import NearDuplicateIndex, normalize_title, shingles
+
+WORDS = [
+    '央行', '宣布', '降准', '科技', '公司', '发布', '新款', '手机', '市场', '回应', '网友', '热议', '官方',
+    '通报', '事件', '最新', '进展', '股价', '大涨', '跌停', '比赛', '夺冠', '演唱会', '门票', '售罄', '高温',
+    '预警', '台风', '登陆', '地铁', '开通', '芯片', '出口', '管制', '新能源', '汽车', '销量', '创新高'
+]
+
+
+def make_title(rng):
+    return ''.join(rng.choice(WORDS) for _ in range(rng.randint(5, 9)))
+
+
+def perturb(title, rng):
+    """Same headline, slightly different wording: drop one character and add punctuation"""
+    i = rng.randrange(len(title))
+    return f"【热】{title[:i]}{title[i + 1:]}！"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,5000,20000', help='window sizes (comma separated)')
+    parser.add_argument('--queries', type=int, default=500, help='incoming titles per measurement')
+    args = parser.parse_args()
+
+    print(f"{'window':>8}{'LSH us/title':>15}{'pairwise us/title':>20}{'recall':>9}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        rng = random.Random(size)
+        titles = [make_title(rng) for _ in range(size)]
+        index = NearDuplicateIndex()
+        for title in titles:
+            index.add({'title': title}, 'bench')
+
+        dups = [perturb(rng.choice(titles), rng) for _ in range(args.queries // 2)]
+        fresh = [make_title(rng) for _ in range(args.queries - len(dups))]
+
+        start = time.perf_counter()
+        found = sum(index.contains(title) for title in dups)
+        for title in fresh:
+            index.contains(title)
+        lsh = (time.perf_counter() - start) / args.queries
+
+        # 基线：与窗口内每个标题逐一计算 Jaccard（只测一小批，按条折算）
+        window_sets = [shingles(normalize_title(title), 2) for title in titles]
+        sample = (dups + fresh)[:20]
+        start = time.perf_counter()
+        for title in sample:
+            query = shingles(normalize_title(title), 2)
+            max(len(query & s) / len(query | s) for s in window_sets)
+        pairwise = (time.perf_counter() - start) / len(sample)
+
+        print(f"{size:>8}{lsh * 1e6:>15.0f}{pairwise * 1e6:>20.0f}{found / len(dups):>9.1%}")
+
+
+if __name__ == '__main__':
+    main()
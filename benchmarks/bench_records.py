@@ -0,0 +1,82 @@
+"""
+Micro-benchmark: dict history records vs. HistoryRecord
+
+Compares memory per record (tracemalloc) and the cost of a 24h time-window
+filter: the old path parses an ISO timestamp per record, the new one
+compares integer epoch seconds.
+
+Usage:
+    python benchmarks/bench_records.py [--records 100000] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from records import HistoryRecord
+
+PLATFORMS = ['B站', '36氪', '少数派', 'IT之家', '华尔街见闻']
+
+
+def make_dicts(count):
+    now = datetime.now()
+    return [
+        {
+            'title': f"Item {i}",
+            'url': f"https://example.com/articles/{i}",
+            'platform': PLATFORMS[i % len(PLATFORMS)],
+            'timestamp': (now - timedelta(minutes=i)).isoformat()
+        }
+        for i in range(count)
+    ]
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    data = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, data
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=100000, help='history records')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    # 两种方式都从同一份 JSON 文本加载，计入各自持有的全部字符串
+    text = json.dumps(make_dicts(args.records), ensure_ascii=False)
+    dict_size, dicts = measure_memory(lambda: json.loads(text))
+    record_size, records = measure_memory(lambda: [HistoryRecord.from_dict(item) for item in json.loads(text)])
+
+    cutoff_dt = datetime.now() - timedelta(hours=24)
+    cutoff_ts = cutoff_dt.timestamp()
+    dict_filter = best_of(
+        lambda: [item for item in dicts if datetime.fromisoformat(item['timestamp']) > cutoff_dt], args.repeat
+    )
+    record_filter = best_of(lambda: [record for record in records if record.ts > cutoff_ts], args.repeat)
+
+    print(f"{args.records} records")
+    print(f"{'':<16}{'bytes/record':>14}{'24h filter (ms)':>18}")
+    print(f"{'dict':<16}{dict_size / args.records:>14.0f}{dict_filter * 1000:>18.1f}")
+    print(f"{'HistoryRecord':<16}{record_size / args.records:>14.0f}{record_filter * 1000:>18.1f}")
+    print(f"{'factor':<16}{dict_size / record_size:>13.1f}x{dict_filter / record_filter:>17.1f}x")
+
+
+if __name__ == '__main__':
+    main()
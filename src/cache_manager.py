@@ -3,9 +3,11 @@ Cache manager for fallback when fetching fails
 """
 import json
 import os
-from datetime import datetime, timedelta
+import time
 import logging
 
+from records import CacheEntry
+
 logger = logging.getLogger(__name__)
 
 class CacheManager:
@@ -23,7 +25,9 @@ class CacheManager:
         
         try:
             with open(self.cache_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                data = json.load(f)
+                # 时间戳只在加载时解析一次，之后都是整数比较
+                return {name: CacheEntry.from_dict(entry) for name, entry in data.items()}
         except Exception as e:
             logger.error(f"Failed to load cache: {e}")
             return {}
@@ -32,7 +36,7 @@ class CacheManager:
         """Save cache to file"""
         try:
             with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
+                json.dump({name: entry.to_dict() for name, entry in self.cache.items()}, f, ensure_ascii=False, indent=2)
         except Exception as e:
             logger.error(f"Failed to save cache: {e}")
     
@@ -42,31 +46,27 @@ class CacheManager:
             return None
         
         entry = self.cache[platform_name]
-        timestamp = datetime.fromisoformat(entry['timestamp'])
-        age = (datetime.now() - timestamp).total_seconds()
+        age = time.time() - entry.ts
         
         if age > self.max_age_seconds:
             logger.debug(f"Cache expired for {platform_name} (age: {age}s)")
             return None
         
         logger.info(f"Using cache for {platform_name} (age: {int(age)}s)")
-        return entry['data']
+        return entry.data
     
     def set(self, platform_name, data):
         """Set cache for platform"""
-        self.cache[platform_name] = {
-            'data': data,
-            'timestamp': datetime.now().isoformat()
-        }
+        self.cache[platform_name] = CacheEntry(data, time.time())
     
     def cleanup_old(self):
         """Remove expired cache entries"""
-        cutoff = datetime.now() - timedelta(seconds=self.max_age_seconds)
+        cutoff = time.time() - self.max_age_seconds
         original_count = len(self.cache)
         
         self.cache = {
             name: entry for name, entry in self.cache.items()
-            if datetime.fromisoformat(entry['timestamp']) > cutoff
+            if entry.ts > cutoff
         }
         
         removed = original_count - len(self.cache)
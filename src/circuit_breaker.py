@@ -0,0 +1,138 @@
+"""
+Persistent circuit breakers for feeds and hosts
+
+closed    -> 正常请求；连续失败达到阈值后 open
+open      -> 直接跳过，不发请求；冷却结束后进入 half_open
+half_open -> 只放行一次低成本探测：成功则 closed，失败则重新 open 且冷却时间翻倍
+"""
+import json
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreakerStore:
+    """Circuit breaker state per key ("feed:<url>" / "host:<host>"), persisted in data/"""
+
+    def __init__(self, state_file='data/circuit_breakers.json', failure_threshold=3, host_failure_threshold=5,
+                 cooldown=1800, max_cooldown=86400):
+        self.state_file = state_file
+        self.failure_threshold = failure_threshold
+        self.host_failure_threshold = host_failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.breakers = self._load_state()
+        # 本次运行中已放行探测的 key（half_open 只放行一次）
+        self._probing = set()
+
+    @classmethod
+    def from_config(cls, config, state_file):
+        settings = config.get_circuit_breaker_settings()
+        return cls(
+            state_file=state_file,
+            failure_threshold=settings.get('failure_threshold', 3),
+            host_failure_threshold=settings.get('host_failure_threshold', 5),
+            cooldown=settings.get('cooldown_minutes', 30) * 60,
+            max_cooldown=settings.get('max_cooldown_minutes', 1440) * 60
+        )
+
+    def _load_state(self):
+        """Load breaker state from file"""
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+
+        if not os.path.exists(self.state_file):
+            return {}
+
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                return data if isinstance(data, dict) else {}
+        except Exception as e:
+            logger.error(f"Failed to load circuit breakers: {e}")
+            return {}
+
+    def save(self):
+        """Save breaker state; closed breakers without failures are not stored"""
+        self.breakers = {
+            key: entry for key, entry in self.breakers.items()
+            if entry.get('state') != CLOSED or entry.get('failures')
+        }
+        try:
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump(self.breakers, f, ensure_ascii=False, indent=2, sort_keys=True)
+        except Exception as e:
+            logger.error(f"Failed to save circuit breakers: {e}")
+
+    def get_state(self, key, now=None):
+        """Effective state: an open breaker whose cooldown has passed is half_open"""
+        entry = self.breakers.get(key)
+        if not entry:
+            return CLOSED
+        state = entry.get('state', CLOSED)
+        if state == OPEN:
+            now = time.time() if now is None else now
+            if now >= entry.get('open_until', 0):
+                return HALF_OPEN
+        return state
+
+    def try_acquire(self, *keys):
+        """
+        Check all breakers of a request at once
+
+        Returns:
+            (allowed, probing): probing is True when the request is the single
+            half-open probe for at least one of the keys
+        """
+        now = time.time()
+        states = [(key, self.get_state(key, now)) for key in keys if key]
+        for key, state in states:
+            if state == OPEN or (state == HALF_OPEN and key in self._probing):
+                return False, False
+
+        probing = False
+        for key, state in states:
+            if state == HALF_OPEN:
+                self.breakers[key]['state'] = HALF_OPEN
+                self._probing.add(key)
+                probing = True
+        return True, probing
+
+    def record_success(self, key):
+        if not key:
+            return
+        entry = self.breakers.pop(key, None)
+        self._probing.discard(key)
+        if entry and entry.get('state') != CLOSED:
+            logger.info(f"Circuit closed: {key}")
+
+    def record_failure(self, key, error=''):
+        if not key:
+            return
+        now = time.time()
+        entry = self.breakers.setdefault(key, {'state': CLOSED, 'failures': 0, 'trips': 0})
+        entry['failures'] = entry.get('failures', 0) + 1
+        entry['last_error'] = str(error)[:100]
+        entry['last_failure'] = int(now)
+
+        threshold = self.host_failure_threshold if key.startswith('host:') else self.failure_threshold
+        was_probe = key in self._probing
+        self._probing.discard(key)
+        if was_probe or entry['failures'] >= threshold:
+            # 每次跳闸冷却时间翻倍，直到上限
+            trips = entry.get('trips', 0) + 1 if was_probe else entry.get('trips', 0)
+            cooldown = min(self.cooldown * (2 ** trips), self.max_cooldown)
+            entry['trips'] = trips
+            entry['state'] = OPEN
+            entry['open_until'] = int(now + cooldown)
+            logger.warning(f"Circuit open for {cooldown // 60:.0f} min: {key}")
+
+    def open_circuits(self):
+        """Keys currently skipped (open or waiting for a probe)"""
+        now = time.time()
+        return [key for key in self.breakers if self.get_state(key, now) != CLOSED]
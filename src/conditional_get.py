@@ -0,0 +1,84 @@
+"""
+Validator store for conditional GET (ETag / Last-Modified) on RSS feeds
+"""
+import json
+import os
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ValidatorStore:
+    """Persist ETag / Last-Modified per feed URL so unchanged feeds answer 304"""
+
+    def __init__(self, store_file='data/feed_validators.json'):
+        self.store_file = store_file
+        self.validators = self._load_validators()
+        self._dirty = False
+
+    def _load_validators(self):
+        """Load validators from file"""
+        os.makedirs(os.path.dirname(self.store_file), exist_ok=True)
+
+        if not os.path.exists(self.store_file):
+            return {}
+
+        try:
+            with open(self.store_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                return data if isinstance(data, dict) else {}
+        except Exception as e:
+            logger.error(f"Failed to load feed validators: {e}")
+            return {}
+
+    def save(self):
+        """Save validators to file (only when something changed)"""
+        if not self._dirty:
+            return
+        try:
+            with open(self.store_file, 'w', encoding='utf-8') as f:
+                json.dump(self.validators, f, ensure_ascii=False, indent=2, sort_keys=True)
+            self._dirty = False
+        except Exception as e:
+            logger.error(f"Failed to save feed validators: {e}")
+
+    def get_headers(self, feed_url):
+        """Get If-None-Match / If-Modified-Since headers for a feed"""
+        entry = self.validators.get(feed_url)
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def update(self, feed_url, response_headers):
+        """Remember the validators of a successful 200 response"""
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+
+        if not etag and not last_modified:
+            # 服务器不支持条件请求，清除旧记录
+            if self.validators.pop(feed_url, None) is not None:
+                self._dirty = True
+            return
+
+        self.validators[feed_url] = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'timestamp': datetime.now().isoformat()
+        }
+        self._dirty = True
+
+    def prune(self, active_urls):
+        """Drop validators of feeds that are no longer configured"""
+        active = set(active_urls)
+        stale = [url for url in self.validators if url not in active]
+        for url in stale:
+            del self.validators[url]
+        if stale:
+            logger.info(f"Pruned {len(stale)} stale feed validators")
+            self._dirty = True
@@ -4,7 +4,6 @@ Configuration loader with UA rotation and delay utilities
 import json
 import os
 import random
-import time
 import logging
 
 logger = logging.getLogger(__name__)
@@ -46,6 +45,85 @@ class ScrapingConfig:
                 "browser": 30,
                 "rss": 20
             },
+            "concurrency": {
+                "global": 16,
+                "per_host": 4
+            },
+            "rate_limits": {
+                "default": {"rate": 2, "burst": 4},
+                "jitter": [0, 0.5],
+                "max_retry_after": 120,
+                "hosts": {}
+            },
+            "scheduler": {
+                "enabled": True,
+                "min_interval_minutes": 60,
+                "max_interval_minutes": 720,
+                "grace_minutes": 10
+            },
+            "circuit_breaker": {
+                "failure_threshold": 3,
+                "host_failure_threshold": 5,
+                "cooldown_minutes": 30,
+                "max_cooldown_minutes": 1440
+            },
+            "history": {
+                "backend": "json",
+                "max_items": 2000
+            },
+            "seen_filter": {
+                "enabled": True,
+                "error_rate": 0.001,
+                "initial_capacity": 20000,
+                "window_days": 30,
+                "generations": 6
+            },
+            "url_canonicalization": {
+                "strip_params": [
+                    "utm_*", "spm", "spm_id_from", "from", "from_source", "share_source", "share_medium",
+                    "share_from", "vd_source", "fbclid", "gclid", "mc_cid", "mc_eid"
+                ],
+                "strip_www": True,
+                "force_https": True,
+                "host_aliases": {
+                    "m.bilibili.com": "bilibili.com",
+                    "mobile.twitter.com": "twitter.com"
+                },
+                "redirectors": {
+                    "link.zhihu.com/": "target",
+                    "link.juejin.cn/": "target",
+                    "sspai.com/link": "target",
+                    "weibo.cn/sinaurl": "u",
+                    "google.com/url": "q"
+                }
+            },
+            "near_duplicate": {
+                "enabled": True,
+                "shingle_size": 2,
+                "num_perm": 64,
+                "bands": 16,
+                "threshold": 0.6,
+                "window_hours": 48
+            },
+            "telegram": {
+                "global_rate": 30,
+                "chat_rate": 1.0,
+                "chat_burst": 3,
+                "group_rate_per_minute": 20,
+                "max_attempts": 4,
+                "max_retry_after": 60
+            },
+            "outbox": {
+                "max_attempts": 8,
+                "backoff_seconds": 60,
+                "max_backoff_minutes": 360,
+                "max_age_hours": 48,
+                "retention_days": 7
+            },
+            "deadline": {
+                "run_minutes": 20,
+                "notify_reserve_minutes": 2
+            },
             "user_agents": [
                 "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
             ],
@@ -69,16 +147,55 @@ class ScrapingConfig:
         min_delay, max_delay = self.config['delays']['between_requests']
         return random.uniform(min_delay, max_delay)
     
-    def sleep_between_platforms(self):
-        """Sleep with random delay between platforms"""
-        delay = self.get_platform_delay()
-        logger.debug(f"Sleeping {delay:.2f}s before next platform")
-        time.sleep(delay)
-    
     def get_timeout(self, tier='http'):
         """Get timeout for specific tier"""
         return self.config['timeouts'].get(tier, 10)
     
+    def get_concurrency(self):
+        """Get (global, per_host) concurrency limits for async fetching"""
+        concurrency = self.config.get('concurrency', {})
+        return concurrency.get('global', 16), concurrency.get('per_host', 4)
+    
+    def get_rate_limits(self):
+        """Get per-host token bucket settings (see rate_limiter.HostRateLimiter)"""
+        return self.config.get('rate_limits', self._get_defaults()['rate_limits'])
+    
+    def get_scheduler_settings(self):
+        """Get adaptive feed polling settings (see feed_scheduler.FeedScheduler)"""
+        return self.config.get('scheduler', self._get_defaults()['scheduler'])
+    
+    def get_circuit_breaker_settings(self):
+        """Get per-feed / per-host circuit breaker settings"""
+        return self.config.get('circuit_breaker', self._get_defaults()['circuit_breaker'])
+    
+    def get_history_settings(self):
+        """Get history storage settings (backend: json / sqlite / journal / sharded, max_items: 0 = unlimited)"""
+        return self.config.get('history', self._get_defaults()['history'])
+    
+    def get_seen_filter_settings(self):
+        """Get long-horizon dedup filter settings (see seen_filter.SeenFilter)"""
+        return self.config.get('seen_filter', self._get_defaults()['seen_filter'])
+    
+    def get_url_canonicalization_rules(self):
+        """Get URL canonicalization rules (see url_canon.UrlCanonicalizer)"""
+        return self.config.get('url_canonicalization', self._get_defaults()['url_canonicalization'])
+    
+    def get_near_duplicate_settings(self):
+        """Get near-duplicate title detection settings (see near_dup.NearDuplicateIndex)"""
+        return self.config.get('near_duplicate', self._get_defaults()['near_duplicate'])
+    
+    def get_telegram_settings(self):
+        """Get Telegram delivery limits (see delivery.DeliveryScheduler)"""
+        return self.config.get('telegram', self._get_defaults()['telegram'])
+    
+    def get_outbox_settings(self):
+        """Get notification outbox retry settings (see outbox.Outbox)"""
+        return self.config.get('outbox', self._get_defaults()['outbox'])
+    
+    def get_deadline_settings(self):
+        """Get the run-level time budget (see deadline.RunDeadline)"""
+        return self.config.get('deadline', self._get_defaults()['deadline'])
+    
     def should_send_alerts(self):
         """Check if alerts are enabled"""
         return self.config['monitoring']['enable_alerts']
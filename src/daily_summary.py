@@ -2,8 +2,10 @@ import os
 import sys
 import logging
 from history import HistoryManager
+from config_loader import ScrapingConfig
 from summarizer import DailySummarizer
 from notifier import TelegramNotifier
+from formatting import PLAIN, message_payload
 
 # Configure logging
 logging.basicConfig(
@@ -27,8 +29,7 @@ def main():
     try:
         # Initialize components
         project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        history_file = os.path.join(project_root, 'data', 'history.json')
-        history_manager = HistoryManager(history_file)
+        history_manager = HistoryManager.from_config(ScrapingConfig(), os.path.join(project_root, 'data'))
         
         # Clean old entries (older than 7 days)
         history_manager.clean_old(days=7)
@@ -36,6 +37,7 @@ def main():
         # Generate summary
         summarizer = DailySummarizer(history_manager)
         summary = summarizer.generate_summary(hours=24, top_n=30)
+        history_manager.close()
         
         if not summary:
             logger.info("No trends to summarize")
@@ -44,7 +46,11 @@ def main():
         logger.info(f"Generated summary with {len(summary)} top trends")
         
         # Format and send message
-        message = summarizer.format_daily_message(summary, hours=24)
+        # Markdown 和纯文本回退由同一组片段渲染
+        message = message_payload(
+            summarizer.format_daily_message(summary, hours=24),
+            plain=summarizer.format_daily_message(summary, hours=24, mode=PLAIN)
+        )
         
         notifier = TelegramNotifier(token, chat_id)
         if notifier.send_message(message):
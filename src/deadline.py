@@ -0,0 +1,73 @@
+"""
+Run-level time budget
+
+一次运行的总时间预算，从 main() 开始计时，传递给抓取和推送阶段：
+- 抓取阶段必须在 (总预算 - 推送预留) 内结束，超时未完成的源被取消
+- 每个请求的超时不超过剩余时间
+- 推送阶段在预算耗尽后停止发送新批次（未发送的条目下次运行再推送）
+"""
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 单个请求的最短超时，避免临近截止时传入 0 或负数
+MIN_TIMEOUT = 1.0
+
+
+class RunDeadline:
+    """Monotonic deadline for one run; budget=None means unlimited"""
+
+    def __init__(self, budget=None, notify_reserve=0):
+        self.budget = budget
+        self.notify_reserve = notify_reserve if budget else 0
+        self.started = time.monotonic()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build from the "deadline" section of ScrapingConfig
+
+        RUN_DEADLINE_SECONDS overrides the configured budget (0 disables it).
+        """
+        settings = config.get_deadline_settings()
+        budget = settings.get('run_minutes', 20) * 60
+        env_budget = os.getenv('RUN_DEADLINE_SECONDS')
+        if env_budget:
+            try:
+                budget = float(env_budget)
+            except ValueError:
+                logger.warning(f"Invalid RUN_DEADLINE_SECONDS: {env_budget}")
+        notify_reserve = settings.get('notify_reserve_minutes', 2) * 60
+        return cls(budget=budget or None, notify_reserve=min(notify_reserve, (budget or 0) / 2))
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def remaining(self):
+        """Seconds left for the whole run (None if unlimited)"""
+        if self.budget is None:
+            return None
+        return max(0.0, self.budget - self.elapsed())
+
+    def fetch_remaining(self):
+        """Seconds left for fetching, keeping the notify reserve (None if unlimited)"""
+        if self.budget is None:
+            return None
+        return max(0.0, self.budget - self.notify_reserve - self.elapsed())
+
+    def expired(self):
+        return self.budget is not None and self.elapsed() >= self.budget
+
+    def cap(self, timeout, fetch=False):
+        """Limit a per-request timeout to the time left (fetch=True keeps the notify reserve)"""
+        remaining = self.fetch_remaining() if fetch else self.remaining()
+        if remaining is None:
+            return timeout
+        return max(MIN_TIMEOUT, min(timeout, remaining))
+
+    def get_summary(self):
+        if self.budget is None:
+            return f"Run deadline: none ({self.elapsed():.1f}s elapsed)"
+        return f"Run deadline: {self.elapsed():.1f}s / {self.budget:.0f}s used"
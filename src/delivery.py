@@ -0,0 +1,274 @@
+"""
+Telegram delivery scheduler
+
+按 Telegram Bot API 的实际限制调度发送，代替每条消息后固定 sleep(3)：
+- 全局令牌桶（默认 30 条/秒）+ 每个聊天一个令牌桶（私聊约 1 条/秒，群组 20 条/分钟）
+- 每个聊天一个异步发送协程，保证同一聊天内的顺序；不同聊天之间并行
+- 429 时读取响应中的 parameters.retry_after（或 Retry-After 头），暂停该聊天后重试
+- Markdown 解析失败时改用纯文本重发（优先使用 formatting 预先渲染的纯文本）
+- 统计队列深度、单条发送耗时和从入队到送达的延迟
+"""
+import asyncio
+import re
+import time
+import logging
+
+import httpx
+
+from formatting import MARKDOWN, PLAIN
+from http_client import create_async_client
+from rate_limiter import TokenBucket, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+API_URL = "https://api.telegram.org/bot{token}/sendMessage"
+
+# 5xx / 网络错误的重试退避（秒）
+RETRY_BACKOFF = (1, 3, 10)
+
+
+def markdown_to_plain(text):
+    """
+    Markdown link [text](url) -> "text\\nurl", formatting characters removed
+
+    Only for free-form strings; messages built with formatting carry a
+    pre-rendered plain text instead.
+    """
+    try:
+        text = re.sub(r"\[([^\]]+)\]\(([^)]+)\)", lambda m: f"{m.group(1)}\n{m.group(2)}", text)
+        # 去除粗体/斜体等标记
+        for char in ('*', '_', '`'):
+            text = text.replace(char, '')
+        return text
+    except Exception as e:
+        logger.error(f"Error converting to plain text: {e}")
+        return text
+
+
+class OutOfTime(Exception):
+    """Waiting for a send slot would outlast the run deadline"""
+
+
+class DeliveryJob:
+    """Message parts for one chat, delivered in order; on_success runs once all parts are acknowledged"""
+
+    __slots__ = ('chat_id', 'parts', 'on_success', 'enqueued', 'ok', 'sent_parts', 'error')
+
+    def __init__(self, chat_id, parts, on_success=None):
+        self.chat_id = str(chat_id)
+        self.parts = parts
+        self.on_success = on_success
+        self.enqueued = time.monotonic()
+        self.ok = None
+        self.sent_parts = 0
+        self.error = None
+
+
+class DeliveryScheduler:
+    """Rate-limit-aware async sender for the Telegram Bot API"""
+
+    def __init__(self, token, deadline=None, global_rate=30, chat_rate=1.0, chat_burst=3,
+                 group_rate_per_minute=20, max_attempts=4, max_retry_after=60):
+        self.api_url = API_URL.format(token=token)
+        # 运行时间预算（deadline.RunDeadline），请求超时不超过剩余时间
+        self.deadline = deadline
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate_per_minute / 60
+        self.max_attempts = max_attempts
+        self.max_retry_after = max_retry_after
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self._chat_buckets = {}
+        self._queues = {}
+        self.stats = {
+            'jobs': 0, 'messages': 0, 'sent': 0, 'failed': 0, 'skipped': 0,
+            'retries': 0, 'rate_limited': 0, 'retry_after_seconds': 0.0, 'max_queue_depth': 0
+        }
+        self._send_latencies = []
+        self._delivery_latencies = []
+
+    @classmethod
+    def from_config(cls, config, token, deadline=None):
+        """Build from the "telegram" section of ScrapingConfig"""
+        settings = config.get_telegram_settings()
+        return cls(
+            token,
+            deadline=deadline,
+            global_rate=settings.get('global_rate', 30),
+            chat_rate=settings.get('chat_rate', 1.0),
+            chat_burst=settings.get('chat_burst', 3),
+            group_rate_per_minute=settings.get('group_rate_per_minute', 20),
+            max_attempts=settings.get('max_attempts', 4),
+            max_retry_after=settings.get('max_retry_after', 60)
+        )
+
+    def _chat_bucket(self, chat_id):
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            # 群组 / 频道的 chat_id 为负数，限制为每分钟 20 条
+            if chat_id.startswith('-'):
+                bucket = TokenBucket(self.group_rate, 1)
+            else:
+                bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def submit(self, chat_id, parts, on_success=None):
+        """Queue message parts for a chat; returns the DeliveryJob"""
+        if isinstance(parts, str):
+            parts = [parts]
+        job = DeliveryJob(chat_id, [part for part in parts if part], on_success)
+        self._queues.setdefault(job.chat_id, []).append(job)
+        self.stats['jobs'] += 1
+        self.stats['messages'] += len(job.parts)
+        self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], self.queue_depth())
+        return job
+
+    def queue_depth(self):
+        """Messages not yet delivered or given up on"""
+        return sum(len(job.parts) - job.sent_parts for jobs in self._queues.values() for job in jobs if job.ok is None)
+
+    def run(self):
+        """Deliver everything queued; blocks until done (or the run deadline is reached)"""
+        if not self._queues:
+            return []
+        jobs = [job for jobs in self._queues.values() for job in jobs]
+        asyncio.run(self._run())
+        self._queues = {}
+        return jobs
+
+    async def _run(self):
+        async with create_async_client(max_connections=8) as client:
+            await asyncio.gather(*(self._chat_worker(client, jobs) for jobs in self._queues.values()))
+
+    async def _chat_worker(self, client, jobs):
+        for job in jobs:
+            for part in job.parts[job.sent_parts:]:
+                if self.deadline and self.deadline.expired():
+                    job.error = 'deadline'
+                    break
+                try:
+                    sent = await self._send(client, job.chat_id, part)
+                except OutOfTime:
+                    logger.warning(f"Not enough run time left to send to chat {job.chat_id}")
+                    job.error = 'deadline'
+                    break
+                if not sent:
+                    job.error = 'send failed'
+                    break
+                job.sent_parts += 1
+
+            job.ok = job.sent_parts == len(job.parts)
+            if job.ok:
+                self._delivery_latencies.append(time.monotonic() - job.enqueued)
+                if job.on_success:
+                    try:
+                        job.on_success()
+                    except Exception as e:
+                        logger.error(f"Delivery callback failed: {e}", exc_info=True)
+            elif job.error == 'deadline':
+                self.stats['skipped'] += len(job.parts) - job.sent_parts
+            else:
+                self.stats['failed'] += 1
+
+    async def _acquire(self, chat_id):
+        """Wait for both the chat and the global bucket (raises OutOfTime past the run deadline)"""
+        wait = max(self._chat_bucket(chat_id).reserve(), self.global_bucket.reserve())
+        remaining = self.deadline.remaining() if self.deadline else None
+        if remaining is not None and wait > remaining:
+            raise OutOfTime()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def _timeout(self, seconds):
+        return self.deadline.cap(seconds) if self.deadline else seconds
+
+    async def _send(self, client, chat_id, part):
+        """Send one message part, honouring retry_after; True once Telegram acknowledges it"""
+        # part 为字符串（Markdown）或 formatting.message_payload
+        if isinstance(part, dict):
+            text, parse_mode, plain = part['text'], part.get('parse_mode', MARKDOWN), part.get('plain')
+        else:
+            text, parse_mode, plain = part, MARKDOWN, None
+        payload = {'chat_id': chat_id, 'text': text, 'disable_web_page_preview': True}
+        if parse_mode != PLAIN:
+            payload['parse_mode'] = parse_mode
+        for attempt in range(1, self.max_attempts + 1):
+            if attempt > 1:
+                self.stats['retries'] += 1
+            await self._acquire(chat_id)
+            start = time.monotonic()
+            try:
+                response = await client.post(self.api_url, json=payload, timeout=self._timeout(10))
+            except httpx.HTTPError as e:
+                logger.warning(f"Telegram request error (attempt {attempt}): {e}")
+                await asyncio.sleep(RETRY_BACKOFF[min(attempt, len(RETRY_BACKOFF)) - 1])
+                continue
+            self._send_latencies.append(time.monotonic() - start)
+
+            try:
+                data = response.json()
+            except ValueError:
+                data = {}
+
+            if response.status_code == 200 and data.get('ok', False):
+                self.stats['sent'] += 1
+                return True
+
+            description = data.get('description', response.text[:200])
+            if response.status_code == 429:
+                # Telegram 在 JSON 的 parameters.retry_after 中给出需要等待的秒数
+                retry_after = (data.get('parameters') or {}).get('retry_after')
+                if retry_after is None:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After')) or 1
+                retry_after = min(float(retry_after), self.max_retry_after)
+                self.stats['rate_limited'] += 1
+                self.stats['retry_after_seconds'] += retry_after
+                logger.warning(f"Telegram rate limit for chat {chat_id}, retrying after {retry_after:.0f}s")
+                self._chat_bucket(chat_id).block(retry_after)
+                continue
+
+            if response.status_code == 400 and 'parse_mode' in payload and (
+                'parse' in description.lower() or 'entities' in description.lower()
+            ):
+                # 回退：Markdown 解析错误时改用纯文本发送
+                logger.info("Retrying with plain text (no parse_mode)")
+                if plain is None:
+                    plain = markdown_to_plain(text)
+                payload = {'chat_id': chat_id, 'text': plain, 'disable_web_page_preview': True}
+                continue
+
+            if response.status_code >= 500:
+                logger.warning(f"Telegram HTTP {response.status_code} (attempt {attempt})")
+                await asyncio.sleep(RETRY_BACKOFF[min(attempt, len(RETRY_BACKOFF)) - 1])
+                continue
+
+            logger.error(f"Telegram API error: {response.status_code} - {description}")
+            return False
+
+        logger.error(f"Giving up on message to chat {chat_id} after {self.max_attempts} attempts")
+        return False
+
+    def get_stats(self):
+        def percentile(values, q):
+            if not values:
+                return 0
+            ordered = sorted(values)
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000)
+
+        return dict(
+            self.stats,
+            retry_after_seconds=round(self.stats['retry_after_seconds'], 1),
+            send_ms_p50=percentile(self._send_latencies, 0.5),
+            send_ms_p95=percentile(self._send_latencies, 0.95),
+            delivery_ms_max=percentile(self._delivery_latencies, 1.0)
+        )
+
+    def get_summary(self):
+        stats = self.get_stats()
+        return (
+            f"Telegram delivery: {stats['sent']}/{stats['messages']} messages sent, {stats['failed']} jobs failed, "
+            f"{stats['skipped']} skipped, {stats['rate_limited']} rate-limited ({stats['retry_after_seconds']}s), "
+            f"max queue {stats['max_queue_depth']}, send p50/p95 {stats['send_ms_p50']}/{stats['send_ms_p95']}ms, "
+            f"last delivery after {stats['delivery_ms_max']}ms"
+        )
@@ -0,0 +1,208 @@
+"""
+Streaming bounded RSS/Atom parser
+
+基于 lxml 的增量解析：边下载边解析，取满 N 条后立即停止，
+不再为大体积全文源构建整棵 DOM 树。
+"""
+import html
+import logging
+
+from lxml import etree
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ITEM_LIMIT = 10
+
+ITEM_TAGS = ('item', 'entry')
+
+CHANNEL_HINT_TAGS = ('ttl', 'skipHours')
+
+
+def _local_name(tag):
+    """'{http://www.w3.org/2005/Atom}entry' -> 'entry'"""
+    if not isinstance(tag, str):
+        return ''
+    return tag.rsplit('}', 1)[-1]
+
+
+def _text(element):
+    return ''.join(element.itertext()).strip()
+
+
+# 不是文章地址的 <link rel=...>：源自身地址、附件
+IGNORED_LINK_RELS = ('self', 'enclosure')
+
+
+def _extract_item(element):
+    """Extract title/link/guid/pubDate from an <item> or <entry> element"""
+    title = ''
+    text_link = ''
+    alternate_link = ''
+    other_link = ''
+    guid = ''
+    published = ''
+
+    for child in element:
+        name = _local_name(child.tag)
+        if name == 'title':
+            title = _text(child)
+        elif name == 'link':
+            href = child.get('href')
+            rel = child.get('rel', 'alternate')
+            if href is None:
+                # RSS: <link>url</link>
+                text_link = text_link or _text(child)
+            elif rel == 'alternate':
+                # Atom: 优先 rel="alternate"
+                alternate_link = alternate_link or href
+            elif rel not in IGNORED_LINK_RELS:
+                # related / via 等只在没有其他链接时使用
+                other_link = other_link or href
+        elif name in ('guid', 'id'):
+            guid = _text(child)
+        elif name in ('pubDate', 'published', 'date'):
+            published = _text(child)
+        elif name == 'updated' and not published:
+            published = _text(child)
+
+    title = html.unescape(title)
+    if not title:
+        return None
+
+    # 与元素顺序无关：RSS 的文本 <link> 优先，其次 Atom alternate，最后其他 rel
+    url = text_link or alternate_link or other_link
+    if not url and guid.startswith('http'):
+        url = guid
+
+    item = {'title': title, 'url': url}
+    if guid:
+        item['guid'] = guid
+    if published:
+        item['published'] = published
+    return item
+
+
+class FeedStreamParser:
+    """Incremental RSS 2.0 / RSS 1.0 / Atom parser that stops after `limit` items"""
+
+    def __init__(self, limit=DEFAULT_ITEM_LIMIT):
+        self.limit = limit
+        self.reset()
+
+    def reset(self):
+        """Discard state so the parser can be reused for a retry"""
+        self.items = []
+        # 频道级发布方提示：ttl（分钟）、skip_hours（UTC 小时）
+        self.hints = {}
+        self.done = False
+        self.failed = False
+        # 在解析出第一条之前保留原始数据，供 BeautifulSoup 回退使用
+        self._buffer = []
+        self._parser = etree.XMLPullParser(
+            events=('end',),
+            recover=True,
+            resolve_entities=False,
+            no_network=True
+        )
+
+    def feed(self, chunk):
+        """
+        Feed a chunk of bytes
+
+        Returns:
+            bool: True once `limit` items are collected and reading can stop
+        """
+        if self.done:
+            return True
+
+        if self._buffer is not None:
+            self._buffer.append(chunk)
+        if self.failed:
+            return False
+
+        try:
+            self._parser.feed(chunk)
+            events = self._parser.read_events()
+            for _, element in events:
+                name = _local_name(element.tag)
+                if name not in ITEM_TAGS:
+                    if name in CHANNEL_HINT_TAGS:
+                        self._read_hint(name, element)
+                    continue
+
+                item = _extract_item(element)
+                if item:
+                    self.items.append(item)
+                    self._buffer = None
+
+                # 释放已处理的条目，内存占用与文档大小无关
+                element.clear()
+                parent = element.getparent()
+                if parent is not None:
+                    while element.getprevious() is not None:
+                        del parent[0]
+
+                if len(self.items) >= self.limit:
+                    self.done = True
+                    break
+        except etree.LxmlError as e:
+            logger.debug(f"Streaming parse failed: {e}")
+            self.failed = True
+
+        return self.done
+
+    def _read_hint(self, name, element):
+        try:
+            if name == 'ttl':
+                self.hints['ttl'] = int(_text(element))
+            elif name == 'skipHours':
+                self.hints['skip_hours'] = sorted({
+                    int(_text(child)) % 24 for child in element if _local_name(child.tag) == 'hour'
+                })
+        except ValueError:
+            pass
+
+    def finish(self):
+        """
+        Return the parsed items
+
+        Falls back to BeautifulSoup over the buffered document when the
+        streaming parser found nothing (e.g. badly broken markup).
+        """
+        if not self.items and self._buffer:
+            return parse_feed_soup(b''.join(self._buffer), self.limit)
+        return self.items
+
+
+def parse_feed_soup(content, limit=DEFAULT_ITEM_LIMIT):
+    """解析 RSS/Atom 内容（BeautifulSoup 完整 DOM，作为回退路径）"""
+    soup = BeautifulSoup(content, 'xml')
+    items = soup.find_all('item')
+    if not items:
+        items = soup.find_all('entry')
+
+    trends = []
+    for item in items[:limit]:
+        title_tag = item.find('title')
+        link_tag = item.find('link')
+
+        if title_tag:
+            title = html.unescape(title_tag.get_text().strip())
+            link = ''
+            if link_tag:
+                link = link_tag.get_text().strip() if link_tag.string else link_tag.get('href', '')
+
+            if title:
+                trends.append({'title': title, 'url': link})
+
+    return trends
+
+
+def parse_feed(content, limit=DEFAULT_ITEM_LIMIT, chunk_size=64 * 1024):
+    """Parse a complete feed document, stopping after `limit` items"""
+    parser = FeedStreamParser(limit)
+    for start in range(0, len(content), chunk_size):
+        if parser.feed(content[start:start + chunk_size]):
+            break
+    return parser.finish()
@@ -0,0 +1,157 @@
+"""
+Adaptive per-feed polling scheduler
+
+- 记录每个源真正出现新条目的时间，按观测到的更新间隔计算下次抓取时间
+- 没有新条目时逐步退避，间隔限制在 [min_interval, max_interval]
+- 遵守发布方提示：RSS <ttl>、<skipHours> 和 Cache-Control: max-age
+"""
+import hashlib
+import json
+import os
+import re
+import time
+import logging
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# 每个源记住最近多少条条目的指纹，用于判断"新条目"
+SEEN_KEYS_PER_FEED = 30
+
+BACKOFF_FACTOR = 1.5
+EWMA_ALPHA = 0.3
+
+MAX_AGE_PATTERN = re.compile(r'max-age=(\d+)')
+
+
+def _item_key(item):
+    key = item.get('guid') or item.get('url') or item.get('title', '')
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+
+def parse_max_age(cache_control):
+    """Cache-Control: max-age=N -> N seconds (None if absent)"""
+    if not cache_control:
+        return None
+    match = MAX_AGE_PATTERN.search(cache_control)
+    return int(match.group(1)) if match else None
+
+
+class FeedScheduler:
+    """Decide which feeds are due on this run and when to poll them next"""
+
+    def __init__(self, state_file='data/feed_schedule.json', min_interval=3600, max_interval=43200, grace=600):
+        self.state_file = state_file
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.grace = grace
+        self.state = self._load_state()
+
+    @classmethod
+    def from_config(cls, config, state_file):
+        settings = config.get_scheduler_settings()
+        return cls(
+            state_file=state_file,
+            min_interval=settings.get('min_interval_minutes', 60) * 60,
+            max_interval=settings.get('max_interval_minutes', 720) * 60,
+            grace=settings.get('grace_minutes', 10) * 60
+        )
+
+    def _load_state(self):
+        """Load schedule state from file"""
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+
+        if not os.path.exists(self.state_file):
+            return {}
+
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                return data if isinstance(data, dict) else {}
+        except Exception as e:
+            logger.error(f"Failed to load feed schedule: {e}")
+            return {}
+
+    def save(self, active_urls=None):
+        """Save schedule state, dropping feeds that are no longer configured"""
+        if active_urls is not None:
+            active = set(active_urls)
+            self.state = {url: entry for url, entry in self.state.items() if url in active}
+        try:
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, ensure_ascii=False, indent=2, sort_keys=True)
+        except Exception as e:
+            logger.error(f"Failed to save feed schedule: {e}")
+
+    def is_due(self, feed_url, now=None):
+        """A feed is due when its next poll time is within the grace window"""
+        entry = self.state.get(feed_url)
+        if not entry:
+            return True
+        now = time.time() if now is None else now
+        return entry.get('next_due', 0) <= now + self.grace
+
+    def due_feeds(self, feeds, now=None):
+        """Filter (name, url) pairs down to the feeds due on this run"""
+        now = time.time() if now is None else now
+        return [(name, url) for name, url in feeds if self.is_due(url, now)]
+
+    def _skip_forward(self, due, skip_hours):
+        """Move a due time out of the publisher's <skipHours> (UTC hours)"""
+        if not skip_hours or len(skip_hours) >= 24:
+            return due
+        for _ in range(24):
+            if datetime.fromtimestamp(due, timezone.utc).hour not in skip_hours:
+                break
+            due = (int(due) // 3600 + 1) * 3600
+        return due
+
+    def record_poll(self, feed_url, items, hints=None, max_age=None, now=None):
+        """
+        Record a successful poll (items=[] for 304 Not Modified) and
+        compute the next due time
+        """
+        now = time.time() if now is None else now
+        hints = hints or {}
+        entry = self.state.setdefault(feed_url, {'interval': self.min_interval, 'seen': []})
+
+        seen = entry.get('seen', [])
+        keys = [_item_key(item) for item in items]
+        new_count = sum(1 for key in keys if key not in seen)
+        if keys:
+            entry['seen'] = (keys + [key for key in seen if key not in keys])[:SEEN_KEYS_PER_FEED]
+
+        interval = entry.get('interval', self.min_interval)
+        if new_count and seen:
+            # 观测到的更新间隔（两次发现新条目之间的时间）做滑动平均，取一半作为轮询间隔
+            last_new = entry.get('last_new')
+            if last_new:
+                gap = now - last_new
+                avg_gap = entry.get('avg_gap')
+                avg_gap = gap if avg_gap is None else (1 - EWMA_ALPHA) * avg_gap + EWMA_ALPHA * gap
+                entry['avg_gap'] = avg_gap
+                interval = avg_gap / 2
+            else:
+                interval = self.min_interval
+        elif seen:
+            interval = interval * BACKOFF_FACTOR
+        # 首次抓取（seen 为空）：保持最小间隔，先建立基线
+
+        if new_count:
+            entry['last_new'] = int(now)
+
+        # 发布方提示：不早于 ttl / max-age 再次抓取
+        ttl_minutes = hints.get('ttl')
+        if ttl_minutes:
+            interval = max(interval, ttl_minutes * 60)
+        if max_age:
+            interval = max(interval, max_age)
+
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        entry['interval'] = int(interval)
+        entry['last_polled'] = int(now)
+        entry['next_due'] = int(self._skip_forward(now + interval, hints.get('skip_hours')))
+        return new_count
+
+    def get_summary(self, total_feeds, due_count):
+        return f"Scheduler: {due_count}/{total_feeds} feeds due this run"
@@ -3,18 +3,30 @@ TrendFetcher - 热点数据抓取器
 
 策略优化版本：
 1. 优先使用 RSS 源（最稳定，不易封禁）
-2. 多 RSSHub 实例备份（主实例失败自动切换）
+2. 多 RSSHub 镜像池（并行探测，按延迟/错误率选择最优镜像）
 3. 请求重试机制（失败自动重试）
-4. 随机延迟和 User-Agent 轮换
-5. 预热请求（防止冷启动超时）
+4. 按 host 令牌桶限速（带抖动，遵守 Retry-After）和 User-Agent 轮换
+5. 后台预热（防止冷启动超时，不阻塞构造和直连源）
+6. RSS 源并发抓取（全局 + 单 host 并发上限）
+7. 运行时间预算：超时未完成的源被取消，已抓到的结果照常返回
 """
-import requests
-from bs4 import BeautifulSoup
+import httpx
+import asyncio
 import os
 import random
-import time
 import logging
-import html
+from urllib.parse import urlsplit
+
+from async_fetcher import AsyncFetchEngine
+from conditional_get import ValidatorStore
+from feed_parser import FeedStreamParser, DEFAULT_ITEM_LIMIT
+from http_client import get_client
+from mirror_pool import MirrorPool
+from rate_limiter import HostRateLimiter
+from feed_scheduler import FeedScheduler, parse_max_age
+from circuit_breaker import CircuitBreakerStore
+from config_loader import ScrapingConfig
+from deadline import RunDeadline
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +39,17 @@ USER_AGENTS = [
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
 ]
 
-# 备用 RSSHub 镜像列表（主实例失败时使用）
+# 配置文件中的 RSSHub 地址，请求时替换为镜像池中的最优镜像
+RSSHUB_PLACEHOLDER = "https://rsshub.app"
+
+# 单个 RSSHub 源最多尝试的镜像数
+MAX_MIRROR_ATTEMPTS = 3
+
+# 普通请求超时 / 熔断器半开探测的超时（探测只尝试一次）
+RSS_TIMEOUT = 30
+PROBE_TIMEOUT = 10
+
+# 备用 RSSHub 镜像列表（与主实例一起组成镜像池）
 BACKUP_RSSHUB_MIRRORS = [
     "https://rsshub.rssforever.com",
     "https://rsshub.feedly.com", 
@@ -36,17 +58,56 @@ BACKUP_RSSHUB_MIRRORS = [
 ]
 
 
+class FetchError(Exception):
+    """请求失败；status 为最后一次的 HTTP 状态码（网络错误时为 None）"""
+    
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
 class TrendFetcher:
-    def __init__(self):
+    def __init__(self, config=None, deadline=None):
+        self.config = config or ScrapingConfig()
+        # 整次运行的时间预算（抓取阶段为推送预留时间）
+        self.deadline = deadline or RunDeadline()
         # 主 RSSHub 实例
-        self.rsshub_url = os.getenv('RSSHUB_URL', 'https://rsshub.app')
-        self.backup_mirrors = BACKUP_RSSHUB_MIRRORS
-        self.current_mirror_index = 0
-        self.rsshub_healthy = True
-        logger.info(f"Primary RSSHub: {self.rsshub_url}")
+        self.rsshub_url = os.getenv('RSSHUB_URL', RSSHUB_PLACEHOLDER)
+        self.mirror_pool = MirrorPool([self.rsshub_url] + BACKUP_RSSHUB_MIRRORS)
+        self._success_count = 0
+        self._fail_count = 0
+        self._not_modified_count = 0
+        # 本次运行失败 / 被熔断跳过的源名称，供 MetricsTracker 记录
+        self.failed_feeds = {}
+        self.skipped_feeds = []
+        # 返回 304 的源（抓取成功，没有新条目）
+        self.not_modified_feeds = []
+        # 自适应轮询判定未到期、本次没有请求的源
+        self.not_due_feeds = []
+        # 时间预算用尽时被取消的源
+        self.cut_off_feeds = []
+        
+        # ETag / Last-Modified 记录（条件请求，未变化的源返回 304）
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.validator_store = ValidatorStore(os.path.join(project_root, 'data', 'feed_validators.json'))
+        
+        # 自适应轮询：只抓取到期的源（FETCH_ALL_FEEDS=1 或配置关闭时抓取全部）
+        self.scheduler = None
+        if self.config.get_scheduler_settings().get('enabled', True) and os.getenv('FETCH_ALL_FEEDS') != '1':
+            self.scheduler = FeedScheduler.from_config(
+                self.config, os.path.join(project_root, 'data', 'feed_schedule.json')
+            )
+        # 按源 / 按 host 的熔断器，跨运行持久化
+        self.circuit_breakers = CircuitBreakerStore.from_config(
+            self.config, os.path.join(project_root, 'data', 'circuit_breakers.json')
+        )
         
-        # 预热请求（唤醒可能休眠的实例）
-        self._warmup_rsshub()
+        # 按 host 限速，跨多次抓取共享（守护进程中也保持状态）
+        self.rate_limiter = HostRateLimiter.from_config(self.config)
+        
+        # 后台预热任务（抓取开始时按需启动，构造时不发任何请求）
+        self._warmup_task = None
+        logger.info(f"Primary RSSHub: {self.rsshub_url}")
     
     def _get_headers(self):
         """获取随机 User-Agent 的请求头"""
@@ -56,75 +117,68 @@ class TrendFetcher:
             'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
         }
     
-    def _random_delay(self, min_sec=0.5, max_sec=1.5):
-        """添加随机延迟，降低封禁风险"""
-        delay = random.uniform(min_sec, max_sec)
-        time.sleep(delay)
-    
-    def _warmup_rsshub(self):
-        """预热 RSSHub 实例（防止冷启动超时）"""
+    async def _warmup_rsshub(self, engine):
+        """预热 RSSHub：并行探测所有镜像（同时唤醒可能休眠的主实例）"""
+        logger.info("Probing RSSHub mirrors in background...")
         try:
-            logger.info("Warming up RSSHub instance...")
-            response = requests.get(
-                self.rsshub_url,
-                headers=self._get_headers(),
-                timeout=60  # 冷启动可能需要较长时间
-            )
-            if response.status_code == 200:
-                logger.info("RSSHub warmup successful")
-                self.rsshub_healthy = True
-            else:
-                logger.warning(f"RSSHub warmup returned {response.status_code}")
-                self.rsshub_healthy = False
+            await self.mirror_pool.probe_all(engine.client, headers=self._get_headers())
         except Exception as e:
             logger.warning(f"RSSHub warmup failed: {e}")
-            self.rsshub_healthy = False
     
-    def _get_rsshub_url(self):
-        """获取当前可用的 RSSHub URL"""
-        if self.rsshub_healthy:
-            return self.rsshub_url
-        # 使用备用镜像
-        if self.current_mirror_index < len(self.backup_mirrors):
-            return self.backup_mirrors[self.current_mirror_index]
-        return self.rsshub_url
+    def _start_warmup(self, engine, feeds):
+        """只有存在 RSSHub 源时才启动后台预热，与直连源和 B站 API 并行"""
+        if any(url.startswith(RSSHUB_PLACEHOLDER) for _, url in feeds):
+            self._warmup_task = asyncio.ensure_future(self._warmup_rsshub(engine))
     
-    def _switch_to_backup(self):
-        """切换到下一个备用镜像"""
-        self.rsshub_healthy = False
-        if self.current_mirror_index < len(self.backup_mirrors) - 1:
-            self.current_mirror_index += 1
-            logger.info(f"Switching to backup mirror: {self.backup_mirrors[self.current_mirror_index]}")
+    async def _stop_warmup(self):
+        """取消仍在进行的预热（例如某个镜像探测迟迟不返回）"""
+        task, self._warmup_task = self._warmup_task, None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
     
-    def _request_with_retry(self, url, max_retries=3, timeout=30):
-        """带重试的请求"""
+    async def _request_with_retry(self, engine, url, max_retries=3, timeout=30, extra_headers=None, stream_to=None):
+        """带重试的请求（异步，受引擎并发上限约束），200 和 304 视为成功"""
         last_error = None
+        last_status = None
         for attempt in range(max_retries):
             try:
-                response = requests.get(
+                headers = self._get_headers()
+                if extra_headers:
+                    headers.update(extra_headers)
+                response = await engine.get(
                     url,
-                    headers=self._get_headers(),
-                    timeout=timeout
+                    headers=headers,
+                    timeout=self.deadline.cap(timeout, fetch=True),
+                    stream_to=stream_to
                 )
-                if response.status_code == 200:
+                if response.status_code in (200, 304):
                     return response
                 else:
                     logger.warning(f"Request returned {response.status_code}, attempt {attempt + 1}/{max_retries}")
-            except requests.exceptions.Timeout:
+                    last_error = f"HTTP {response.status_code}"
+                    last_status = response.status_code
+            except httpx.TimeoutException:
                 logger.warning(f"Request timeout, attempt {attempt + 1}/{max_retries}")
                 last_error = "Timeout"
-            except requests.exceptions.ConnectionError:
+                last_status = None
+            except httpx.ConnectError:
                 logger.warning(f"Connection error, attempt {attempt + 1}/{max_retries}")
                 last_error = "ConnectionError"
+                last_status = None
             except Exception as e:
                 logger.warning(f"Request error: {e}, attempt {attempt + 1}/{max_retries}")
                 last_error = str(e)
             
-            # 重试前等待
-            if attempt < max_retries - 1:
-                time.sleep(2 * (attempt + 1))
+            # 重试前等待（只挂起当前源，不阻塞其他源）；
+            # 429/503 的 Retry-After 已由限速器对整个 host 生效，无需再等
+            if attempt < max_retries - 1 and last_status not in (429, 503):
+                await asyncio.sleep(2 * (attempt + 1))
         
-        raise Exception(f"All {max_retries} attempts failed: {last_error}")
+        raise FetchError(f"All {max_retries} attempts failed: {last_error}", status=last_status)
     
     # ===== 稳定的 API 平台 =====
     
@@ -132,7 +186,7 @@ class TrendFetcher:
         """获取 B站热门视频 - 使用官方 API，稳定可靠"""
         url = "https://api.bilibili.com/x/web-interface/ranking/v2?rid=0&type=all"
         try:
-            response = requests.get(url, headers=self._get_headers(), timeout=15)
+            response = get_client().get(url, headers=self._get_headers(), timeout=self.deadline.cap(15, fetch=True))
             data = response.json()
             trends = []
             if data.get('data') and data['data'].get('list'):
@@ -148,52 +202,70 @@ class TrendFetcher:
     
     # ===== RSS 源（最稳定）=====
     
-    def _fetch_single_rss(self, name, url, use_backup=False):
-        """获取单个 RSS 源，支持重试和备用镜像"""
-        # 替换 rsshub.app 为当前实例
-        current_rsshub = self._get_rsshub_url()
-        if 'rsshub.app' in url:
-            url = url.replace('https://rsshub.app', current_rsshub)
+    async def _fetch_from(self, engine, name, feed_url, request_url, max_retries, timeout=RSS_TIMEOUT):
+        """
+        请求并解析一个源，返回 (trends, response)
         
-        try:
-            response = self._request_with_retry(url, max_retries=2, timeout=30)
-            
-            soup = BeautifulSoup(response.content, 'xml')
-            items = soup.find_all('item')
-            if not items:
-                items = soup.find_all('entry')
-            
-            trends = []
-            for item in items[:10]:
-                title_tag = item.find('title')
-                link_tag = item.find('link')
-                
-                if title_tag:
-                    title = html.unescape(title_tag.get_text().strip())
-                    link = ''
-                    if link_tag:
-                        link = link_tag.get_text().strip() if link_tag.string else link_tag.get('href', '')
-                    
-                    if title:
-                        trends.append({'title': title, 'url': link})
-            
+        条件请求以配置中的源 URL 为键，与实际使用的镜像无关
+        """
+        # 边下载边解析，取满条数后停止读取
+        parser = FeedStreamParser(limit=DEFAULT_ITEM_LIMIT)
+        response = await self._request_with_retry(
+            engine, request_url, max_retries=max_retries, timeout=timeout,
+            extra_headers=self.validator_store.get_headers(feed_url),
+            stream_to=parser
+        )
+        max_age = parse_max_age(response.headers.get('Cache-Control'))
+        if response.status_code == 304:
+            # 自上次抓取后未变化：没有新条目，跳过解析
+            self._not_modified_count += 1
+            self.not_modified_feeds.append(name)
+            logger.debug(f"RSS {name}: not modified")
+            if self.scheduler:
+                self.scheduler.record_poll(feed_url, [], max_age=max_age)
+            return [], response
+        
+        trends = parser.finish()
+        self.validator_store.update(feed_url, response.headers)
+        if self.scheduler:
+            self.scheduler.record_poll(feed_url, trends, hints=parser.hints, max_age=max_age)
+        return trends, response
+    
+    async def _fetch_single_rss(self, engine, name, url, probe=False):
+        """获取单个 RSS 源，支持重试、镜像池和条件请求；probe=True 时只做一次短超时探测"""
+        max_retries = 1 if probe else 2
+        timeout = PROBE_TIMEOUT if probe else RSS_TIMEOUT
+        if not url.startswith(RSSHUB_PLACEHOLDER):
+            trends, _ = await self._fetch_from(engine, name, url, url, max_retries=max_retries, timeout=timeout)
             return trends
-            
-        except Exception as e:
-            # 如果主实例失败且还没尝试备用，切换到备用镜像重试
-            if not use_backup and 'rsshub' in url.lower():
-                self._switch_to_backup()
-                return self._fetch_single_rss(name, url.replace(current_rsshub, 'https://rsshub.app'), use_backup=True)
-            raise e
+        
+        # RSSHub 源：等到预热找到可用镜像（不必等所有探测结束）
+        await self.mirror_pool.wait_ready()
+        
+        # 每次选当前最优镜像，失败立即换下一个，不再整轮重试
+        tried = []
+        last_error = None
+        for _ in range(1 if probe else MAX_MIRROR_ATTEMPTS):
+            mirror = self.mirror_pool.best(exclude=tried)
+            if mirror is None:
+                break
+            tried.append(mirror)
+            request_url = mirror + url[len(RSSHUB_PLACEHOLDER):]
+            try:
+                trends, response = await self._fetch_from(engine, name, url, request_url, max_retries=1, timeout=timeout)
+                self.mirror_pool.record_success(mirror, response.elapsed.total_seconds())
+                return trends
+            except FetchError as e:
+                last_error = e
+                # 4xx 通常是路由问题而不是镜像故障，不计入镜像得分
+                if e.status is None or e.status >= 500 or e.status == 429:
+                    self.mirror_pool.record_failure(mirror)
+                logger.info(f"RSS {name} failed on {mirror}, trying next mirror")
+        
+        raise last_error or FetchError("No RSSHub mirror available")
     
-    def fetch_rss_feeds(self):
-        """
-        从配置文件获取 RSS 源
-        增强版本：
-        - 自动重试失败请求
-        - 主实例失败自动切换备用镜像
-        - 更长的超时时间
-        """
+    def _load_rss_feeds(self):
+        """读取 config/rss_feeds.txt，返回已启用的 (name, url) 列表"""
         config_file = os.path.join(
             os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
             'config', 'rss_feeds.txt'
@@ -201,13 +273,9 @@ class TrendFetcher:
         
         if not os.path.exists(config_file):
             logger.warning("RSS config file not found")
-            return {}
-        
-        results = {}
-        success_count = 0
-        fail_count = 0
-        consecutive_failures = 0
+            return []
         
+        feeds = []
         try:
             with open(config_file, 'r', encoding='utf-8') as f:
                 lines = [l.strip() for l in f if l.strip() and not l.startswith('#')]
@@ -221,76 +289,174 @@ class TrendFetcher:
                 url = parts[1].strip()
                 enabled = parts[2].strip().lower()
                 
-                if enabled != 'true':
-                    continue
-                
-                # 如果连续失败超过 5 次，可能是网络问题，尝试切换镜像
-                if consecutive_failures >= 5:
-                    logger.warning("Too many consecutive failures, switching mirror...")
-                    self._switch_to_backup()
-                    consecutive_failures = 0
-                
-                try:
-                    # 随机延迟，避免高频请求
-                    self._random_delay(0.5, 1.5)
-                    
-                    trends = self._fetch_single_rss(name, url)
-                    
-                    if trends:
-                        results[name] = trends
-                        success_count += 1
-                        consecutive_failures = 0
-                        logger.info(f"RSS {name}: {len(trends)} items")
-                        
-                except Exception as e:
-                    fail_count += 1
-                    consecutive_failures += 1
-                    logger.warning(f"RSS {name} failed: {str(e)[:50]}")
-                    continue
-                    
+                if enabled == 'true':
+                    feeds.append((name, url))
         except Exception as e:
             logger.error(f"Failed to read RSS config: {e}")
         
-        logger.info(f"RSS complete: {success_count} success, {fail_count} failed")
+        return feeds
+    
+    def _breaker_keys(self, url):
+        """熔断器 key：每个源一个；非 RSSHub 源再加所在 host（RSSHub 由镜像池处理）"""
+        feed_key = f"feed:{url}"
+        host_key = None
+        if not url.startswith(RSSHUB_PLACEHOLDER):
+            host_key = f"host:{urlsplit(url).netloc.lower()}"
+        return feed_key, host_key
+    
+    async def _fetch_feed_task(self, engine, name, url):
+        """单个源的抓取任务：熔断检查 + 抓取 + 统计（限速由引擎按 host 处理）"""
+        feed_key, host_key = self._breaker_keys(url)
+        allowed, probe = self.circuit_breakers.try_acquire(feed_key, host_key)
+        if not allowed:
+            # 熔断中：直接跳过，不发请求
+            self.skipped_feeds.append(name)
+            logger.debug(f"RSS {name}: circuit open, skipped")
+            return []
+        if probe:
+            logger.info(f"RSS {name}: half-open probe")
+        
+        try:
+            trends = await self._fetch_single_rss(engine, name, url, probe=probe)
+        except Exception as e:
+            self._fail_count += 1
+            self.failed_feeds[name] = str(e)[:100]
+            self.circuit_breakers.record_failure(feed_key, e)
+            # 只有网络错误 / 5xx / 429 才算 host 故障，4xx 是单个源的问题
+            status = getattr(e, 'status', None)
+            if status is None or status >= 500 or status == 429:
+                self.circuit_breakers.record_failure(host_key, e)
+            raise
+        
+        self.circuit_breakers.record_success(feed_key)
+        self.circuit_breakers.record_success(host_key)
+        if trends:
+            self._success_count += 1
+            logger.info(f"RSS {name}: {len(trends)} items")
+        return trends
+    
+    async def _fetch_rss_feeds_async(self, engine, feeds):
+        """在已打开的引擎中并发抓取到期的 RSS 源，RSSHub 预热在后台进行"""
+        self._success_count = 0
+        self._fail_count = 0
+        self._not_modified_count = 0
+        self.failed_feeds = {}
+        self.skipped_feeds = []
+        self.not_modified_feeds = []
+        self.not_due_feeds = []
+        self.cut_off_feeds = []
+        
+        due_feeds = feeds
+        if self.scheduler:
+            due_feeds = self.scheduler.due_feeds(feeds)
+            due = set(due_feeds)
+            self.not_due_feeds = [name for name, url in feeds if (name, url) not in due]
+            logger.info(self.scheduler.get_summary(len(feeds), len(due_feeds)))
+        
+        self._start_warmup(engine, due_feeds)
+        try:
+            results, self.cut_off_feeds = await engine.gather(
+                due_feeds, self._fetch_feed_task, timeout=self.deadline.fetch_remaining()
+            )
+        finally:
+            await self._stop_warmup()
+        
+        self.validator_store.prune(url for _, url in feeds)
+        self.validator_store.save()
+        if self.scheduler:
+            self.scheduler.save(url for _, url in feeds)
+        self.circuit_breakers.save()
+        
+        logger.info(
+            f"RSS complete: {self._success_count} success, "
+            f"{self._not_modified_count} not modified, {self._fail_count} failed, "
+            f"{len(self.skipped_feeds)} skipped (circuit open), "
+            f"{len(self.cut_off_feeds)} cut off (deadline)"
+        )
+        logger.info(f"RSSHub mirrors: {self.mirror_pool.get_summary()}")
         return results
     
+    def _create_engine(self):
+        max_concurrency, per_host_limit = self.config.get_concurrency()
+        return AsyncFetchEngine(
+            max_concurrency=max_concurrency,
+            per_host_limit=per_host_limit,
+            rate_limiter=self.rate_limiter
+        )
+    
+    async def _fetch_rss_only(self, feeds):
+        async with self._create_engine() as engine:
+            return await self._fetch_rss_feeds_async(engine, feeds)
+    
+    def fetch_rss_feeds(self):
+        """
+        从配置文件获取 RSS 源
+        增强版本：
+        - 并发抓取（全局并发上限 + 单 host 并发上限）
+        - 自动重试失败请求
+        - RSSHub 源按镜像池得分选择镜像，失败立即切换
+        - 条件请求（ETag / Last-Modified），未变化的源直接跳过
+        - 自适应轮询，只抓取到期的源
+        - 熔断器：持续失败的源 / host 直接跳过，冷却后单次探测
+        - 时间预算：到点取消未完成的源，返回已抓到的结果
+        - 更长的超时时间
+        """
+        feeds = self._load_rss_feeds()
+        if not feeds:
+            return {}
+        return asyncio.run(self._fetch_rss_only(feeds))
+    
     # ===== 聚合器 =====
     
+    async def _fetch_all_async(self, feeds):
+        """B站 API、直连 RSS 源和 RSSHub 预热同时进行"""
+        async with self._create_engine() as engine:
+            bilibili_task = asyncio.ensure_future(asyncio.to_thread(self.fetch_bilibili))
+            rss_data = {}
+            if feeds:
+                try:
+                    rss_data = await self._fetch_rss_feeds_async(engine, feeds)
+                except Exception as e:
+                    logger.error(f"RSS failed: {e}")
+            try:
+                # 线程无法取消，但请求超时已按剩余时间收紧
+                bilibili_data = await asyncio.wait_for(
+                    asyncio.shield(bilibili_task), self.deadline.fetch_remaining()
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Bilibili cut off by run deadline")
+                self.cut_off_feeds.append('B站')
+                bilibili_data = []
+        return bilibili_data, rss_data
+    
     def fetch_all(self):
         """
         获取所有热点数据
         
         增强策略：
-        1. 预热 RSSHub 实例（防止冷启动）
+        1. RSSHub 预热在后台进行，只有 RSSHub 源需要等待
         2. RSS 源优先（最稳定）
-        3. 自动重试和备用镜像切换
-        4. B站官方 API 作为补充
+        3. 自动重试和镜像池切换
+        4. B站官方 API 作为补充，与 RSS 并行
         """
         results = {}
         
         logger.info("=" * 50)
         logger.info("Starting data fetch...")
         logger.info(f"Primary RSSHub: {self.rsshub_url}")
-        logger.info(f"RSSHub healthy: {self.rsshub_healthy}")
         logger.info("=" * 50)
         
-        # 1. 获取 B站数据（官方 API，非常稳定）
-        try:
-            self._random_delay(0.5, 1)
-            bilibili_data = self.fetch_bilibili()
-            if bilibili_data:
-                results['B站'] = bilibili_data
-                logger.info(f"Bilibili: {len(bilibili_data)} items")
-        except Exception as e:
-            logger.error(f"Bilibili failed: {e}")
+        feeds = self._load_rss_feeds()
+        bilibili_data, rss_data = asyncio.run(self._fetch_all_async(feeds))
         
-        # 2. 获取 RSS 源数据（带重试和备用镜像）
-        try:
-            rss_data = self.fetch_rss_feeds()
-            if rss_data:
-                results.update(rss_data)
-        except Exception as e:
-            logger.error(f"RSS failed: {e}")
+        # 1. B站数据（官方 API，非常稳定）
+        if bilibili_data:
+            results['B站'] = bilibili_data
+            logger.info(f"Bilibili: {len(bilibili_data)} items")
+        
+        # 2. RSS 源数据（带重试和镜像池）
+        if rss_data:
+            results.update(rss_data)
         
         logger.info("=" * 50)
         logger.info(f"Total: {len(results)} sources fetched")
@@ -0,0 +1,103 @@
+"""
+Shared Telegram message formatting
+
+推送消息和每日汇总共用同一套转义和渲染：
+- 每种格式一张转义表（有序的需转义字符），标题只转义一次
+- 条目片段不缓存：一次运行中几乎每个条目只渲染一次，lru_cache 未命中时
+  对参数求哈希、维护链表的开销比转义本身还大（见 benchmarks/bench_formatting.py）
+- 消息用列表收集片段后 join，不再反复 += 拼接
+- 同一组片段可渲染为 Markdown（旧版）、MarkdownV2 和纯文本，
+  纯文本回退直接使用预先渲染的文本，不再用正则解析 Markdown
+"""
+MARKDOWN = 'Markdown'
+MARKDOWN_V2 = 'MarkdownV2'
+PLAIN = 'plain'
+
+# 每张表是需要转义的字符，按顺序替换（\ 必须最先）。
+# 用 str.replace 而不是 str.translate：translate 逐字符查表，对中文标题慢 3~5 倍；
+# 字符不在文本中时直接跳过，不产生新字符串
+# 旧版 Markdown：链接文字中转义 \ [ ]；普通文字中转义 _ * ` [
+_MARKDOWN_LINK_TEXT = '\\[]'
+_MARKDOWN_TEXT = '\\_*`['
+# MarkdownV2：所有保留字符都要转义；链接地址中只转义 ) 和 \
+_MARKDOWN_V2_TEXT = '\\_*[]()~`>#+-=|{}.!'
+_MARKDOWN_V2_URL = '\\)'
+
+_TEXT_TABLES = {MARKDOWN: _MARKDOWN_TEXT, MARKDOWN_V2: _MARKDOWN_V2_TEXT}
+_LINK_TEXT_TABLES = {MARKDOWN: _MARKDOWN_LINK_TEXT, MARKDOWN_V2: _MARKDOWN_V2_TEXT}
+
+
+def _escape_chars(text, chars):
+    for char in chars:
+        if char in text:
+            text = text.replace(char, '\\' + char)
+    return text
+
+
+def escape(text, mode=MARKDOWN):
+    """Escape plain text for the given parse mode"""
+    chars = _TEXT_TABLES.get(mode)
+    return _escape_chars(text, chars) if chars else text
+
+
+def link(title, url, mode=MARKDOWN):
+    """A titled link; plain text puts the URL on its own line"""
+    if mode == PLAIN:
+        return f"{title}\n{url}"
+    if mode == MARKDOWN_V2:
+        url = _escape_chars(url, _MARKDOWN_V2_URL)
+    return f"[{_escape_chars(title, _LINK_TEXT_TABLES[mode])}]({url})"
+
+
+def entry(title, url, note='', mode=MARKDOWN):
+    """Link plus an optional note (e.g. source platforms), without the number"""
+    if mode == PLAIN:
+        return f"{title}\n{url}{note}"
+    return link(title, url, mode) + (escape(note, mode) if note else '')
+
+
+def numbered(number, fragment, mode=MARKDOWN):
+    """Prefix a fragment with "N. " ('.' must be escaped in MarkdownV2)"""
+    return f"{number}\\. {fragment}" if mode == MARKDOWN_V2 else f"{number}. {fragment}"
+
+
+def italic(text, mode=MARKDOWN):
+    if mode == PLAIN:
+        return text
+    return f"_{escape(text, mode)}_"
+
+
+def render_entries(entries, mode=MARKDOWN, separator='\n\n', start=1):
+    """Numbered entries [(title, url, note), ...] joined into one string"""
+    if mode == PLAIN:
+        # 纯文本没有转义，直接拼接
+        return separator.join(
+            f"{number}. {title}\n{url}{note}" for number, (title, url, note) in enumerate(entries, start)
+        )
+    return separator.join(
+        numbered(number, entry(title, url, note, mode), mode)
+        for number, (title, url, note) in enumerate(entries, start)
+    )
+
+
+def message_payload(text, plain=None, parse_mode=MARKDOWN):
+    """One message part as queued for delivery, with its pre-rendered plain-text fallback"""
+    return {'text': text, 'parse_mode': parse_mode, 'plain': plain}
+
+
+def split_lines(text, max_length):
+    """Split text on line boundaries into chunks of at most max_length (a longer single line stays whole)"""
+    if len(text) <= max_length:
+        return [text]
+
+    chunks = []
+    lines, length = [], 0
+    for line in text.split('\n'):
+        if lines and length + len(line) + 1 > max_length:
+            chunks.append('\n'.join(lines) + '\n')
+            lines, length = [], 0
+        lines.append(line)
+        length += len(line) + 1
+    if lines:
+        chunks.append('\n'.join(lines) + '\n')
+    return chunks
@@ -1,24 +1,99 @@
 import json
 import os
+import sys
 import logging
-from datetime import datetime, timedelta
+import time
+
+from records import HistoryRecord
+from seen_filter import SeenFilter
+from url_canon import canonicalize_url
 
 logger = logging.getLogger(__name__)
 
-class HistoryManager:
-    def __init__(self, history_file='data/history.json', max_items=2000):
+# 各存储后端在 data/ 下的默认文件名
+HISTORY_FILES = {
+    'json': 'history.json',
+    'sqlite': 'history.db',
+    'journal': 'history.jsonl',
+    'sharded': 'history',
+}
+
+
+def normalize_url(url):
+    """Loose URL key for dedup: the canonical form under the default rules (see url_canon)"""
+    return canonicalize_url(url)
+
+
+def canonical_key(url, canonical_url=None):
+    """Dedup key of a URL: the canonical URL computed at ingest (url_canon), else the default-rules form"""
+    return canonical_url or normalize_url(url)
+
+
+def record_canonical_url(record):
+    """canonical_url stored with a history record (kept in its extra fields), if any"""
+    return record.extra.get('canonical_url') if record.extra else None
+
+
+def seen_keys(url, guid=None, canonical_url=None):
+    """Keys stored in the long-horizon seen filter for one record"""
+    keys = ['n:' + canonical_key(url, canonical_url)]
+    if guid:
+        keys.append('g:' + guid)
+    return keys
+
+
+def _index_keys(url, guid=None, canonical_url=None):
+    """Index keys of one record: exact URL, canonical URL and guid"""
+    keys = [('url', url), ('norm', canonical_key(url, canonical_url))]
+    if guid:
+        keys.append(('guid', guid))
+    return keys
+
+
+class HistoryIndex:
+    """Hash index over exact URL, canonical URL and guid of history records"""
+
+    def __init__(self, records=()):
+        # key -> 引用计数（同一 key 可能对应多条历史记录）
+        self._keys = {}
+        for item in records:
+            self.add(item)
+
+    def add(self, record):
+        for key in _index_keys(record.url, record.guid, record_canonical_url(record)):
+            self._keys[key] = self._keys.get(key, 0) + 1
+
+    def remove(self, record):
+        for key in _index_keys(record.url, record.guid, record_canonical_url(record)):
+            count = self._keys.get(key, 0) - 1
+            if count > 0:
+                self._keys[key] = count
+            else:
+                self._keys.pop(key, None)
+
+    def contains(self, url, guid=None, canonical_url=None):
+        keys = self._keys
+        if ('url', url) in keys or ('norm', canonical_key(url, canonical_url)) in keys:
+            return True
+        return bool(guid) and ('guid', guid) in keys
+
+
+class JsonHistoryStore:
+    """Whole history as one JSON array (default; shared with go-fetcher and committed by the workflows)"""
+
+    def __init__(self, history_file):
         self.history_file = history_file
-        self.max_items = max_items
-        self.history = self._load_history()
+        self.records = self._load_history()
+        self._index = HistoryIndex(self.records)
 
     def _load_history(self):
         """Load history from file and migrate if necessary"""
         # Ensure data directory exists
         os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
-        
+
         if not os.path.exists(self.history_file):
             return []
-        
+
         try:
             with open(self.history_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
@@ -30,77 +105,210 @@ class HistoryManager:
             return []
 
     def _migrate_data(self, data):
-        """Migrate old string-only history to object format"""
+        """Migrate old string-only history and object dicts to HistoryRecord"""
         migrated = []
-        now = datetime.now().isoformat()
-        
+        now = time.time()
+
         for item in data:
             if isinstance(item, str):
                 # Old format: just URL
-                migrated.append({
-                    'url': item,
-                    'title': 'Unknown Title',
-                    'platform': 'unknown',
-                    'timestamp': now
-                })
+                migrated.append(HistoryRecord('Unknown Title', item, now, platform='unknown'))
             elif isinstance(item, dict):
                 # New format
-                migrated.append(item)
-                
+                migrated.append(HistoryRecord.from_dict(item, default_ts=now))
+
         return migrated
 
+    def contains(self, url, guid=None, canonical_url=None):
+        return self._index.contains(url, guid, canonical_url)
+
+    def append(self, record):
+        self.records.append(record)
+        self._index.add(record)
+
+    def trim(self, max_items):
+        """Keep only the last max_items records"""
+        if len(self.records) > max_items:
+            for record in self.records[:-max_items]:
+                self._index.remove(record)
+            self.records = self.records[-max_items:]
+
+    def remove_before(self, cutoff):
+        """Drop records at or before `cutoff` (epoch seconds); returns how many"""
+        kept = []
+        removed = 0
+        for record in self.records:
+            if record.ts > cutoff:
+                kept.append(record)
+            else:
+                self._index.remove(record)
+                removed += 1
+        self.records = kept
+        return removed
+
+    def since(self, cutoff):
+        """Records newer than `cutoff` (epoch seconds), oldest first"""
+        return [record for record in self.records if record.ts > cutoff]
+
+    def save(self):
+        with open(self.history_file, 'w', encoding='utf-8') as f:
+            json.dump([record.to_dict() for record in self.records], f, ensure_ascii=False, indent=2)
+
+    def close(self):
+        pass
+
+
+def create_history_store(history_file, backend='json', migrate_from=None):
+    """Open the storage backend for `history_file`"""
+    if backend == 'json':
+        return JsonHistoryStore(history_file)
+    if backend == 'sqlite':
+        from history_sqlite import SqliteHistoryStore
+        return SqliteHistoryStore(history_file, migrate_from=migrate_from)
+    if backend == 'journal':
+        from history_journal import JournalHistoryStore
+        return JournalHistoryStore(history_file, migrate_from=migrate_from)
+    if backend == 'sharded':
+        from history_shards import ShardedHistoryStore
+        return ShardedHistoryStore(history_file, migrate_from=migrate_from)
+    raise ValueError(f"Unknown history backend: {backend}")
+
+
+class HistoryManager:
+    def __init__(self, history_file='data/history.json', max_items=2000, backend='json', migrate_from=None,
+                 seen_filter=None):
+        self.history_file = history_file
+        # max_items=0 表示不限制条数（只靠 clean_old 清理）
+        self.max_items = max_items
+        self.store = create_history_store(history_file, backend, migrate_from)
+        # 长期去重记忆（seen_filter.SeenFilter），记住早已被截断 / 清理的记录
+        self.seen_filter = seen_filter
+        self.long_horizon_hits = 0
+        if seen_filter is not None:
+            self._sync_seen_filter()
+        # 加载后重新应用条数上限（上限调低、或文件由其他程序写入时）
+        if max_items:
+            self.store.trim(max_items)
+
+    def _sync_seen_filter(self):
+        """
+        Make sure every history record is in the seen filter
+
+        history.json is also written by go-fetcher, so records held in memory
+        are re-checked on every start (keys already present are skipped).
+        Other backends are only written through HistoryManager and are copied
+        once, when the filter is created.
+        """
+        records = getattr(self.store, 'records', None)
+        if records is None:
+            if not self.seen_filter.is_new:
+                return
+            records = self.store.since(0)
+        for record in records:
+            for key in seen_keys(record.url, record.guid, record_canonical_url(record)):
+                self.seen_filter.add(key)
+
+    @classmethod
+    def from_config(cls, config, data_dir):
+        """
+        Build from the "history" section of ScrapingConfig
+
+        HISTORY_BACKEND overrides the configured backend. A new SQLite
+        database, journal or shard directory is seeded once from the JSON
+        history in the same directory.
+        """
+        settings = config.get_history_settings()
+        backend = os.getenv('HISTORY_BACKEND') or settings.get('backend', 'json')
+        if backend not in HISTORY_FILES:
+            logger.warning(f"Unknown history backend {backend}, using json")
+            backend = 'json'
+        return cls(
+            os.path.join(data_dir, HISTORY_FILES[backend]),
+            max_items=settings.get('max_items', 2000),
+            backend=backend,
+            migrate_from=os.path.join(data_dir, HISTORY_FILES['json']),
+            seen_filter=SeenFilter.from_config(config, os.path.join(data_dir, 'seen_filter'))
+        )
+
     def save_history(self):
         """Save history to file"""
         try:
             # Keep only the last max_items
-            if len(self.history) > self.max_items:
-                self.history = self.history[-self.max_items:]
-            
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, ensure_ascii=False, indent=2)
+            if self.max_items:
+                self.store.trim(self.max_items)
+            self.store.save()
+            if self.seen_filter is not None:
+                self.seen_filter.flush()
         except Exception as e:
             logger.error(f"Failed to save history: {e}")
 
-    def is_sent(self, url):
-        """Check if a URL has already been sent"""
-        return any(item['url'] == url for item in self.history)
+    def close(self):
+        """Release the storage backend (checkpoints the SQLite WAL)"""
+        self.store.close()
+        if self.seen_filter is not None:
+            logger.info(self.get_summary())
+            logger.info(self.seen_filter.get_summary())
+            self.seen_filter.close()
+
+    def get_stats(self):
+        """Items treated as sent only because of the seen filter, and its current false-positive rate"""
+        if self.seen_filter is None:
+            return {'filter_only_hits': 0, 'estimated_error_rate': 0}
+        return {
+            'filter_only_hits': self.long_horizon_hits,
+            'estimated_error_rate': self.seen_filter.estimated_error_rate()
+        }
+
+    def get_summary(self):
+        stats = self.get_stats()
+        return (
+            f"History: {stats['filter_only_hits']} items recognised only by the seen filter "
+            f"(each may be a false positive, est. rate {stats['estimated_error_rate']:.2e})"
+        )
 
-    def add(self, item):
-        """Add an item to history"""
+    def is_sent(self, url, guid=None, canonical_url=None):
+        """Check if a URL (or its canonical form, or the item's guid) has already been sent"""
+        if self.seen_filter is None:
+            return self.store.contains(url, guid, canonical_url)
+        # 先查布隆过滤器：没有假阴性，查不到即为新条目，无需再查精确索引
+        if not self.seen_filter.contains_any(seen_keys(url, guid, canonical_url)):
+            return False
+        if self.store.contains(url, guid, canonical_url):
+            return True
+        # 精确索引中已没有（超出 max_items 或已被 clean_old 清理），按长期记忆视为已发送；
+        # 也可能是布隆过滤器误判，逐条记录以便追查丢失的条目
+        self.long_horizon_hits += 1
+        logger.info(f"Seen filter only: treating {canonical_key(url, canonical_url)} as already sent")
+        return True
+
+    def add(self, item, platform=None):
+        """Add an item (fetched item dict, or a bare URL) to history"""
         if isinstance(item, str):
             # Backward compatibility
-            item = {
-                'url': item,
-                'title': 'Unknown Title',
-                'platform': 'unknown',
-                'timestamp': datetime.now().isoformat()
-            }
-            
-        if not self.is_sent(item['url']):
-            # Ensure timestamp exists
-            if 'timestamp' not in item:
-                item['timestamp'] = datetime.now().isoformat()
-            self.history.append(item)
+            record = HistoryRecord('Unknown Title', item, time.time(), platform='unknown')
+        else:
+            # 没有时间戳的条目记为当前时间
+            record = HistoryRecord.from_dict(item)
+            if platform and not record.platform:
+                record.platform = sys.intern(platform)
+
+        canonical_url = record_canonical_url(record)
+        if not self.is_sent(record.url, record.guid, canonical_url):
+            self.store.append(record)
+            if self.seen_filter is not None:
+                for key in seen_keys(record.url, record.guid, canonical_url):
+                    self.seen_filter.add(key)
 
     def clean_old(self, days=7):
         """Remove items older than N days"""
-        cutoff = datetime.now() - timedelta(days=days)
-        original_count = len(self.history)
-        
-        self.history = [
-            item for item in self.history 
-            if datetime.fromisoformat(item['timestamp']) > cutoff
-        ]
-        
-        removed = original_count - len(self.history)
+        cutoff = time.time() - days * 86400
+        removed = self.store.remove_before(cutoff)
+
         if removed > 0:
             logger.info(f"Cleaned {removed} old items from history")
             self.save_history()
 
     def get_recent(self, hours=24):
-        """Get items from the last N hours"""
-        cutoff = datetime.now() - timedelta(hours=hours)
-        return [
-            item for item in self.history 
-            if datetime.fromisoformat(item['timestamp']) > cutoff
-        ]
+        """Get records (HistoryRecord) from the last N hours"""
+        cutoff = time.time() - hours * 3600
+        return self.store.since(cutoff)
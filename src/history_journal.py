@@ -0,0 +1,124 @@
+"""
+Append-only JSONL history journal
+
+适合需要把历史文件提交到 git 的部署（工作流每次运行都会提交 data/ 下的历史）：
+- 每次 save 只把新增记录逐行追加到文件末尾，写入量与新条目数成正比
+- max_items 截断和 clean_old 删除的旧行留在文件里，但会追加一行标记
+  （{"_keep_last": N} / {"_cutoff": 秒}），加载时按顺序重放，被删除的记录不会复活
+- 当文件中的失效行超过一定比例时做一次压缩：原子地重写为当前记录
+  （写临时文件再 os.replace，中途崩溃不会损坏原文件）
+"""
+import json
+import os
+import logging
+
+from history import JsonHistoryStore, record_canonical_url
+
+logger = logging.getLogger(__name__)
+
+# 文件行数超过有效记录数的多少倍时压缩
+COMPACT_RATIO = 1.5
+# 失效行少于这个数时不压缩（避免小历史频繁重写）
+COMPACT_MIN_GARBAGE = 200
+
+# 截断 / 清理标记行的键
+KEEP_LAST = '_keep_last'
+CUTOFF = '_cutoff'
+
+
+class JournalHistoryStore(JsonHistoryStore):
+    """History as one JSON record per line; saves append, compaction rewrites"""
+
+    def __init__(self, journal_file, migrate_from=None):
+        # 待追加的行：HistoryRecord 或截断 / 清理标记（按发生顺序）
+        self._pending = []
+        self._file_lines = 0
+        # 上次追加被中断时最后一行没有换行符，下次追加前先补上
+        self._torn_tail = False
+        is_new = not os.path.exists(journal_file)
+        super().__init__(journal_file)
+
+        if is_new and migrate_from and os.path.exists(migrate_from):
+            for record in JsonHistoryStore(migrate_from).records:
+                if record.url and not self.contains(record.url, record.guid, record_canonical_url(record)):
+                    self.append(record)
+            logger.info(f"Seeded history journal with {len(self.records)} records from {migrate_from}")
+
+    def _load_history(self):
+        """Read the journal, replaying trim / cleanup markers; a torn last line (interrupted append) is skipped"""
+        os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
+
+        if not os.path.exists(self.history_file):
+            return []
+
+        records = []
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self._torn_tail = not line.endswith('\n')
+                    line = line.strip()
+                    if not line:
+                        continue
+                    self._file_lines += 1
+                    try:
+                        item = json.loads(line)
+                    except ValueError:
+                        logger.warning("Skipping malformed history journal line")
+                        continue
+                    if isinstance(item, dict) and KEEP_LAST in item:
+                        records = records[-item[KEEP_LAST]:] if item[KEEP_LAST] else []
+                    elif isinstance(item, dict) and CUTOFF in item:
+                        records = [record for record in records if record.ts > item[CUTOFF]]
+                    else:
+                        records.extend(self._migrate_data([item]))
+        except Exception as e:
+            logger.error(f"Failed to load history journal: {e}")
+            return []
+        return records
+
+    def append(self, record):
+        super().append(record)
+        self._pending.append(record)
+
+    def trim(self, max_items):
+        if len(self.records) > max_items:
+            super().trim(max_items)
+            self._pending.append({KEEP_LAST: max_items})
+
+    def remove_before(self, cutoff):
+        removed = super().remove_before(cutoff)
+        if removed:
+            self._pending.append({CUTOFF: int(cutoff)})
+        return removed
+
+    def needs_compaction(self):
+        lines = self._file_lines + len(self._pending)
+        return lines - len(self.records) >= COMPACT_MIN_GARBAGE and lines > len(self.records) * COMPACT_RATIO
+
+    def compact(self):
+        """Rewrite the journal with only the current records"""
+        tmp_file = self.history_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(record.to_dict(), ensure_ascii=False) + '\n' for record in self.records)
+        os.replace(tmp_file, self.history_file)
+        logger.info(f"Compacted history journal: {self._file_lines + len(self._pending)} -> {len(self.records)} lines")
+        self._file_lines = len(self.records)
+        self._pending = []
+        self._torn_tail = False
+
+    def save(self):
+        if self.needs_compaction():
+            self.compact()
+            return
+        if not self._pending:
+            return
+        with open(self.history_file, 'a', encoding='utf-8') as f:
+            if self._torn_tail:
+                f.write('\n')
+                self._torn_tail = False
+            f.writelines(
+                json.dumps(line if isinstance(line, dict) else line.to_dict(), ensure_ascii=False) + '\n'
+                for line in self._pending
+            )
+        self._file_lines += len(self._pending)
+        self._pending = []
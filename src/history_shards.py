@@ -0,0 +1,180 @@
+"""
+Time-partitioned history shards
+
+历史按 UTC 日期拆分为 data/history/YYYY-MM-DD.jsonl，另有一个小的 manifest.json
+记录每个分片的条数和时间范围：
+- get_recent 只打开与时间窗口重叠的分片
+- clean_old 整个删除过期分片（文件删除），只有跨越截止时间的那一个分片需要重写
+- max_items 按分片截断：删除最旧的整片，直到剩余条数不多于 max_items 所需
+- 去重索引在第一次查询时才加载全部分片；每日汇总只用时间窗口查询，不会加载
+"""
+import json
+import os
+import time
+import logging
+
+from history import HistoryIndex, JsonHistoryStore, record_canonical_url
+from records import HistoryRecord
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def _shard_name(ts):
+    return time.strftime('%Y-%m-%d', time.gmtime(ts))
+
+
+class ShardedHistoryStore:
+    """History split into per-day JSONL shards with a manifest"""
+
+    def __init__(self, directory, migrate_from=None):
+        self.directory = directory
+        self.manifest_file = os.path.join(directory, MANIFEST_FILE)
+        is_new = not os.path.exists(self.manifest_file)
+        os.makedirs(directory, exist_ok=True)
+        # {分片名: {'count', 'min_ts', 'max_ts'}}
+        self.shards = self._load_manifest()
+        # 尚未写入文件的记录 {分片名: [HistoryRecord, ...]}
+        self._pending = {}
+        self._index = None
+        self._dirty = False
+
+        if is_new and migrate_from and os.path.exists(migrate_from):
+            count = 0
+            for record in JsonHistoryStore(migrate_from).records:
+                if record.url and not self.contains(record.url, record.guid, record_canonical_url(record)):
+                    self.append(record)
+                    count += 1
+            self.save()
+            logger.info(f"Split {count} history records from {migrate_from} into {len(self.shards)} shards")
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_file):
+            return {}
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                return data.get('shards', {}) if isinstance(data, dict) else {}
+        except Exception as e:
+            logger.error(f"Failed to load history manifest: {e}")
+            return {}
+
+    def _save_manifest(self):
+        tmp_file = self.manifest_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'shards': self.shards}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_file, self.manifest_file)
+
+    def _shard_path(self, name):
+        return os.path.join(self.directory, f"{name}.jsonl")
+
+    def _read_shard(self, name):
+        records = []
+        path = self._shard_path(name)
+        if not os.path.exists(path):
+            return records
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(HistoryRecord.from_dict(json.loads(line)))
+                except ValueError:
+                    logger.warning(f"Skipping malformed line in history shard {name}")
+        return records + self._pending.get(name, [])
+
+    def _write_shard(self, name, records):
+        tmp_file = self._shard_path(name) + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(record.to_dict(), ensure_ascii=False) + '\n' for record in records)
+        os.replace(tmp_file, self._shard_path(name))
+
+    def _delete_shard(self, name):
+        meta = self.shards.pop(name)
+        self._pending.pop(name, None)
+        try:
+            os.remove(self._shard_path(name))
+        except FileNotFoundError:
+            pass
+        self._dirty = True
+        return meta['count']
+
+    def _ensure_index(self):
+        """Load every shard into the dedup index on first use"""
+        if self._index is None:
+            self._index = HistoryIndex()
+            for name in sorted(self.shards):
+                for record in self._read_shard(name):
+                    self._index.add(record)
+        return self._index
+
+    def contains(self, url, guid=None, canonical_url=None):
+        return self._ensure_index().contains(url, guid, canonical_url)
+
+    def append(self, record):
+        ts = record.ts
+        name = _shard_name(ts)
+        meta = self.shards.setdefault(name, {'count': 0, 'min_ts': ts, 'max_ts': ts})
+        meta['count'] += 1
+        meta['min_ts'] = min(meta['min_ts'], ts)
+        meta['max_ts'] = max(meta['max_ts'], ts)
+        self._pending.setdefault(name, []).append(record)
+        if self._index is not None:
+            self._index.add(record)
+        self._dirty = True
+
+    def trim(self, max_items):
+        """Drop whole oldest shards while the rest still holds at least max_items records"""
+        total = sum(meta['count'] for meta in self.shards.values())
+        for name in sorted(self.shards):
+            count = self.shards[name]['count']
+            if total - count < max_items:
+                break
+            total -= self._delete_shard(name)
+            self._index = None
+
+    def remove_before(self, cutoff):
+        removed = 0
+        for name in sorted(self.shards):
+            meta = self.shards[name]
+            if meta['min_ts'] > cutoff:
+                break
+            if meta['max_ts'] <= cutoff:
+                removed += self._delete_shard(name)
+                continue
+            # 跨越截止时间的分片：重写，只保留较新的记录
+            kept = [record for record in self._read_shard(name) if record.ts > cutoff]
+            removed += meta['count'] - len(kept)
+            self._pending.pop(name, None)
+            self._write_shard(name, kept)
+            meta.update(
+                count=len(kept),
+                min_ts=min((record.ts for record in kept), default=int(cutoff) + 1),
+                max_ts=max((record.ts for record in kept), default=int(cutoff) + 1)
+            )
+            self._dirty = True
+        if removed:
+            self._index = None
+        return removed
+
+    def since(self, cutoff):
+        result = []
+        for name in sorted(self.shards):
+            if self.shards[name]['max_ts'] <= cutoff:
+                continue
+            result.extend(record for record in self._read_shard(name) if record.ts > cutoff)
+        return result
+
+    def save(self):
+        for name, records in self._pending.items():
+            with open(self._shard_path(name), 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(record.to_dict(), ensure_ascii=False) + '\n' for record in records)
+        self._pending = {}
+        if self._dirty:
+            self._save_manifest()
+            self._dirty = False
+
+    def close(self):
+        pass
@@ -0,0 +1,141 @@
+"""
+SQLite history backend
+
+- WAL 模式：写入只追加日志，读写互不阻塞
+- url / 规范化 url / guid / 时间戳均有索引，去重和时间窗口查询都是索引查找
+- 每批发送的记录在一个事务中提交（save_history 时 commit）
+- 时间戳存为整数秒，get_recent / clean_old 变为范围查询，不再逐条解析
+
+一次性迁移现有 JSON 历史（旧的字符串列表和对象格式都支持）：
+    python src/history_sqlite.py data/history.json data/history.db
+新建数据库时如果同目录下有 history.json 也会自动迁移。
+"""
+import json
+import os
+import sqlite3
+import sys
+import logging
+
+from history import JsonHistoryStore, canonical_key, record_canonical_url
+from records import HistoryRecord
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    norm_url TEXT NOT NULL,
+    guid TEXT,
+    title TEXT,
+    platform TEXT,
+    ts INTEGER NOT NULL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_history_url ON history(url);
+CREATE INDEX IF NOT EXISTS idx_history_norm_url ON history(norm_url);
+CREATE INDEX IF NOT EXISTS idx_history_guid ON history(guid) WHERE guid IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_history_ts ON history(ts);
+"""
+
+
+class SqliteHistoryStore:
+    """History in a SQLite database (WAL), for histories far beyond what a JSON file handles"""
+
+    def __init__(self, db_file, migrate_from=None):
+        self.db_file = db_file
+        os.makedirs(os.path.dirname(db_file) or '.', exist_ok=True)
+        is_new = not os.path.exists(db_file)
+
+        self.conn = sqlite3.connect(db_file)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+        if is_new and migrate_from and os.path.exists(migrate_from):
+            count = self.import_records(JsonHistoryStore(migrate_from).records)
+            logger.info(f"Migrated {count} history records from {migrate_from}")
+
+    def _row(self, record):
+        # 单独成列的字段之外（published 等）以 JSON 存在 extra 中
+        return (
+            record.url, canonical_key(record.url, record_canonical_url(record)), record.guid, record.title, record.platform, record.ts,
+            json.dumps(record.extra, ensure_ascii=False) if record.extra else None
+        )
+
+    def import_records(self, records):
+        """Bulk insert in one transaction, skipping records already present"""
+        count = 0
+        with self.conn:
+            for record in records:
+                if record.url and not self.contains(record.url, record.guid, record_canonical_url(record)):
+                    self.conn.execute(
+                        'INSERT INTO history (url, norm_url, guid, title, platform, ts, extra) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        self._row(record)
+                    )
+                    count += 1
+        return count
+
+    def contains(self, url, guid=None, canonical_url=None):
+        row = self.conn.execute(
+            'SELECT 1 FROM history WHERE url = ? OR norm_url = ? OR guid = ? LIMIT 1',
+            (url, canonical_key(url, canonical_url), guid or None)
+        ).fetchone()
+        return row is not None
+
+    def append(self, record):
+        # 在当前事务中插入，save() 时统一提交
+        self.conn.execute(
+            'INSERT INTO history (url, norm_url, guid, title, platform, ts, extra) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            self._row(record)
+        )
+
+    def trim(self, max_items):
+        """Keep only the newest max_items rows"""
+        self.conn.execute(
+            'DELETE FROM history WHERE id <= (SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?)',
+            (max_items,)
+        )
+
+    def remove_before(self, cutoff):
+        cursor = self.conn.execute('DELETE FROM history WHERE ts <= ?', (int(cutoff),))
+        return cursor.rowcount
+
+    def since(self, cutoff):
+        rows = self.conn.execute(
+            'SELECT url, title, platform, guid, ts, extra FROM history WHERE ts > ? ORDER BY ts, id',
+            (int(cutoff),)
+        )
+        return [
+            HistoryRecord(title, url, ts, platform=platform, guid=guid, extra=json.loads(extra) if extra else None)
+            for url, title, platform, guid, ts, extra in rows
+        ]
+
+    def count(self):
+        return self.conn.execute('SELECT COUNT(*) FROM history').fetchone()[0]
+
+    def save(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def migrate_json_history(json_file, db_file):
+    """One-shot migration of a JSON history file into a SQLite database"""
+    store = SqliteHistoryStore(db_file)
+    try:
+        return store.import_records(JsonHistoryStore(json_file).records)
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if len(sys.argv) != 3:
+        print(f"Usage: python {sys.argv[0]} <history.json> <history.db>")
+        sys.exit(1)
+    migrated = migrate_json_history(sys.argv[1], sys.argv[2])
+    logger.info(f"Migrated {migrated} records into {sys.argv[2]}")
@@ -0,0 +1,203 @@
+"""
+Shared pooled HTTP clients for fetcher, notifier and bot
+
+- 连接池 + keep-alive：同一 host（RSSHub 镜像、api.telegram.org）复用 TCP/TLS 连接
+- 单 host 并发上限
+- 可选 HTTP/2（安装 h2 后启用）和 gzip/brotli 压缩协商（安装 brotli 后启用）
+- 统计连接复用次数，便于观察节省的握手
+"""
+import os
+import threading
+import logging
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+# HTTP2=0 可强制关闭 HTTP/2
+HTTP2_ENABLED = HTTP2_AVAILABLE and os.getenv('HTTP2', '1') != '0'
+
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_PER_HOST_LIMIT = 4
+DEFAULT_TIMEOUT = 30
+
+
+class ConnectionStats:
+    """Count requests and newly opened connections per host"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hosts = {}
+
+    def _entry(self, host):
+        entry = self.hosts.get(host)
+        if entry is None:
+            entry = {'requests': 0, 'new_connections': 0}
+            self.hosts[host] = entry
+        return entry
+
+    def record_request(self, host):
+        with self._lock:
+            self._entry(host)['requests'] += 1
+
+    def record_connection(self, host):
+        with self._lock:
+            self._entry(host)['new_connections'] += 1
+
+    @property
+    def requests(self):
+        return sum(entry['requests'] for entry in self.hosts.values())
+
+    @property
+    def new_connections(self):
+        return sum(entry['new_connections'] for entry in self.hosts.values())
+
+    @property
+    def reused(self):
+        return max(0, self.requests - self.new_connections)
+
+    def to_dict(self):
+        """Snapshot for metrics"""
+        return {
+            'requests': self.requests,
+            'new_connections': self.new_connections,
+            'reused_connections': self.reused,
+            'http2': HTTP2_ENABLED,
+        }
+
+    def get_summary(self):
+        """Human-readable one-liner"""
+        return (
+            f"HTTP: {self.requests} requests, {self.new_connections} new connections, "
+            f"{self.reused} reused (http2={'on' if HTTP2_ENABLED else 'off'})"
+        )
+
+
+_stats = ConnectionStats()
+
+
+def get_connection_stats():
+    """Get process-wide connection statistics"""
+    return _stats
+
+
+def _trace(host):
+    def trace(event_name, info):
+        if event_name == 'connection.connect_tcp.complete':
+            _stats.record_connection(host)
+    return trace
+
+
+def _async_trace(host):
+    async def trace(event_name, info):
+        if event_name == 'connection.connect_tcp.complete':
+            _stats.record_connection(host)
+    return trace
+
+
+def _on_request(request):
+    host = request.url.host
+    _stats.record_request(host)
+    request.extensions['trace'] = _trace(host)
+
+
+async def _on_request_async(request):
+    host = request.url.host
+    _stats.record_request(host)
+    request.extensions['trace'] = _async_trace(host)
+
+
+def _client_options(max_connections, timeout):
+    return {
+        'http2': HTTP2_ENABLED,
+        'timeout': timeout,
+        'follow_redirects': True,
+        'headers': {'Accept-Encoding': ACCEPT_ENCODING},
+        'limits': httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=30
+        ),
+    }
+
+
+def create_async_client(max_connections=DEFAULT_MAX_CONNECTIONS, timeout=DEFAULT_TIMEOUT):
+    """
+    Create a pooled AsyncClient
+
+    AsyncClient is bound to the event loop it is used in, so each
+    asyncio.run() gets its own client; per-host limits are enforced by the
+    caller (see AsyncFetchEngine).
+    """
+    options = _client_options(max_connections, timeout)
+    options['event_hooks'] = {'request': [_on_request_async]}
+    return httpx.AsyncClient(**options)
+
+
+class PooledClient:
+    """Thread-safe sync client with a per-host concurrency cap"""
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS, per_host_limit=DEFAULT_PER_HOST_LIMIT,
+                 timeout=DEFAULT_TIMEOUT):
+        options = _client_options(max_connections, timeout)
+        options['event_hooks'] = {'request': [_on_request]}
+        self.client = httpx.Client(**options)
+        self.per_host_limit = per_host_limit
+        self._host_semaphores = {}
+        self._lock = threading.Lock()
+
+    def _get_host_semaphore(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_semaphores[host] = semaphore
+        return semaphore
+
+    def request(self, method, url, **kwargs):
+        with self._get_host_semaphore(url):
+            return self.client.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        self.client.close()
+
+
+# Singleton instance
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Get or create the shared sync client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = PooledClient()
+    return _client
+
+def close_client():
+    """Close the shared sync client"""
+    global _client
+    with _client_lock:
+        if _client:
+            _client.close()
+            _client = None
@@ -0,0 +1,379 @@
+"""
+Compiled keyword matcher
+
+config/frequency_words.txt 在加载时编译为一个 Aho-Corasick 自动机：
+- 关键词和标题都做 NFKC 归一（全角 / 半角）和小写
+- 每个标题只扫描一遍，得到其中出现的全部关键词
+- 只检查被命中词涉及的关键词组，按原有语义判断：
+  排除词 !词 命中则跳过该组；必须词 +词 需全部出现；普通词任意一个即可
+  （只有必须词的组，必须词全部出现即匹配）
+
+KeywordSet 缓存编译结果：守护进程中跨运行保留，cron / Actions 通过 data/ 下的 JSON 快照复用；
+只有文件的 mtime 变化且内容哈希也变化时才重新编译。同时累计每个关键词组的
+检查次数和命中次数，便于删掉只耗 CPU 却从不命中的组。
+"""
+import hashlib
+import json
+import os
+import time
+import unicodedata
+from collections import deque
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 关键词在组内的角色
+NORMAL, REQUIRED, EXCLUDED = 0, 1, 2
+
+
+def normalize_text(text):
+    """Full-width -> half-width (NFKC) and lowercase"""
+    return unicodedata.normalize('NFKC', text).lower()
+
+
+def parse_keyword_line(line):
+    """
+    Parse one line of frequency_words.txt into a keyword group
+
+    Returns {'normal', 'required', 'excluded'} or None for blank lines,
+    comments and lines without normal or required words.
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+
+    group = {'normal': [], 'required': [], 'excluded': []}
+    for word in line.split():
+        if word.startswith('+'):
+            group['required'].append(word[1:])
+        elif word.startswith('!'):
+            group['excluded'].append(word[1:])
+        else:
+            group['normal'].append(word)
+
+    if not group['normal'] and not group['required']:
+        return None
+    return group
+
+
+def format_keyword_group(group):
+    """A keyword group back in frequency_words.txt syntax (also its key in the stats)"""
+    return ' '.join(
+        group['normal'] + ['+' + word for word in group['required']] + ['!' + word for word in group['excluded']]
+    )
+
+
+class AhoCorasick:
+    """Multi-pattern substring search: one pass over the text finds every pattern it contains"""
+
+    def __init__(self, patterns):
+        # 每个状态一个 {字符: 下一状态}；out[状态] 为在此结束的模式编号（含后缀链上的）
+        self._goto = [{}]
+        self._out = [()]
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._out.append(())
+                state = next_state
+            self._out[state] += (index,)
+        self._fail = self._build_fail_links()
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore compiled tables saved with to_dict() without rebuilding"""
+        automaton = cls.__new__(cls)
+        automaton._goto = data['goto']
+        automaton._fail = data['fail']
+        automaton._out = [tuple(out) for out in data['out']]
+        return automaton
+
+    def to_dict(self):
+        return {'goto': self._goto, 'fail': self._fail, 'out': self._out}
+
+    def _build_fail_links(self):
+        goto, out = self._goto, self._out
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                target = fail[state]
+                while target and char not in goto[target]:
+                    target = fail[target]
+                link = goto[target].get(char, 0)
+                fail[next_state] = link if link != next_state else 0
+                if out[fail[next_state]]:
+                    out[next_state] += out[fail[next_state]]
+        return fail
+
+    def find(self, text):
+        """Set of pattern indexes occurring in `text`"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+class KeywordMatcher:
+    """Keyword groups compiled into one automaton"""
+
+    def __init__(self, keyword_groups, automaton=None):
+        self.keyword_groups = keyword_groups
+        words = {}
+        # 归一化后为空的词在任何标题中都"出现"（与 '' in title 一致）
+        always = set()
+        # {词编号: [组编号, ...]}（普通词和必须词，排除词不会让组成为候选）
+        self._roles = {}
+        self._groups = []
+        for group_index, group in enumerate(keyword_groups):
+            ids = []
+            for role, key in ((NORMAL, 'normal'), (REQUIRED, 'required'), (EXCLUDED, 'excluded')):
+                role_ids = set()
+                for word in group.get(key, []):
+                    word = normalize_text(word)
+                    word_id = words.setdefault(word, len(words))
+                    if not word:
+                        always.add(word_id)
+                    role_ids.add(word_id)
+                    if role != EXCLUDED:
+                        self._roles.setdefault(word_id, []).append(group_index)
+                ids.append(frozenset(role_ids))
+            self._groups.append(tuple(ids))
+
+        self._always = frozenset(always)
+        self._automaton = automaton or AhoCorasick([word for word in words if word])
+        # 自动机中的模式编号 -> 词编号
+        self._pattern_ids = [word_id for word, word_id in words.items() if word]
+
+        # 本次运行的统计：每组作为候选被检查的次数、命中次数、评估耗时
+        self.checks = [0] * len(self._groups)
+        self.hits = [0] * len(self._groups)
+        self.titles = 0
+        self.eval_seconds = 0.0
+
+    @classmethod
+    def from_file(cls, path):
+        """Compile a frequency_words.txt file"""
+        groups = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                group = parse_keyword_line(line)
+                if group:
+                    groups.append(group)
+        return cls(groups)
+
+    def __len__(self):
+        return len(self._groups)
+
+    def _candidates(self, title):
+        """Words found in `title` and the groups they make candidates, in group order"""
+        pattern_ids = self._pattern_ids
+        found = {pattern_ids[i] for i in self._automaton.find(normalize_text(title))}
+        found |= self._always
+
+        candidates = set()
+        for word_id in found:
+            candidates.update(self._roles.get(word_id, ()))
+        return found, sorted(candidates)
+
+    def _check(self, group_index, found):
+        self.checks[group_index] += 1
+        normal, required, excluded = self._groups[group_index]
+        if excluded & found:
+            return False
+        if required - found:
+            return False
+        if not normal or normal & found:
+            self.hits[group_index] += 1
+            return True
+        return False
+
+    def match(self, title):
+        """Index of the first keyword group matching `title`, or None"""
+        found, candidates = self._candidates(title)
+        for group_index in candidates:
+            if self._check(group_index, found):
+                return group_index
+        return None
+
+    def match_owners(self, title, owners):
+        """
+        Set of owners with at least one group matching `title`
+
+        owners[i] is the owner (e.g. a subscriber) of group i. The title is
+        scanned once; once an owner matched, its remaining groups are skipped.
+        """
+        self.titles += 1
+        found, candidates = self._candidates(title)
+        matched = set()
+        for group_index in candidates:
+            owner = owners[group_index]
+            if owner not in matched and self._check(group_index, found):
+                matched.add(owner)
+        return matched
+
+    def filter(self, trends):
+        """Keep only items whose title matches at least one group"""
+        start = time.perf_counter()
+        filtered_trends = {}
+        for platform, items in trends.items():
+            self.titles += len(items)
+            filtered_items = [item for item in items if self.match(item['title']) is not None]
+            if filtered_items:
+                filtered_trends[platform] = filtered_items
+        self.eval_seconds += time.perf_counter() - start
+        return filtered_trends
+
+    def get_stats(self):
+        """Counters since the matcher was built (or last reset)"""
+        return {
+            'groups': len(self._groups),
+            'titles': self.titles,
+            'eval_ms': round(self.eval_seconds * 1000, 2),
+            'matched_groups': sum(1 for hits in self.hits if hits)
+        }
+
+    def reset_stats(self):
+        self.checks = [0] * len(self._groups)
+        self.hits = [0] * len(self._groups)
+        self.titles = 0
+        self.eval_seconds = 0.0
+
+
+class KeywordSet:
+    """Compiled keyword groups cached across runs, rebuilt only when the source file changes"""
+
+    def __init__(self, source_file, snapshot_file=None):
+        self.source_file = source_file
+        self.snapshot_file = snapshot_file
+        self.matcher = None
+        # 源文件的 (mtime_ns, size) 和内容哈希
+        self._signature = None
+        self._digest = None
+        # 累计统计 {组: {'checks', 'hits'}}，以及累计标题数和评估耗时
+        self.group_stats = {}
+        self.titles = 0
+        self.eval_seconds = 0.0
+        self._snapshot_loaded = False
+
+    def get(self):
+        """Current matcher, recompiled only if the keyword file changed (None if it is missing)"""
+        if not self._snapshot_loaded:
+            self._snapshot_loaded = True
+            self._load_snapshot()
+
+        try:
+            stat = os.stat(self.source_file)
+        except FileNotFoundError:
+            self.matcher = None
+            return None
+        signature = [stat.st_mtime_ns, stat.st_size]
+        if self.matcher is not None and signature == self._signature:
+            return self.matcher
+
+        with open(self.source_file, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        # mtime 变了但内容没变（git checkout、touch）：沿用已编译的结果
+        if self.matcher is None or digest != self._digest:
+            self._collect_stats()
+            groups = [group for group in map(parse_keyword_line, content.decode('utf-8').splitlines()) if group]
+            start = time.perf_counter()
+            self.matcher = KeywordMatcher(groups)
+            logger.info(
+                f"Compiled {len(groups)} keyword groups in {(time.perf_counter() - start) * 1000:.1f}ms"
+            )
+            self._digest = digest
+        self._signature = signature
+        return self.matcher
+
+    def _load_snapshot(self):
+        if not self.snapshot_file or not os.path.exists(self.snapshot_file):
+            return
+        try:
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.group_stats = data.get('group_stats', {})
+            self.titles = data.get('titles', 0)
+            self.eval_seconds = data.get('eval_ms', 0) / 1000
+            self.matcher = KeywordMatcher(data['groups'], AhoCorasick.from_dict(data['automaton']))
+            self._signature = data['source_signature']
+            self._digest = data['source_hash']
+        except Exception as e:
+            logger.warning(f"Ignoring keyword snapshot: {e}")
+            self.matcher = None
+
+    def _collect_stats(self):
+        """Fold the current matcher's counters into the cumulative per-group stats"""
+        matcher = self.matcher
+        if matcher is None:
+            return
+        for group, checks, hits in zip(matcher.keyword_groups, matcher.checks, matcher.hits):
+            if checks:
+                stats = self.group_stats.setdefault(format_keyword_group(group), {'checks': 0, 'hits': 0})
+                stats['checks'] += checks
+                stats['hits'] += hits
+        self.titles += matcher.titles
+        self.eval_seconds += matcher.eval_seconds
+        matcher.reset_stats()
+
+    def save(self):
+        """Write the compiled set and cumulative stats to the snapshot file"""
+        if not self.snapshot_file or self.matcher is None:
+            return
+        self._collect_stats()
+        # 只保留当前文件中仍存在的组
+        keys = {format_keyword_group(group) for group in self.matcher.keyword_groups}
+        self.group_stats = {key: stats for key, stats in self.group_stats.items() if key in keys}
+        data = {
+            'source_signature': self._signature,
+            'source_hash': self._digest,
+            'titles': self.titles,
+            'eval_ms': round(self.eval_seconds * 1000, 2),
+            'group_stats': self.group_stats,
+            'groups': self.matcher.keyword_groups,
+            'automaton': self.matcher._automaton.to_dict()
+        }
+        tmp_file = self.snapshot_file + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_file) or '.', exist_ok=True)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_file, self.snapshot_file)
+        except Exception as e:
+            logger.error(f"Failed to save keyword snapshot: {e}")
+
+    def unmatched_groups(self, limit=10):
+        """Groups that never matched, most frequently checked (most CPU spent) first"""
+        self._collect_stats()
+        never = [(stats['checks'], key) for key, stats in self.group_stats.items() if not stats['hits']]
+        if self.matcher is not None:
+            # 从未成为候选的组也从未命中
+            checked = set(self.group_stats)
+            never += [
+                (0, key) for key in map(format_keyword_group, self.matcher.keyword_groups) if key not in checked
+            ]
+        never.sort(reverse=True)
+        return [(key, checks) for checks, key in never[:limit]]
+
+    def get_summary(self):
+        self._collect_stats()
+        groups = len(self.matcher) if self.matcher is not None else 0
+        matched = sum(1 for stats in self.group_stats.values() if stats['hits'])
+        per_title = self.eval_seconds / self.titles * 1e6 if self.titles else 0
+        return (
+            f"Keywords: {groups} groups, {self.titles} titles evaluated in {self.eval_seconds * 1000:.0f}ms "
+            f"({per_title:.0f}us/title), {groups - matched} groups never matched"
+        )
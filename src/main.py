@@ -1,18 +1,25 @@
 import os
 import sys
 import logging
-import time
 from datetime import datetime, timezone, timedelta
-from fetcher import TrendFetcher
+from fetcher import TrendFetcher, RSSHUB_PLACEHOLDER
 
 # 设置 UTC+8 时区
 UTC_PLUS_8 = timezone(timedelta(hours=8))
 from notifier import TelegramNotifier
+from delivery import DeliveryScheduler
+from outbox import Outbox
+from message_packer import packing_stats
 from history import HistoryManager
 from config_loader import ScrapingConfig
 from cache_manager import CacheManager
 from metrics_tracker import MetricsTracker
-from fetcher_wrapper import get_fetcher_wrapper
+from http_client import get_connection_stats
+from deadline import RunDeadline
+from url_canon import UrlCanonicalizer, canonicalize_trends
+from near_dup import NearDuplicateIndex
+from keyword_matcher import KeywordSet
+from subscribers import SubscriberRegistry
 
 # Configure logging
 logging.basicConfig(
@@ -21,101 +28,53 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 编译后的关键词集合：守护进程中跨运行保留，cron / Actions 通过 data/ 下的快照复用
+_keyword_set = None
+
+def get_keyword_set():
+    global _keyword_set
+    if _keyword_set is None:
+        # 获取项目根目录（src 的父目录）
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        _keyword_set = KeywordSet(
+            os.path.join(project_root, 'config', 'frequency_words.txt'),
+            os.path.join(project_root, 'data', 'keyword_snapshot.json')
+        )
+    return _keyword_set
+
 def load_keywords():
     """
-    从 config/frequency_words.txt 加载关键词
+    从 config/frequency_words.txt 加载关键词，编译为 KeywordMatcher（文件未变化时复用上次的结果）
     支持语法：
     - 普通关键词：直接匹配
     - 必须词 +词汇：必须同时包含
     - 过滤词 !词汇：排除包含此词的结果
     """
-    # 获取项目根目录（src 的父目录）
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    config_file = os.path.join(project_root, 'config', 'frequency_words.txt')
+    keyword_set = get_keyword_set()
+    config_file = keyword_set.source_file
     
     if not os.path.exists(config_file):
         logger.warning(f"配置文件不存在: {config_file}")
         logger.info("未配置关键词，将显示所有热点")
-        return []
-    
-    keyword_groups = []
+        return None
     
     try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                # 跳过空行和注释
-                if not line or line.startswith('#'):
-                    continue
-                
-                # 解析关键词组
-                words = line.split()
-                normal_keywords = []
-                required_keywords = []
-                excluded_keywords = []
-                
-                for word in words:
-                    if word.startswith('+'):
-                        required_keywords.append(word[1:])
-                    elif word.startswith('!'):
-                        excluded_keywords.append(word[1:])
-                    else:
-                        normal_keywords.append(word)
-                
-                if normal_keywords or required_keywords:
-                    keyword_groups.append({
-                        'normal': normal_keywords,
-                        'required': required_keywords,
-                        'excluded': excluded_keywords
-                    })
-        
-        logger.info(f"已加载 {len(keyword_groups)} 个关键词组")
-        return keyword_groups
+        matcher = keyword_set.get()
+        logger.info(f"已加载 {len(matcher)} 个关键词组")
+        return matcher
     
     except Exception as e:
         logger.error(f"加载关键词配置失败: {e}")
-        return []
+        return None
 
-def filter_by_keywords(trends, keyword_groups):
+def filter_by_keywords(trends, keyword_matcher):
     """
-    根据关键词组过滤热点
+    根据关键词组过滤热点（每个标题只扫描一遍，见 keyword_matcher）
     """
-    if not keyword_groups:
+    if not keyword_matcher:
         return trends
     
-    filtered_trends = {}
-    
-    for platform, items in trends.items():
-        filtered_items = []
-        
-        for item in items:
-            title = item['title'].lower()
-            
-            # 检查每个关键词组
-            for group in keyword_groups:
-                # 检查是否包含排除词
-                if any(excluded.lower() in title for excluded in group['excluded']):
-                    continue
-                
-                # 检查是否包含必须词
-                if group['required']:
-                    if not all(required.lower() in title for required in group['required']):
-                        continue
-                
-                # 检查是否包含普通关键词（任意一个即可）
-                if group['normal']:
-                    if any(keyword.lower() in title for keyword in group['normal']):
-                        filtered_items.append(item)
-                        break
-                elif group['required']:
-                    # 如果只有必须词，没有普通关键词
-                    filtered_items.append(item)
-                    break
-        
-        if filtered_items:
-            filtered_trends[platform] = filtered_items
-    
-    return filtered_trends
+    return keyword_matcher.filter(trends)
 
 def filter_new_items(trends, history_manager):
     """
@@ -125,7 +84,7 @@ def filter_new_items(trends, history_manager):
     for platform, items in trends.items():
         new_items = []
         for item in items:
-            if not history_manager.is_sent(item['url']):
+            if not history_manager.is_sent(item['url'], item.get('guid'), item.get('canonical_url')):
                 new_items.append(item)
         
         if new_items:
@@ -133,6 +92,117 @@ def filter_new_items(trends, history_manager):
             
     return new_trends
 
+def record_delivered(message, outbox, history_manager, near_dup):
+    """
+    Write a delivered outbox message's items to history
+
+    The outbox marks the message sent first, so an interruption before
+    mark_recorded is replayed on the next start instead of re-sending.
+    """
+    for platform, item in message.items:
+        history_manager.add(item, platform)
+        if near_dup:
+            near_dup.add(item, platform)
+    history_manager.save_history()
+    outbox.mark_recorded(message)
+
+def record_for_chat(message, outbox, registry):
+    """record_delivered into the history of the subscriber the message was sent to"""
+    subscriber = registry.by_chat(message.chat_id)
+    if subscriber is None:
+        # 订阅者已从配置中移除：不再有历史可写，只标记完成
+        logger.warning(f"Outbox message {message.id} was sent to unknown chat {message.chat_id}")
+        outbox.mark_recorded(message)
+        return
+    record_delivered(message, outbox, subscriber.history, subscriber.near_dup)
+
+def deliver_outbox(outbox, config, token, deadline, registry, metrics_tracker):
+    """
+    Send every due outbox message through the DeliveryScheduler
+
+    History is updated only for messages Telegram acknowledged (in the
+    history of the chat's subscriber); failed ones stay queued and are
+    retried with backoff in later runs.
+    """
+    messages = outbox.due()
+    if not messages:
+        logger.info(outbox.get_summary())
+        return
+    
+    scheduler = DeliveryScheduler.from_config(config, token, deadline)
+    
+    def on_delivered(message):
+        outbox.mark_sent(message)
+        record_for_chat(message, outbox, registry)
+        logger.info(f"Outbox message {message.id} sent successfully ({len(message.items)} items).")
+    
+    jobs = [
+        (message, scheduler.submit(message.chat_id, message.remaining_parts, on_success=lambda m=message: on_delivered(m)))
+        for message in messages
+    ]
+    logger.info(f"Sending {len(jobs)} outbox messages to Telegram...")
+    try:
+        scheduler.run()
+    except Exception as e:
+        logger.error(f"Error delivering outbox messages: {e}", exc_info=True)
+    
+    for message, job in jobs:
+        if job.ok:
+            continue
+        if job.error == 'deadline':
+            # 时间预算用尽：留在 outbox 中，下次运行直接发送（不计入重试次数）
+            logger.warning(f"Run deadline reached, outbox message {message.id} left for the next run")
+            outbox.mark_failed(message, job.sent_parts, 'deadline', count_attempt=False)
+        else:
+            status = outbox.mark_failed(message, job.sent_parts, job.error or 'send failed')
+            logger.error(f"Failed to send outbox message {message.id} ({status}).")
+    
+    purged = outbox.purge()
+    if purged:
+        logger.info(f"Outbox: purged {purged} old messages")
+    logger.info(scheduler.get_summary())
+    logger.info(outbox.get_summary())
+    metrics_tracker.record_delivery(dict(scheduler.get_stats(), outbox=outbox.counts()))
+
+def record_fetch_results(fetcher, trends, metrics_tracker):
+    """
+    Record per-feed outcomes of a fetch in the metrics
+
+    Feeds answering 304 Not Modified were fetched successfully, just
+    without new items.
+    """
+    for platform, items in trends.items():
+        metrics_tracker.record_platform_attempt(platform)
+        if items:
+            metrics_tracker.record_platform_success(platform, len(items))
+        else:
+            metrics_tracker.record_platform_failure(platform, 'No data')
+    for platform in fetcher.not_modified_feeds:
+        if platform not in trends:
+            metrics_tracker.record_platform_attempt(platform)
+            metrics_tracker.record_platform_success(platform, 0)
+    for platform, error in fetcher.failed_feeds.items():
+        metrics_tracker.record_platform_attempt(platform)
+        metrics_tracker.record_platform_failure(platform, error)
+    for platform in fetcher.skipped_feeds:
+        metrics_tracker.record_circuit_skip(platform)
+    # 未到期的源本次没有请求，不计入尝试次数（成功率只按实际抓取的源计算）
+    metrics_tracker.record_not_due(fetcher.not_due_feeds)
+    metrics_tracker.record_deadline_cut_off(fetcher.cut_off_feeds)
+
+def low_success_rate(metrics_tracker, min_success_rate):
+    """
+    Success rate of the feeds polled this run if it is below the minimum
+
+    Returns None when it is not, or when no feed was polled at all (e.g.
+    an idle run where the scheduler found no feed due).
+    """
+    total_platforms = metrics_tracker.current_run.get('total_platforms', 0)
+    if total_platforms == 0:
+        return None
+    success_rate = metrics_tracker.current_run.get('success_count', 0) / total_platforms
+    return success_rate if success_rate < min_success_rate else None
+
 def main():
     # Get secrets from environment variables
     token = os.environ.get('TELEGRAM_BOT_TOKEN')
@@ -146,16 +216,32 @@ def main():
     now_utc8 = datetime.now(UTC_PLUS_8)
     logger.info(f"Starting TrendMonitor... (北京时间: {now_utc8.strftime('%Y-%m-%d %H:%M:%S')})")
     start_time = datetime.now()
+    # 在 finally 中关闭：SQLite 历史只有关闭时才把 WAL 合并回 .db，工作流只提交 .db 文件
+    history_manager = registry = outbox = None
     
     try:
         # Initialize systems
         project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        history_file = os.path.join(project_root, 'data', 'history.json')
         cache_file = os.path.join(project_root, 'data', 'cache.json')
         metrics_file = os.path.join(project_root, 'data', 'metrics.json')
         
         config = ScrapingConfig()
-        history_manager = HistoryManager(history_file)
+        # 整次运行的时间预算，抓取 / 推送共用
+        deadline = RunDeadline.from_config(config)
+        history_manager = HistoryManager.from_config(config, os.path.join(project_root, 'data'))
+        near_dup = NearDuplicateIndex.from_config(config, os.path.join(project_root, 'data', 'near_dup.json'))
+        # 推送对象：TELEGRAM_CHAT_ID（默认）+ config/subscribers.json 中的其他聊天，各自的历史在 data/subscribers/<name>/
+        registry = SubscriberRegistry.load(
+            os.path.join(project_root, 'config', 'subscribers.json'), os.path.join(project_root, 'data'),
+            default_chat_id=chat_id, project_root=project_root
+        )
+        registry.open(config, history_manager, near_dup)
+        # 待发送消息的持久队列（dry-run 模式不使用）
+        outbox = Outbox.from_config(config, os.path.join(project_root, 'data', 'outbox.db')) if token and registry.chat_ids() else None
+        if outbox:
+            # 上次运行已送达但未写入历史的消息（两步之间中断）
+            for message in outbox.unrecorded():
+                record_for_chat(message, outbox, registry)
         cache_manager = CacheManager(cache_file)
         metrics_tracker = MetricsTracker(metrics_file)
         
@@ -164,31 +250,78 @@ def main():
         # Cleanup old cache
         cache_manager.cleanup_old()
         
-        fetcher = TrendFetcher()
-        wrapper = get_fetcher_wrapper(fetcher, config, cache_manager, metrics_tracker)
+        fetcher = TrendFetcher(config, deadline)
         
         # Fetch all with monitoring
         trends = fetcher.fetch_all()
         
         # 记录抓取结果到 metrics
-        for platform, items in trends.items():
-            metrics_tracker.record_platform_attempt(platform)
-            if items:
-                metrics_tracker.record_platform_success(platform, len(items))
-            else:
-                metrics_tracker.record_platform_failure(platform, 'No data')
+        record_fetch_results(fetcher, trends, metrics_tracker)
+        
+        # URL 规范化：镜像 / 跟踪参数 / 跳转链接不同的同一篇文章在此合并
+        canonicalizer = UrlCanonicalizer.from_config(config)
+        canonicalizer.add_host_aliases(fetcher.mirror_pool.mirrors, RSSHUB_PLACEHOLDER)
+        trends, canon_stats = canonicalize_trends(trends, canonicalizer)
+        rewritten_urls = canon_stats['rewritten_urls']
+        history_hits = 0
         
-        # 加载并应用关键词过滤
-        keyword_groups = load_keywords()
-        if keyword_groups:
+        # 加载关键词，所有订阅者的关键词组在一次扫描中匹配
+        keyword_matcher = load_keywords()
+        if keyword_matcher or len(registry.subscribers) > 1:
             logger.info(f"应用关键词过滤...")
-            trends = filter_by_keywords(trends, keyword_groups)
+        routed = registry.route(trends, keyword_matcher)
+        shared_matcher = keyword_matcher if len(routed) == 1 else registry.matcher
+        if shared_matcher:
+            metrics_tracker.record_keyword_stats(shared_matcher.get_stats())
+        if keyword_matcher:
+            keyword_set = get_keyword_set()
+            keyword_set.save()
+            logger.info(keyword_set.get_summary())
+            unmatched = keyword_set.unmatched_groups(limit=5)
+            if unmatched:
+                logger.info("从未命中的关键词组（按检查次数）: " + "; ".join(f"{key} ({checks})" for key, checks in unmatched))
         
-        if not force_push:
-            logger.info("Filtering out already sent items...")
-            trends = filter_new_items(trends, history_manager)
-        else:
+        if force_push:
             logger.info("Force push enabled, skipping de-duplication")
+        else:
+            logger.info("Filtering out already sent items...")
+        folded = window_hits = 0
+        for subscriber, subscriber_trends in routed.items():
+            if not force_push:
+                candidates = {
+                    item.get('canonical_url') for items in subscriber_trends.values() for item in items
+                    if item.get('canonical_url') in rewritten_urls
+                }
+                subscriber_trends = filter_new_items(subscriber_trends, subscriber.history)
+                if outbox and subscriber.chat_id:
+                    # 已在 outbox 中排队（或刚送达）给该聊天的条目不再入队
+                    subscriber_trends = outbox.filter_queued(subscriber_trends, subscriber.chat_id)
+                # 改写后的 URL 命中历史：不规范化就会被重复推送的条目
+                remaining = {item.get('canonical_url') for items in subscriber_trends.values() for item in items}
+                history_hits += len(candidates - remaining)
+            
+            # 跨平台相似标题：合并为一条并记录来源平台
+            if subscriber.near_dup:
+                subscriber_trends = subscriber.near_dup.fold(subscriber_trends, use_window=not force_push)
+                folded += subscriber.near_dup.stats['folded']
+                window_hits += subscriber.near_dup.stats['window_hits']
+                logger.info(subscriber.near_dup.get_summary())
+            routed[subscriber] = subscriber_trends
+        metrics_tracker.record_url_canonicalization(canon_stats['rewritten'], canon_stats['duplicates'], history_hits)
+        if any(subscriber.near_dup for subscriber in routed):
+            metrics_tracker.record_near_duplicates(folded, window_hits)
+        # 仅由布隆过滤器判定为已推送的条目（可能是误判）
+        history_stats = [subscriber.history.get_stats() for subscriber in routed if subscriber.history]
+        if history_stats:
+            metrics_tracker.record_seen_filter(
+                sum(stats['filter_only_hits'] for stats in history_stats),
+                max(stats['estimated_error_rate'] for stats in history_stats)
+            )
+        
+        # 控制台输出 / 日志用：默认订阅者的条目（单聊天时与原来相同）
+        trends = routed.get(registry.default, {})
+        if len(routed) > 1:
+            logger.info(registry.get_summary(routed))
 
         # Log stats
         total_items = 0
@@ -196,11 +329,17 @@ def main():
             count = len(items)
             total_items += count
             logger.info(f"Fetched {count} new items from {platform}")
+        total_items += sum(
+            len(items) for subscriber, subscriber_trends in routed.items()
+            if subscriber is not registry.default for items in subscriber_trends.values()
+        )
         
-        # Save metrics
-        metrics_tracker.save_metrics()
+        # Log connection stats
+        logger.info(get_connection_stats().get_summary())
+        metrics_tracker.record_http_stats(get_connection_stats().to_dict())
         elapsed_time = (datetime.now() - start_time).total_seconds()
         logger.info(f"Execution time: {elapsed_time:.2f}s")
+        logger.info(deadline.get_summary())
         
         # Log summary
         logger.info(metrics_tracker.get_summary())
@@ -208,60 +347,44 @@ def main():
         if total_items == 0:
              logger.info("没有新的热点需要推送")
 
-        if token and chat_id and trends:
-            # Flatten trends into a list of (platform, item) tuples
-            all_items = []
-            for platform, items in trends.items():
-                for item in items:
-                    all_items.append((platform, item))
-            
-            # Batch items in groups of 10
-            batch_size = 10
-            batches = [all_items[i:i + batch_size] for i in range(0, len(all_items), batch_size)]
-            
-            logger.info(f"Total items: {len(all_items)}. Created {len(batches)} batches.")
-            
-            for i, batch in enumerate(batches):
-                # 发送所有批次，不再跳过小批次
-                logger.info(f"Processing batch {i+1}/{len(batches)} with {len(batch)} items...")
+        if outbox:
+            all_packed = []
+            for subscriber, subscriber_trends in routed.items():
+                if not subscriber.chat_id or not subscriber_trends:
+                    continue
+                # Flatten trends into a list of (platform, item) tuples
+                all_items = []
+                for platform, items in subscriber_trends.items():
+                    for item in items:
+                        all_items.append((platform, item))
                 
-                # Reconstruct trends dict for this batch
-                batch_trends = {}
-                for platform, item in batch:
-                    if platform not in batch_trends:
-                        batch_trends[platform] = []
-                    batch_trends[platform].append(item)
+                # 按 Telegram 4096 字符上限贪心装包，条目不拆分
+                notifier = TelegramNotifier(token, subscriber.chat_id, deadline)
+                packed = notifier.pack_items(all_items)
+                all_packed.extend(packed)
                 
-                # Send notification
-                logger.info("Sending notification to Telegram...")
-                try:
-                    notifier = TelegramNotifier(token, chat_id)
-                    message = notifier.format_trends(batch_trends)
-                    
-                    if not message:
-                        logger.warning(f"Batch {i+1} resulted in empty message, skipping.")
-                        continue
-
-                    if notifier.send_message(message):
-                        logger.info(f"Batch {i+1} sent successfully.")
-                        # Update history only for sent items
-                        for platform, items in batch_trends.items():
-                            for item in items:
-                                history_manager.add(item)
-                        history_manager.save_history()
-                    else:
-                        logger.error(f"Failed to send batch {i+1}.")
-                        # Don't exit immediately, try next batch but mark run as failed
-                        # sys.exit(1) 
-                except Exception as e:
-                    logger.error(f"Error processing batch {i+1}: {e}", exc_info=True)
+                for message, batch in packed:
+                    # 先写入 outbox，送达确认后才写入历史
+                    outbox.enqueue(subscriber.chat_id, [message], batch)
+            
+            if all_packed:
+                stats = packing_stats(all_packed)
+                metrics_tracker.record_message_packing(stats)
+                logger.info(
+                    f"Total items: {stats['items']}. Packed into {stats['messages']} messages "
+                    f"({stats['messages_per_item']} messages/item, {stats['avg_fill']:.0%} full)."
+                )
+            
+            deliver_outbox(outbox, config, token, deadline, registry, metrics_tracker)
+        
+        metrics_tracker.save_metrics()
+        if near_dup:
+            near_dup.save()
         
         # Check success rate and send alert if needed
-        total_platforms = metrics_tracker.current_run.get('total_platforms', 0)
-        success_count = metrics_tracker.current_run.get('success_count', 0)
-        success_rate = (success_count / total_platforms) if total_platforms > 0 else 0
+        success_rate = low_success_rate(metrics_tracker, config.get_min_success_rate())
         
-        if config.should_send_alerts() and success_rate < config.get_min_success_rate():
+        if config.should_send_alerts() and success_rate is not None:
             if token and chat_id:
                 alert_msg = f"⚠️ 警告：抓取成功率过低\n\n{metrics_tracker.get_summary()}"
                 notifier = TelegramNotifier(token, chat_id)
@@ -286,6 +409,18 @@ def main():
             pass
         sys.exit(1)
     finally:
+        # 出错退出时也关闭历史存储（提交事务并合并 WAL，提交到 git 的 history.db 自成一体）
+        for store in (registry, history_manager):
+            if store is not None:
+                try:
+                    store.close()
+                except Exception as e:
+                    logger.error(f"Failed to close history: {e}")
+        if outbox is not None:
+            try:
+                outbox.close()
+            except Exception as e:
+                logger.error(f"Failed to close outbox: {e}")
         # Always cleanup browser on exit
         try:
             from fetcher_browser import cleanup_browser
@@ -0,0 +1,63 @@
+"""
+Greedy message packing
+
+把格式化后的条目按顺序装进尽量少的 Telegram 消息：
+- 每条消息填到接近 4096 的上限，条目不会被拆到两条消息中
+- 长度按 Telegram 的计数方式（UTF-16 码元）计算，且计入 Markdown 转义和链接地址，
+  即按原始待发送文本计，不依赖服务端解析后的长度
+- 条目编号在每条消息内从 1 开始，编号位数变化也计入长度
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_MAX_LENGTH = 4096
+
+ENTRY_SEPARATOR = '\n\n'
+
+
+def telegram_length(text):
+    """Message length as Telegram counts it (UTF-16 code units)"""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def pack_entries(entries, render, limit=TELEGRAM_MAX_LENGTH, separator=ENTRY_SEPARATOR):
+    """
+    Greedily pack entries (in order) into messages of at most `limit`
+
+    render(number, entry) returns the text of one entry numbered within
+    its message. An entry longer than the limit on its own still gets a
+    message of its own. Returns [(text, [entry, ...]), ...].
+    """
+    separator_length = telegram_length(separator)
+    messages = []
+    texts, packed, length = [], [], 0
+    for entry in entries:
+        text = render(len(packed) + 1, entry)
+        added = telegram_length(text) + (separator_length if packed else 0)
+        if packed and length + added > limit:
+            messages.append((separator.join(texts), packed))
+            texts, packed, length = [], [], 0
+            text = render(1, entry)
+            added = telegram_length(text)
+        if added > limit:
+            logger.warning(f"Entry of {added} characters exceeds the {limit}-character message limit")
+        texts.append(text)
+        packed.append(entry)
+        length += added
+    if packed:
+        messages.append((separator.join(texts), packed))
+    return messages
+
+
+def packing_stats(messages, limit=TELEGRAM_MAX_LENGTH):
+    """Items, messages, messages per item and average fill of the limit (texts or message payloads)"""
+    items = sum(len(packed) for _, packed in messages)
+    texts = [text['text'] if isinstance(text, dict) else text for text, _ in messages]
+    fill = sum(map(telegram_length, texts)) / (limit * len(messages)) if messages else 0
+    return {
+        'items': items,
+        'messages': len(messages),
+        'messages_per_item': round(len(messages) / items, 3) if items else 0,
+        'avg_fill': round(fill, 3)
+    }
@@ -19,7 +19,16 @@ class MetricsTracker:
             'success_count': 0,
             'failure_count': 0,
             'total_items': 0,
-            'failed_platforms': []
+            'failed_platforms': [],
+            'circuit_open': [],
+            'not_due': [],
+            'deadline_cut_off': [],
+            'url_canonicalization': {'rewritten': 0, 'duplicates': 0, 'history_hits': 0},
+            'near_duplicates': {'folded': 0, 'window_hits': 0},
+            'seen_filter': {'filter_only_hits': 0, 'estimated_error_rate': 0},
+            'keywords': None,
+            'delivery': None,
+            'packing': None
         }
     
     def record_platform_attempt(self, platform_name):
@@ -51,6 +60,50 @@ class MetricsTracker:
             'timestamp': datetime.now().isoformat()
         }
     
+    def record_circuit_skip(self, platform_name):
+        """Record a feed skipped because its circuit breaker is open"""
+        self.current_run['circuit_open'].append(platform_name)
+    
+    def record_not_due(self, platform_names):
+        """Record feeds not polled because the adaptive scheduler found them not due (not attempts)"""
+        self.current_run['not_due'].extend(platform_names)
+    
+    def record_deadline_cut_off(self, platform_names):
+        """Record feeds cancelled because the run deadline was reached"""
+        self.current_run['deadline_cut_off'].extend(platform_names)
+    
+    def record_url_canonicalization(self, rewritten, duplicates, history_hits=0):
+        """Record URLs rewritten at ingest and the duplicates they exposed (in-run and against history)"""
+        self.current_run['url_canonicalization'] = {
+            'rewritten': rewritten, 'duplicates': duplicates, 'history_hits': history_hits
+        }
+    
+    def record_near_duplicates(self, folded, window_hits):
+        """Record items folded into a near-duplicate title from another platform / dropped as already sent"""
+        self.current_run['near_duplicates'] = {'folded': folded, 'window_hits': window_hits}
+    
+    def record_seen_filter(self, filter_only_hits, estimated_error_rate):
+        """Record items dropped as sent only on a seen-filter hit (possible false positives)"""
+        self.current_run['seen_filter'] = {
+            'filter_only_hits': filter_only_hits, 'estimated_error_rate': estimated_error_rate
+        }
+    
+    def record_keyword_stats(self, stats):
+        """Record keyword filtering stats (groups, titles evaluated, time, groups that matched)"""
+        self.current_run['keywords'] = stats
+    
+    def record_message_packing(self, stats):
+        """Record how items were packed into messages (see message_packer.packing_stats)"""
+        self.current_run['packing'] = stats
+    
+    def record_delivery(self, stats):
+        """Record Telegram delivery stats (see delivery.DeliveryScheduler.get_stats)"""
+        self.current_run['delivery'] = stats
+    
+    def record_http_stats(self, stats):
+        """Record connection pool statistics (requests / new / reused connections)"""
+        self.current_run['http'] = stats
+    
     def finalize(self):
         """Finalize metrics and calculate stats"""
         end_time = datetime.now()
@@ -114,4 +167,38 @@ class MetricsTracker:
         if self.current_run['failed_platforms']:
             summary += f"- 失败平台: {', '.join(self.current_run['failed_platforms'])}\n"
         
+        if self.current_run['circuit_open']:
+            summary += f"- 熔断跳过: {len(self.current_run['circuit_open'])} ({', '.join(self.current_run['circuit_open'])})\n"
+        
+        if self.current_run['not_due']:
+            summary += f"- 未到期跳过: {len(self.current_run['not_due'])}\n"
+        
+        if self.current_run['deadline_cut_off']:
+            summary += f"- 超时截断: {len(self.current_run['deadline_cut_off'])} ({', '.join(self.current_run['deadline_cut_off'])})\n"
+        canon = self.current_run['url_canonicalization']
+        if canon['rewritten']:
+            summary += (
+                f"- URL 规范化: 改写 {canon['rewritten']}, 本次去重 {canon['duplicates']}, "
+                f"命中历史 {canon['history_hits']}\n"
+            )
+        keywords = self.current_run['keywords']
+        if keywords:
+            summary += (
+                f"- 关键词: {keywords['groups']} 组, {keywords['titles']} 条标题 {keywords['eval_ms']:.1f}ms, "
+                f"命中 {keywords['matched_groups']} 组\n"
+            )
+        near_dup = self.current_run['near_duplicates']
+        if near_dup['folded'] or near_dup['window_hits']:
+            summary += f"- 相似标题: 合并 {near_dup['folded']}, 窗口内已推送 {near_dup['window_hits']}\n"
+        seen = self.current_run['seen_filter']
+        if seen['filter_only_hits']:
+            summary += (
+                f"- 长期去重: {seen['filter_only_hits']} 条仅由布隆过滤器判定为已推送 "
+                f"(误判率约 {seen['estimated_error_rate']:.2e})\n"
+            )
+        
+        http_stats = self.current_run.get('http')
+        if http_stats:
+            summary += f"- HTTP 请求: {http_stats['requests']} (复用连接 {http_stats['reused_connections']})\n"
+        
         return summary
@@ -0,0 +1,156 @@
+"""
+Latency-ranked RSSHub mirror pool
+
+- 所有镜像并行探测
+- 每个镜像维护延迟与错误率的滑动平均（EWMA），按得分排序
+- 每个请求选当前最优镜像；连续失败的镜像暂时下线，冷却后自动重新纳入
+"""
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MirrorState:
+    """Moving latency / error score of one mirror"""
+
+    def __init__(self, url, default_latency):
+        self.url = url
+        self.latency = default_latency
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self.samples = 0
+
+
+class MirrorPool:
+    """Pick the best RSSHub mirror for each request"""
+
+    def __init__(self, mirrors, alpha=0.3, failure_threshold=3, cooldown=300,
+                 default_latency=5.0, error_penalty=10.0):
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.error_penalty = error_penalty
+        self.mirrors = []
+        self._states = {}
+        self._ready = None
+        for url in mirrors:
+            url = url.rstrip('/')
+            if url not in self._states:
+                self._states[url] = MirrorState(url, default_latency)
+                self.mirrors.append(url)
+
+    def _score(self, state):
+        """Lower is better: latency inflated by recent error rate"""
+        return state.latency * (1 + self.error_penalty * state.error_rate)
+
+    def _is_available(self, state, now):
+        if state.down_until and now >= state.down_until:
+            # 冷却结束，重新纳入（再失败一次即再次下线）
+            logger.info(f"Re-admitting RSSHub mirror after cooldown: {state.url}")
+            state.down_until = 0.0
+            state.consecutive_failures = self.failure_threshold - 1
+        return not state.down_until
+
+    def ranked(self, exclude=()):
+        """Available mirrors, best first; falls back to all mirrors if every one is down"""
+        now = time.monotonic()
+        candidates = [
+            self._states[url] for url in self.mirrors
+            if url not in exclude and self._is_available(self._states[url], now)
+        ]
+        if not candidates:
+            candidates = [
+                self._states[url] for url in self.mirrors if url not in exclude
+            ]
+        # sorted() 稳定：得分相同时保持配置顺序（主实例优先）
+        return [state.url for state in sorted(candidates, key=self._score)]
+
+    def best(self, exclude=()):
+        """Currently best mirror, or None if all are excluded"""
+        ranked = self.ranked(exclude)
+        return ranked[0] if ranked else None
+
+    def record_success(self, url, latency):
+        state = self._states.get(url)
+        if state is None:
+            return
+        if state.samples == 0:
+            state.latency = latency
+        else:
+            state.latency = (1 - self.alpha) * state.latency + self.alpha * latency
+        state.error_rate = (1 - self.alpha) * state.error_rate
+        state.consecutive_failures = 0
+        state.down_until = 0.0
+        state.samples += 1
+
+    def record_failure(self, url):
+        state = self._states.get(url)
+        if state is None:
+            return
+        state.error_rate = (1 - self.alpha) * state.error_rate + self.alpha
+        state.consecutive_failures += 1
+        state.samples += 1
+        if state.consecutive_failures >= self.failure_threshold and not state.down_until:
+            state.down_until = time.monotonic() + self.cooldown
+            logger.warning(f"RSSHub mirror marked down for {self.cooldown}s: {url}")
+
+    async def wait_ready(self):
+        """
+        Wait until a running probe round has found a healthy mirror
+
+        Returns immediately when no probe round is in progress.
+        """
+        if self._ready is not None:
+            await self._ready.wait()
+
+    async def _probe(self, client, url, headers, timeout):
+        start = time.monotonic()
+        try:
+            response = await client.get(url, headers=headers, timeout=timeout)
+            if response.status_code < 500:
+                self.record_success(url, time.monotonic() - start)
+                # 第一个健康镜像出现即可放行等待中的请求
+                self._ready.set()
+                return True
+            logger.warning(f"RSSHub probe {url} returned {response.status_code}")
+        except Exception as e:
+            logger.warning(f"RSSHub probe {url} failed: {type(e).__name__}")
+        self.record_failure(url)
+        return False
+
+    async def probe_all(self, client, headers=None, timeout=15, primary_timeout=60):
+        """
+        Probe every mirror in parallel
+
+        The first mirror (the configured primary) gets a longer timeout since
+        a sleeping instance may need a cold start. Callers of wait_ready() are
+        released as soon as any mirror answers, not when the slowest probe ends.
+        """
+        self._ready = asyncio.Event()
+        try:
+            results = await asyncio.gather(*(
+                self._probe(client, url, headers, primary_timeout if i == 0 else timeout)
+                for i, url in enumerate(self.mirrors)
+            ))
+        finally:
+            self._ready.set()
+            self._ready = None
+        healthy = sum(1 for ok in results if ok)
+        logger.info(f"RSSHub probes: {healthy}/{len(self.mirrors)} healthy, ranking: {self.ranked()}")
+        return healthy
+
+    def get_summary(self):
+        """Per-mirror score snapshot for logs"""
+        now = time.monotonic()
+        return [
+            {
+                'url': url,
+                'latency': round(self._states[url].latency, 3),
+                'error_rate': round(self._states[url].error_rate, 3),
+                'down': bool(self._states[url].down_until and now < self._states[url].down_until),
+            }
+            for url in self.mirrors
+        ]
@@ -0,0 +1,278 @@
+"""
+Cross-platform near-duplicate titles
+
+同一条新闻会从微博、百度、抽屉、华尔街见闻和多个今日热榜节点以略有不同的措辞到达，
+URL 完全不同，只能按标题判断：
+- 标题做 NFKC 归一、小写、去掉标点空白后切成字符 n-gram（中文无需分词）
+- 两个标题都含数字且数字不同（"上涨3%" / "上涨5%"）时不算重复，
+  只差数字的标题字符 n-gram 几乎相同，但说的是不同的事
+- MinHash 签名分成若干 band 做 LSH：每个标题只查 band 个桶，候选再用精确 Jaccard 确认，
+  每条标题的开销与窗口大小无关
+- 本次运行内的近似重复合并为一条，item['platforms'] 记录所有来源平台
+- 已推送标题保留 window_hours 小时（data/near_dup.json），窗口内再次出现的直接丢弃
+"""
+import json
+import os
+import random
+import re
+import struct
+import time
+import unicodedata
+import zlib
+from collections import deque
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 2^61 - 1，MinHash 置换 (a * x + b) mod P
+MERSENNE_PRIME = (1 << 61) - 1
+# 置换参数用固定种子生成，保证签名跨运行稳定（持久化窗口依赖这一点）
+PERMUTATION_SEED = 20240601
+
+NON_WORD = re.compile(r'[\W_]+', re.UNICODE)
+DIGITS = re.compile(r'\d+')
+
+
+def normalize_title(title):
+    """NFKC, lowercase, drop punctuation and whitespace"""
+    return NON_WORD.sub('', unicodedata.normalize('NFKC', title or '').lower())
+
+
+def shingles(text, size):
+    """Character n-grams of a normalized title (the whole title if shorter than size)"""
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def numeric_tokens(text):
+    """Digit runs of a normalized title, sorted (punctuation is already gone, so 3.5 reads as 35)"""
+    return tuple(sorted(DIGITS.findall(text)))
+
+
+def numbers_conflict(numbers, other):
+    """Both titles carry numbers and they differ: a different story, not a rewording"""
+    return bool(numbers) and bool(other) and numbers != other
+
+
+class _Entry:
+    """One title in the window"""
+
+    __slots__ = ('text', 'shingles', 'numbers', 'bands', 'ts', 'platforms')
+
+    def __init__(self, text, shingle_set, bands, ts, platforms):
+        self.text = text
+        self.shingles = shingle_set
+        self.numbers = numeric_tokens(text)
+        self.bands = bands
+        self.ts = int(ts)
+        self.platforms = platforms
+
+
+class NearDuplicateIndex:
+    """MinHash LSH index of recently sent titles over a sliding time window"""
+
+    def __init__(self, state_file=None, shingle_size=2, num_perm=64, bands=16, threshold=0.6, window_hours=48):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.state_file = state_file
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.window = window_hours * 3600
+
+        rng = random.Random(PERMUTATION_SEED)
+        self._perms = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(MERSENNE_PRIME)) for _ in range(num_perm)]
+
+        # 按时间从旧到新，便于从头部淘汰过期条目
+        self._entries = deque()
+        # {band 哈希: [entry, ...]}
+        self._buckets = {}
+        self._dirty = False
+        self.stats = {'checked': 0, 'folded': 0, 'window_hits': 0, 'candidates': 0}
+        self._load()
+
+    @classmethod
+    def from_config(cls, config, state_file):
+        """Build from the "near_duplicate" section of ScrapingConfig (None when disabled)"""
+        settings = config.get_near_duplicate_settings()
+        if not settings.get('enabled', True):
+            return None
+        return cls(
+            state_file,
+            shingle_size=settings.get('shingle_size', 2),
+            num_perm=settings.get('num_perm', 64),
+            bands=settings.get('bands', 16),
+            threshold=settings.get('threshold', 0.6),
+            window_hours=settings.get('window_hours', 48)
+        )
+
+    def _band_keys(self, shingle_set):
+        """MinHash signature folded into one 32-bit hash per band"""
+        hashes = [zlib.crc32(s.encode('utf-8')) for s in shingle_set]
+        signature = [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in self._perms]
+        rows = self.rows
+        return [
+            zlib.crc32(struct.pack(f'<I{rows}Q', band, *signature[band * rows:(band + 1) * rows]))
+            for band in range(self.bands)
+        ]
+
+    def _lookup(self, buckets, bands, shingle_set, numbers):
+        """
+        Best candidate sharing a band whose exact Jaccard similarity reaches
+        the threshold and whose numbers don't conflict
+        """
+        seen = set()
+        best, best_score = None, self.threshold
+        for key in bands:
+            for entry in buckets.get(key, ()):
+                if id(entry) in seen:
+                    continue
+                seen.add(id(entry))
+                self.stats['candidates'] += 1
+                if numbers_conflict(numbers, entry.numbers):
+                    continue
+                union = len(shingle_set | entry.shingles)
+                score = len(shingle_set & entry.shingles) / union if union else 0
+                if score >= best_score:
+                    best, best_score = entry, score
+        return best
+
+    def _insert(self, buckets, entry):
+        for key in entry.bands:
+            buckets.setdefault(key, []).append(entry)
+
+    def _prune(self, now):
+        cutoff = now - self.window
+        while self._entries and self._entries[0].ts <= cutoff:
+            entry = self._entries.popleft()
+            for key in entry.bands:
+                bucket = self._buckets.get(key)
+                if bucket:
+                    bucket.remove(entry)
+                    if not bucket:
+                        del self._buckets[key]
+            self._dirty = True
+
+    def _load(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load near-duplicate window: {e}")
+            return
+
+        if data.get('params') != self._params():
+            # 参数变化后旧的 band 哈希不再可比，按保存的标题重新计算
+            logger.info("Near-duplicate settings changed, rebuilding signatures")
+        for item in sorted(data.get('entries', []), key=lambda item: item['ts']):
+            text = item['text']
+            shingle_set = shingles(text, self.shingle_size)
+            if not shingle_set:
+                continue
+            bands = item['bands'] if data.get('params') == self._params() else self._band_keys(shingle_set)
+            entry = _Entry(text, shingle_set, bands, item['ts'], item.get('platforms', []))
+            self._entries.append(entry)
+            self._insert(self._buckets, entry)
+        self._prune(time.time())
+
+    def _params(self):
+        return [self.shingle_size, self.bands * self.rows, self.bands, PERMUTATION_SEED]
+
+    def contains(self, title):
+        """Whether a near-duplicate of `title` was sent within the window"""
+        text = normalize_title(title)
+        shingle_set = shingles(text, self.shingle_size)
+        if not shingle_set:
+            return False
+        bands = self._band_keys(shingle_set)
+        return self._lookup(self._buckets, bands, shingle_set, numeric_tokens(text)) is not None
+
+    def fold(self, trends, use_window=True):
+        """
+        Fold near-duplicate items across platforms into one
+
+        The first occurrence is kept and gets item['platforms'] listing every
+        source platform; later near-duplicates are dropped. With use_window,
+        items matching a title already sent within the window are dropped too.
+        """
+        self._prune(time.time())
+        run_buckets = {}
+        result = {}
+        for platform, items in trends.items():
+            kept = []
+            for item in items:
+                text = normalize_title(item.get('title'))
+                shingle_set = shingles(text, self.shingle_size)
+                if not shingle_set:
+                    kept.append(item)
+                    continue
+                self.stats['checked'] += 1
+                bands = self._band_keys(shingle_set)
+                numbers = numeric_tokens(text)
+
+                if use_window and self._lookup(self._buckets, bands, shingle_set, numbers) is not None:
+                    self.stats['window_hits'] += 1
+                    continue
+
+                match = self._lookup(run_buckets, bands, shingle_set, numbers)
+                if match is not None:
+                    # 本次运行内的近似重复：合并到先出现的那一条
+                    if platform not in match.platforms:
+                        match.platforms.append(platform)
+                    self.stats['folded'] += 1
+                    continue
+
+                item['platforms'] = [platform]
+                self._insert(run_buckets, _Entry(text, shingle_set, bands, 0, item['platforms']))
+                kept.append(item)
+            if kept:
+                result[platform] = kept
+
+        if self.stats['folded'] or self.stats['window_hits']:
+            logger.info(
+                f"Near-duplicate titles: folded {self.stats['folded']} in this run, "
+                f"dropped {self.stats['window_hits']} sent within the window"
+            )
+        return result
+
+    def add(self, item, platform=None):
+        """Remember a sent item's title for the rest of the window"""
+        text = normalize_title(item.get('title'))
+        shingle_set = shingles(text, self.shingle_size)
+        if not shingle_set:
+            return
+        platforms = list(item.get('platforms') or ([platform] if platform else []))
+        entry = _Entry(text, shingle_set, self._band_keys(shingle_set), time.time(), platforms)
+        self._entries.append(entry)
+        self._insert(self._buckets, entry)
+        self._dirty = True
+
+    def save(self):
+        if not self.state_file or not self._dirty:
+            return
+        data = {
+            'params': self._params(),
+            'entries': [
+                {'text': e.text, 'ts': e.ts, 'bands': e.bands, 'platforms': e.platforms}
+                for e in self._entries
+            ]
+        }
+        tmp_file = self.state_file + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_file, self.state_file)
+            self._dirty = False
+        except Exception as e:
+            logger.error(f"Failed to save near-duplicate window: {e}")
+
+    def get_summary(self):
+        return (
+            f"Near-duplicate index: {len(self._entries)} titles in window, {len(self._buckets)} buckets, "
+            f"{self.stats['candidates']} candidate checks for {self.stats['checked']} titles"
+        )
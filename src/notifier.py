@@ -1,153 +1,79 @@
-import requests
-import time
 import logging
-import re
+
+from delivery import DeliveryScheduler
+from formatting import MARKDOWN, PLAIN, entry, message_payload, numbered, split_lines
+from message_packer import ENTRY_SEPARATOR, TELEGRAM_MAX_LENGTH, pack_entries, telegram_length
 
 logger = logging.getLogger(__name__)
 
+# 单条标题的最大长度，保证任何条目都能单独装进一条消息
+MAX_TITLE_LENGTH = 512
+
 class TelegramNotifier:
-    def __init__(self, token, chat_id):
+    def __init__(self, token, chat_id, deadline=None, scheduler=None):
         self.token = token
         self.chat_id = chat_id
-        self.api_url = f"https://api.telegram.org/bot{self.token}/sendMessage"
+        # 运行时间预算（deadline.RunDeadline），请求超时不超过剩余时间
+        self.deadline = deadline
+        # 发送由 DeliveryScheduler 按 Telegram 限速调度，不再固定 sleep
+        self.scheduler = scheduler or DeliveryScheduler(token, deadline=deadline)
 
-    def send_message(self, message):
-        """Send message to Telegram, splitting if necessary"""
-        if not message:
-            logger.warning("Empty message, nothing to send")
-            return False
-            
+    def split_message(self, message):
+        """Split a message into parts under Telegram's 4096-character limit"""
         # Telegram message limit is 4096 characters. 
         # We'll split by newlines to avoid breaking markdown.
         max_length = 4000 # Leave some buffer
-        
-        messages = []
-        if len(message) > max_length:
-            current_msg = ""
-            for line in message.split('\n'):
-                if len(current_msg) + len(line) + 1 > max_length:
-                    messages.append(current_msg)
-                    current_msg = line + "\n"
-                else:
-                    current_msg += line + "\n"
-            if current_msg:
-                messages.append(current_msg)
-        else:
-            messages = [message]
-
-        success = True
-        for i, msg in enumerate(messages, 1):
-            logger.info(f"Sending message part {i}/{len(messages)}")
-            if not self._send_single_message(msg):
-                success = False
-            # Telegram 限速：每条消息间隔 3 秒，避免被封
-            time.sleep(3)
-        return success
-
-    def _send_single_message(self, text):
-        payload = {
-            'chat_id': self.chat_id,
-            'text': text,
-            'parse_mode': 'Markdown',
-            'disable_web_page_preview': True
-        }
-        try:
-            logger.debug(f"Sending to chat_id: {self.chat_id}")
-            response = requests.post(self.api_url, json=payload, timeout=10)
-            
-            if response.status_code != 200:
-                logger.error(f"Telegram HTTP error: {response.status_code}")
-                logger.error(f"Response: {response.text}")
-                return False
-
-            data = {}
-            try:
-                data = response.json()
-            except Exception:
-                logger.error("Telegram response is not JSON")
-                return False
-
-            if not data.get('ok', False):
-                err_code = data.get('error_code')
-                desc = data.get('description', '')
-                logger.error(f"Telegram API error: {err_code} - {desc}")
-
-                # 回退：如果是解析错误，改用纯文本发送
-                if 'parse' in desc.lower() or 'entities' in desc.lower():
-                    plain = self._to_plain_text(text)
-                    logger.info("Retrying with plain text (no parse_mode)")
-                    payload = {
-                        'chat_id': self.chat_id,
-                        'text': plain,
-                        'disable_web_page_preview': True
-                    }
-                    retry_resp = requests.post(self.api_url, json=payload, timeout=10)
-                    if retry_resp.status_code != 200:
-                        logger.error(f"Telegram HTTP error on retry: {retry_resp.status_code}")
-                        logger.error(f"Response: {retry_resp.text}")
-                        return False
-                    retry_data = {}
-                    try:
-                        retry_data = retry_resp.json()
-                    except Exception:
-                        logger.error("Telegram retry response is not JSON")
-                        return False
-                    if not retry_data.get('ok', False):
-                        logger.error(f"Telegram API retry error: {retry_data.get('error_code')} - {retry_data.get('description')}")
-                        return False
-                    logger.info("Message sent successfully (plain text fallback)")
-                    return True
-                return False
+        return split_lines(message, max_length)
 
-            logger.info("Message sent successfully")
-            return True
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request error: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                logger.error(f"Response text: {e.response.text}")
-            return False
-        except Exception as e:
-            logger.error(f"Unexpected error sending message: {e}")
+    def send_message(self, message):
+        """Send message to Telegram, splitting if necessary (a str, or a formatting.message_payload)"""
+        if not message:
+            logger.warning("Empty message, nothing to send")
             return False
+        
+        if isinstance(message, dict) and telegram_length(message['text']) > TELEGRAM_MAX_LENGTH:
+            # 超长时只能按行拆分 Markdown，纯文本回退由 delivery 转换
+            message = message['text']
+        messages = [message] if isinstance(message, dict) else self.split_message(message)
+        logger.info(f"Sending message in {len(messages)} part(s)")
+        job = self.scheduler.submit(self.chat_id, messages)
+        self.scheduler.run()
+        return bool(job.ok)
 
-    def _to_plain_text(self, text):
-        # 将 Markdown 链接 [text](url) 转为两行：text\nurl
-        def repl(m):
-            t = m.group(1)
-            u = m.group(2)
-            return f"{t}\n{u}"
-
-        try:
-            text = re.sub(r"\[([^\]]+)\]\(([^)]+)\)", repl, text)
-            # 去除粗体/斜体等标记
-            text = text.replace('*', '')
-            text = text.replace('_', '')
-            text = text.replace('`', '')
-            return text
-        except Exception as e:
-            logger.error(f"Error converting to plain text: {e}")
-            return text
-
-    def format_trends(self, trends_data):
-        message = ""
+    def format_entry(self, number, item, mode=MARKDOWN):
+        """One numbered item: link plus the source platforms of folded near-duplicates"""
+        title = item['title']
+        if len(title) > MAX_TITLE_LENGTH:
+            title = title[:MAX_TITLE_LENGTH - 1] + '…'
         
+        # 跨平台相似标题合并后的来源平台
+        platforms = item.get('platforms') or []
+        note = f" ({' / '.join(platforms)})" if len(platforms) > 1 else ''
+        return numbered(number, entry(title, item['url'], note, mode), mode)
+
+    def format_trends(self, trends_data, mode=MARKDOWN):
         # 收集所有条目，不按平台分组
         all_items = []
         for platform, items in trends_data.items():
             if items:
                 all_items.extend(items)
         
-        for i, item in enumerate(all_items, 1):
-            title = item['title']
-            url = item['url']
-            
-            # Escape special Markdown characters in title
-            title = title.replace('\\', '\\\\')
-            title = title.replace('[', '\\[')
-            title = title.replace(']', '\\]')
-            
-            # Telegram Markdown link: [text](url)
-            message += f"{i}. [{title}]({url})\n\n"
-        
+        message = "".join(self.format_entry(i, item, mode) + "\n\n" for i, item in enumerate(all_items, 1))
         logger.debug(f"Formatted message length: {len(message)} characters")
         return message
+
+    def pack_items(self, items, limit=TELEGRAM_MAX_LENGTH):
+        """
+        Pack [(platform, item), ...] into as few messages as possible
+
+        Returns [(payload, [(platform, item), ...]), ...]: each payload holds
+        the Markdown text and its plain-text fallback rendered from the same
+        fragments (see message_packer / formatting).
+        """
+        packed = pack_entries(items, lambda number, packed_item: self.format_entry(number, packed_item[1]), limit)
+        return [
+            (message_payload(text, plain=ENTRY_SEPARATOR.join(
+                self.format_entry(number, item, PLAIN) for number, (_, item) in enumerate(batch, 1)
+            )), batch)
+            for text, batch in packed
+        ]
@@ -0,0 +1,225 @@
+"""
+Durable notification outbox
+
+格式化好的消息先写入 data/outbox.db（SQLite），再由发送流程取出到期的消息投递：
+- 发送失败的消息留在库中，按指数退避在之后的运行（包括守护进程重启后）重试，
+  不需要重新抓取；超过 max_attempts 次或 max_age_hours 的消息标记为 dead
+- 分多段的消息记录已送达的段数，重试时从下一段继续，不重复发送
+- 消息携带其条目，Telegram 确认送达后才写入历史：先记为 sent（提交），写完历史后记为
+  recorded；两步之间中断的消息在下次启动时补写历史，保证每条只写一次
+- 排队中（以及最近已送达）的 URL 不会再次入队
+"""
+import json
+import os
+import sqlite3
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id TEXT NOT NULL,
+    parts TEXT NOT NULL,
+    items TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    sent_parts INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created INTEGER NOT NULL,
+    next_attempt INTEGER NOT NULL,
+    updated INTEGER NOT NULL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(status, next_attempt);
+CREATE TABLE IF NOT EXISTS outbox_urls (
+    url TEXT NOT NULL,
+    message_id INTEGER NOT NULL REFERENCES outbox(id) ON DELETE CASCADE,
+    PRIMARY KEY (url, message_id)
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_urls_message ON outbox_urls(message_id);
+"""
+
+# pending: 等待发送；sent: 已送达、历史未写入；recorded: 已写入历史；dead: 放弃
+PENDING, SENT, RECORDED, DEAD = 'pending', 'sent', 'recorded', 'dead'
+
+
+def dedup_url(item):
+    """URL an item is deduplicated by: its canonical URL (url_canon), else the delivered link"""
+    return item.get('canonical_url') or item.get('url')
+
+
+class OutboxMessage:
+    """One queued message (possibly several parts) and the items it announces"""
+
+    __slots__ = ('id', 'chat_id', 'parts', 'items', 'sent_parts', 'attempts')
+
+    def __init__(self, id, chat_id, parts, items, sent_parts=0, attempts=0):
+        self.id = id
+        self.chat_id = chat_id
+        self.parts = parts
+        self.items = items
+        self.sent_parts = sent_parts
+        self.attempts = attempts
+
+    @property
+    def remaining_parts(self):
+        return self.parts[self.sent_parts:]
+
+
+class Outbox:
+    """SQLite-backed queue of formatted Telegram messages"""
+
+    def __init__(self, db_file, max_attempts=8, backoff_seconds=60, max_backoff_minutes=360,
+                 max_age_hours=48, retention_days=7):
+        self.db_file = db_file
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff = max_backoff_minutes * 60
+        self.max_age = max_age_hours * 3600
+        self.retention = retention_days * 86400
+        os.makedirs(os.path.dirname(db_file) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_file)
+        # 回滚日志而不是 WAL：工作流只提交 outbox.db，每次提交的数据必须直接写入 .db 文件，
+        # 即使运行被强行终止也不会只留在未提交的 -wal 中（outbox 很小，只有一个写入者）
+        self.conn.execute('PRAGMA journal_mode=DELETE')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, config, db_file):
+        """Build from the "outbox" section of ScrapingConfig"""
+        settings = config.get_outbox_settings()
+        return cls(
+            db_file,
+            max_attempts=settings.get('max_attempts', 8),
+            backoff_seconds=settings.get('backoff_seconds', 60),
+            max_backoff_minutes=settings.get('max_backoff_minutes', 360),
+            max_age_hours=settings.get('max_age_hours', 48),
+            retention_days=settings.get('retention_days', 7)
+        )
+
+    def enqueue(self, chat_id, parts, items):
+        """Queue message parts together with their [(platform, item), ...]; returns the message id"""
+        now = int(time.time())
+        with self.conn:
+            cursor = self.conn.execute(
+                'INSERT INTO outbox (chat_id, parts, items, created, next_attempt, updated) VALUES (?, ?, ?, ?, ?, ?)',
+                (str(chat_id), json.dumps(parts, ensure_ascii=False),
+                 json.dumps(items, ensure_ascii=False), now, now, now)
+            )
+            message_id = cursor.lastrowid
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO outbox_urls (url, message_id) VALUES (?, ?)',
+                [(dedup_url(item), message_id) for _, item in items if dedup_url(item)]
+            )
+        return message_id
+
+    def contains(self, url, chat_id=None):
+        """Whether `url` is queued, or was delivered within the retention period (to chat_id, if given)"""
+        if chat_id is None:
+            row = self.conn.execute(
+                'SELECT 1 FROM outbox_urls u JOIN outbox o ON o.id = u.message_id '
+                'WHERE u.url = ? AND o.status != ? LIMIT 1',
+                (url, DEAD)
+            ).fetchone()
+        else:
+            row = self.conn.execute(
+                'SELECT 1 FROM outbox_urls u JOIN outbox o ON o.id = u.message_id '
+                'WHERE u.url = ? AND o.chat_id = ? AND o.status != ? LIMIT 1',
+                (url, str(chat_id), DEAD)
+            ).fetchone()
+        return row is not None
+
+    def filter_queued(self, trends, chat_id=None):
+        """Drop items already waiting in (or recently delivered through) the outbox"""
+        result = {}
+        for platform, items in trends.items():
+            kept = [item for item in items if not self.contains(dedup_url(item), chat_id)]
+            if kept:
+                result[platform] = kept
+        return result
+
+    def _messages(self, where, params):
+        rows = self.conn.execute(
+            f'SELECT id, chat_id, parts, items, sent_parts, attempts FROM outbox WHERE {where} ORDER BY id', params
+        )
+        return [
+            OutboxMessage(id, chat_id, json.loads(parts), [tuple(entry) for entry in json.loads(items)], sent_parts, attempts)
+            for id, chat_id, parts, items, sent_parts, attempts in rows
+        ]
+
+    def due(self, now=None):
+        """Pending messages whose next attempt is due (expired ones are marked dead first)"""
+        now = int(time.time() if now is None else now)
+        with self.conn:
+            cursor = self.conn.execute(
+                'UPDATE outbox SET status = ?, updated = ?, last_error = ? WHERE status = ? AND created < ?',
+                (DEAD, now, 'expired', PENDING, now - self.max_age)
+            )
+            if cursor.rowcount:
+                logger.warning(f"Outbox: gave up on {cursor.rowcount} messages older than {self.max_age // 3600}h")
+        return self._messages('status = ? AND next_attempt <= ?', (PENDING, now))
+
+    def unrecorded(self):
+        """Messages Telegram acknowledged whose items were not written to history yet"""
+        return self._messages('status = ?', (SENT,))
+
+    def mark_sent(self, message):
+        """Telegram acknowledged every part (committed before history is written)"""
+        with self.conn:
+            self.conn.execute(
+                'UPDATE outbox SET status = ?, sent_parts = ?, updated = ?, last_error = NULL WHERE id = ?',
+                (SENT, len(message.parts), int(time.time()), message.id)
+            )
+
+    def mark_recorded(self, message):
+        with self.conn:
+            self.conn.execute(
+                'UPDATE outbox SET status = ?, updated = ? WHERE id = ?', (RECORDED, int(time.time()), message.id)
+            )
+
+    def mark_failed(self, message, sent_parts, error, count_attempt=True):
+        """
+        Keep a failed message for a later run
+
+        sent_parts counts parts delivered in this attempt. With
+        count_attempt=False (e.g. the run deadline was reached) the message
+        is retried next run without backoff.
+        """
+        now = int(time.time())
+        attempts = message.attempts + (1 if count_attempt else 0)
+        status = DEAD if attempts >= self.max_attempts else PENDING
+        delay = min(self.max_backoff, self.backoff_seconds * 2 ** max(attempts - 1, 0)) if count_attempt else 0
+        with self.conn:
+            self.conn.execute(
+                'UPDATE outbox SET status = ?, sent_parts = sent_parts + ?, attempts = ?, next_attempt = ?, '
+                'updated = ?, last_error = ? WHERE id = ?',
+                (status, sent_parts, attempts, now + delay, now, error, message.id)
+            )
+        if status == DEAD:
+            logger.error(f"Outbox: giving up on message {message.id} after {attempts} attempts ({error})")
+        return status
+
+    def purge(self, now=None):
+        """Delete delivered / dead messages past the retention period"""
+        now = int(time.time() if now is None else now)
+        with self.conn:
+            cursor = self.conn.execute(
+                'DELETE FROM outbox WHERE status IN (?, ?) AND updated < ?', (RECORDED, DEAD, now - self.retention)
+            )
+        return cursor.rowcount
+
+    def counts(self):
+        return dict(self.conn.execute('SELECT status, COUNT(*) FROM outbox GROUP BY status').fetchall())
+
+    def get_summary(self):
+        counts = self.counts()
+        return (
+            f"Outbox: {counts.get(PENDING, 0)} pending, {counts.get(RECORDED, 0) + counts.get(SENT, 0)} delivered, "
+            f"{counts.get(DEAD, 0)} dead"
+        )
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
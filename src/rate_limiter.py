@@ -0,0 +1,135 @@
+"""
+Per-host token-bucket rate limiter
+
+只对同一 host 的请求限速，不同 host 之间互不等待；
+支持随机抖动，并遵守 429/503 响应中的 Retry-After。
+"""
+import asyncio
+import random
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations
+
+    reserve() always succeeds and returns how long the caller must wait
+    before using its token, so waiting never holds a lock.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, now=None):
+        """Take one token; returns seconds to wait before it may be used"""
+        with self._lock:
+            now = time.monotonic() if now is None else now
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def block(self, seconds, now=None):
+        """Refuse tokens for the next `seconds` (e.g. Retry-After)"""
+        with self._lock:
+            now = time.monotonic() if now is None else now
+            self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+def parse_retry_after(value, max_seconds=None):
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    seconds = max(0.0, seconds)
+    if max_seconds is not None:
+        seconds = min(seconds, max_seconds)
+    return seconds
+
+
+class HostRateLimiter:
+    """One token bucket per host, configured from scraping_config.json"""
+
+    def __init__(self, rate=2.0, burst=4, jitter=(0.0, 0.5), hosts=None, max_retry_after=120):
+        self.rate = rate
+        self.burst = burst
+        self.jitter = tuple(jitter) if jitter else (0.0, 0.0)
+        self.hosts = hosts or {}
+        self.max_retry_after = max_retry_after
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """Build from the "rate_limits" section of ScrapingConfig"""
+        limits = config.get_rate_limits()
+        default = limits.get('default', {})
+        return cls(
+            rate=default.get('rate', 2.0),
+            burst=default.get('burst', 4),
+            jitter=limits.get('jitter', (0.0, 0.5)),
+            hosts=limits.get('hosts', {}),
+            max_retry_after=limits.get('max_retry_after', 120)
+        )
+
+    def _host_settings(self, host):
+        """Exact host match first, then parent domains (a.b.com -> b.com)"""
+        parts = host.split('.')
+        for i in range(len(parts) - 1):
+            settings = self.hosts.get('.'.join(parts[i:]))
+            if settings:
+                return settings.get('rate', self.rate), settings.get('burst', self.burst)
+        return self.rate, self.burst
+
+    def _bucket(self, host):
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self._host_settings(host)
+                bucket = TokenBucket(rate, burst)
+                self._buckets[host] = bucket
+        return bucket
+
+    def _delay(self, host):
+        wait = self._bucket(host).reserve()
+        if self.jitter[1] > 0:
+            wait += random.uniform(*self.jitter)
+        return wait
+
+    async def acquire(self, host):
+        """Wait (without blocking other hosts) until a request to `host` may start"""
+        wait = self._delay(host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def observe(self, host, response):
+        """Honour Retry-After on 429 / 503 responses for the whole host"""
+        if response.status_code not in (429, 503):
+            return None
+        seconds = parse_retry_after(response.headers.get('Retry-After'), self.max_retry_after)
+        if seconds:
+            logger.warning(f"{host} returned {response.status_code}, pausing host for {seconds:.0f}s")
+            self._bucket(host).block(seconds)
+        return seconds
@@ -0,0 +1,99 @@
+"""
+Compact history / cache records
+
+- 时间戳在内存中统一为整数 epoch 秒，时间窗口过滤只做整数比较，不再反复解析 ISO 字符串
+- __slots__ 记录代替 dict，平台名用 sys.intern 共享同一个字符串对象
+- 读取兼容三种时间格式：Python 写入的本地时间 ISO 字符串、go-fetcher 写入的
+  RFC 3339 "...Z" 字符串和数字；写回文件时统一为 go-fetcher 使用的 UTC "...Z" 格式
+"""
+import sys
+import time
+from datetime import datetime
+
+# 单独存放的字段，其余字段（published 等）原样保存在 extra 中
+RECORD_FIELDS = ('title', 'url', 'timestamp', 'platform', 'guid')
+
+
+def parse_timestamp(value):
+    """
+    Timestamp -> epoch seconds (None if unparseable)
+
+    Accepts naive ISO strings written by Python (local time), RFC 3339
+    strings with an offset or a trailing "Z" (written by go-fetcher) and
+    plain numbers.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        if value.endswith('Z'):
+            value = value[:-1] + '+00:00'
+        return datetime.fromisoformat(value).timestamp()
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def format_timestamp(ts):
+    """Epoch seconds -> RFC 3339 UTC string, the format go-fetcher writes"""
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(ts))
+
+
+class HistoryRecord:
+    """One sent item"""
+
+    __slots__ = ('title', 'url', 'ts', 'platform', 'guid', 'extra')
+
+    def __init__(self, title, url, ts, platform=None, guid=None, extra=None):
+        self.title = title
+        self.url = url
+        self.ts = int(ts)
+        self.platform = sys.intern(platform) if platform else None
+        self.guid = guid or None
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, item, default_ts=None):
+        """Build from a stored / fetched dict; a missing or bad timestamp becomes default_ts (or now)"""
+        ts = parse_timestamp(item.get('timestamp'))
+        if ts is None:
+            ts = time.time() if default_ts is None else default_ts
+        extra = {key: value for key, value in item.items() if key not in RECORD_FIELDS}
+        return cls(
+            item.get('title', ''), item.get('url', ''), ts,
+            platform=item.get('platform'), guid=item.get('guid'), extra=extra
+        )
+
+    @property
+    def timestamp(self):
+        return format_timestamp(self.ts)
+
+    def to_dict(self):
+        """Serializable dict in the existing history.json layout"""
+        item = {'title': self.title, 'url': self.url, 'timestamp': format_timestamp(self.ts)}
+        if self.platform:
+            item['platform'] = self.platform
+        if self.guid:
+            item['guid'] = self.guid
+        if self.extra:
+            item.update(self.extra)
+        return item
+
+    def __repr__(self):
+        return f"HistoryRecord({self.title!r}, {self.url!r}, {self.ts})"
+
+
+class CacheEntry:
+    """Cached fetch result of one platform"""
+
+    __slots__ = ('data', 'ts')
+
+    def __init__(self, data, ts):
+        self.data = data
+        self.ts = int(ts)
+
+    @classmethod
+    def from_dict(cls, entry):
+        ts = parse_timestamp(entry.get('timestamp'))
+        return cls(entry.get('data', []), 0 if ts is None else ts)
+
+    def to_dict(self):
+        return {'data': self.data, 'timestamp': format_timestamp(self.ts)}
@@ -8,6 +8,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from main import main
+from config_loader import ScrapingConfig
 
 # Configure logging
 logging.basicConfig(
@@ -28,14 +29,17 @@ def job():
         logger.error(f"Job failed: {e}")
 
 if __name__ == "__main__":
+    # 每次运行只抓取到期的源，所以按最小轮询间隔触发即可
+    interval_minutes = ScrapingConfig().get_scheduler_settings().get('min_interval_minutes', 60)
+    
     logger.info("TrendMonitor Daemon Started")
-    logger.info("Schedule: Every 1 hour")
+    logger.info(f"Schedule: Every {interval_minutes} minutes (only due feeds are polled)")
     
     # Run immediately on startup
     job()
     
-    # Schedule every hour
-    schedule.every(1).hours.do(job)
+    # Schedule at the scheduler's minimum polling interval
+    schedule.every(interval_minutes).minutes.do(job)
     
     while True:
         schedule.run_pending()
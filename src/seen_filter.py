@@ -0,0 +1,211 @@
+"""
+Long-horizon "already sent" filter
+
+可扩展布隆过滤器（Scalable Bloom Filter），按时间分代轮换，文件在 data/ 下用 mmap 打开：
+- 启动时只读文件头，不加载、不解析历史
+- 每一代写满 capacity 后追加一个容量翻倍、误判率减半的新分片，一代的误判率不超过
+  error_rate / generations；查询要检查所有代，因此总误判率不超过 error_rate
+- 每 window_days 开启新的一代，超过 generations 代的旧文件直接删除
+  （记忆长度约为 window_days * generations 天）
+- 没有假阴性：查不到的一定没发送过；查到的有不超过 error_rate 的概率是误判
+- 文件是每次运行都会改写的二进制，不提交到 git（工作流用 actions/cache 跨运行保留）；
+  目录不存在时由 HistoryManager 从已有历史重建
+"""
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'SEENBLM1'
+# magic, 位数 m, 容量, 哈希函数个数 k, 已插入数量
+HEADER = struct.Struct('<8sQQIQ')
+COUNT_OFFSET = HEADER.size - 8
+
+# 新分片的容量倍数 / 误判率倍数
+GROWTH = 2
+TIGHTENING = 0.5
+
+SLICE_PATTERN = re.compile(r'^gen-(\d+)-(\d+)\.bloom$')
+
+
+def _hashes(key):
+    """Two independent 64-bit hashes; positions are h1 + i * h2 (Kirsch-Mitzenmacher)"""
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+    h1, h2 = struct.unpack('<QQ', digest)
+    return h1, h2 | 1
+
+
+class BloomSlice:
+    """One fixed-size Bloom filter backed by a memory-mapped file"""
+
+    def __init__(self, path, capacity=None, error_rate=None):
+        self.path = path
+        if not os.path.exists(path):
+            bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+            bits = (bits + 7) // 8 * 8
+            hash_count = max(1, round(bits / capacity * math.log(2)))
+            with open(path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, bits, capacity, hash_count, 0))
+                f.truncate(HEADER.size + bits // 8)
+
+        self._file = open(path, 'r+b')
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        magic, self.bits, self.capacity, self.hash_count, self.count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a seen-filter file: {path}")
+
+    @property
+    def full(self):
+        return self.count >= self.capacity
+
+    def _positions(self, h1, h2):
+        bits = self.bits
+        return [(h1 + i * h2) % bits for i in range(self.hash_count)]
+
+    def contains(self, h1, h2):
+        mm = self._mm
+        offset = HEADER.size
+        return all(mm[offset + (pos >> 3)] & (1 << (pos & 7)) for pos in self._positions(h1, h2))
+
+    def add(self, h1, h2):
+        mm = self._mm
+        offset = HEADER.size
+        for pos in self._positions(h1, h2):
+            mm[offset + (pos >> 3)] |= 1 << (pos & 7)
+        self.count += 1
+        struct.pack_into('<Q', mm, COUNT_OFFSET, self.count)
+
+    def flush(self):
+        self._mm.flush()
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+class SeenFilter:
+    """Time-rotated scalable Bloom filter stored in a directory of slice files"""
+
+    def __init__(self, directory, error_rate=0.001, initial_capacity=20000, window_days=30, generations=6):
+        self.directory = directory
+        self.error_rate = error_rate
+        self.initial_capacity = initial_capacity
+        self.window = window_days * 86400
+        self.max_generations = generations
+        os.makedirs(directory, exist_ok=True)
+        # [(开始时间, [BloomSlice, ...])]，按时间从旧到新
+        self.generations = self._open_generations()
+        self.is_new = not self.generations
+        self._rotate(time.time())
+
+    @classmethod
+    def from_config(cls, config, directory):
+        """Build from the "seen_filter" section of ScrapingConfig (None when disabled)"""
+        settings = config.get_seen_filter_settings()
+        if not settings.get('enabled', True):
+            return None
+        return cls(
+            directory,
+            error_rate=settings.get('error_rate', 0.001),
+            initial_capacity=settings.get('initial_capacity', 20000),
+            window_days=settings.get('window_days', 30),
+            generations=settings.get('generations', 6)
+        )
+
+    def _open_generations(self):
+        slices = {}
+        for name in os.listdir(self.directory):
+            match = SLICE_PATTERN.match(name)
+            if match:
+                start, index = int(match.group(1)), int(match.group(2))
+                slices.setdefault(start, []).append((index, name))
+
+        generations = []
+        for start in sorted(slices):
+            opened = []
+            for _, name in sorted(slices[start]):
+                try:
+                    opened.append(BloomSlice(os.path.join(self.directory, name)))
+                except (OSError, ValueError) as e:
+                    logger.error(f"Failed to open seen filter {name}: {e}")
+            if opened:
+                generations.append((start, opened))
+        return generations
+
+    def _slice_path(self, start, index):
+        return os.path.join(self.directory, f"gen-{start}-{index}.bloom")
+
+    def _new_slice(self, start, index):
+        # 每代的预算 p = error_rate / generations；第 i 个分片：容量 initial * 2^i，
+        # 误判率 p * (1 - r) * r^i，各分片之和不超过 p
+        capacity = self.initial_capacity * GROWTH ** index
+        error_rate = self.error_rate / self.max_generations * (1 - TIGHTENING) * TIGHTENING ** index
+        return BloomSlice(self._slice_path(start, index), capacity, error_rate)
+
+    def _rotate(self, now):
+        """Start a new generation when the current one is older than the window; drop expired ones"""
+        if not self.generations or now - self.generations[-1][0] >= self.window:
+            start = int(now)
+            if self.generations:
+                # 文件名以开始时间区分，保证各代不重名
+                start = max(start, self.generations[-1][0] + 1)
+            self.generations.append((start, [self._new_slice(start, 0)]))
+
+        while len(self.generations) > self.max_generations:
+            start, slices = self.generations.pop(0)
+            for bloom in slices:
+                bloom.close()
+                os.remove(bloom.path)
+            logger.info(f"Dropped expired seen-filter generation from {time.strftime('%Y-%m-%d', time.localtime(start))}")
+
+    def contains(self, key):
+        h1, h2 = _hashes(key)
+        return any(bloom.contains(h1, h2) for _, slices in self.generations for bloom in slices)
+
+    def contains_any(self, keys):
+        return any(self.contains(key) for key in keys)
+
+    def add(self, key):
+        """Add a key to the current generation (keys already present anywhere are skipped)"""
+        h1, h2 = _hashes(key)
+        if any(bloom.contains(h1, h2) for _, slices in self.generations for bloom in slices):
+            return
+        self._rotate(time.time())
+        start, slices = self.generations[-1]
+        if slices[-1].full:
+            slices.append(self._new_slice(start, len(slices)))
+        slices[-1].add(h1, h2)
+
+    def flush(self):
+        for _, slices in self.generations:
+            for bloom in slices:
+                bloom.flush()
+
+    def close(self):
+        for _, slices in self.generations:
+            for bloom in slices:
+                bloom.close()
+        self.generations = []
+
+    def estimated_error_rate(self):
+        """False-positive rate of one lookup at the current fill, across all generations"""
+        miss = 1.0
+        for _, slices in self.generations:
+            for bloom in slices:
+                miss *= 1 - (1 - math.exp(-bloom.hash_count * bloom.count / bloom.bits)) ** bloom.hash_count
+        return 1 - miss
+
+    def get_summary(self):
+        count = sum(bloom.count for _, slices in self.generations for bloom in slices)
+        size = sum(os.path.getsize(bloom.path) for _, slices in self.generations for bloom in slices)
+        return (
+            f"Seen filter: {count} keys in {len(self.generations)} generations, {size / 1024:.0f}KB, "
+            f"est. false-positive rate {self.estimated_error_rate():.2e}"
+        )
@@ -0,0 +1,235 @@
+"""
+Subscriber registry
+
+一次抓取推送到多个聊天，每个聊天有自己的关键词、历史和相似标题窗口：
+- 默认订阅者：TELEGRAM_CHAT_ID + config/frequency_words.txt，数据在 data/（与单聊天时完全相同）
+- 其他订阅者在 config/subscribers.json 中配置，数据在 data/subscribers/<name>/
+- 所有订阅者的关键词组编译进同一个 KeywordMatcher，每条标题只扫描一遍，
+  得到命中的订阅者集合；没有配置关键词的订阅者接收全部条目
+- 抓取、URL 规范化只做一次，成本不随订阅者数量增长
+
+config/subscribers.json 示例：
+    {"subscribers": [
+        {"name": "tech", "chat_id_env": "TELEGRAM_CHAT_ID_TECH", "keywords": ["AI 芯片 !广告", "+苹果 +发布"]},
+        {"name": "finance", "chat_id": "-1001234567890", "keywords_file": "config/finance_words.txt"}
+    ]}
+"""
+import json
+import os
+import re
+import time
+import logging
+
+from history import HistoryManager
+from keyword_matcher import KeywordMatcher, parse_keyword_line
+from near_dup import NearDuplicateIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUBSCRIBER = 'default'
+
+# 订阅者名用作 data/subscribers/ 下的目录名
+NAME_PATTERN = re.compile(r'^[\w-]+$')
+
+
+class Subscriber:
+    """One chat with its own keyword profile, history and near-duplicate window"""
+
+    __slots__ = ('name', 'chat_id', 'keyword_groups', 'data_dir', 'history', 'near_dup')
+
+    def __init__(self, name, chat_id, keyword_groups, data_dir):
+        self.name = name
+        self.chat_id = str(chat_id) if chat_id else None
+        # None：不过滤，接收全部条目
+        self.keyword_groups = keyword_groups
+        self.data_dir = data_dir
+        self.history = None
+        self.near_dup = None
+
+    def __repr__(self):
+        return f"Subscriber({self.name!r}, {self.chat_id!r})"
+
+
+class SubscriberRegistry:
+    """All subscribers of a run and the keyword matcher they share"""
+
+    def __init__(self, subscribers):
+        self.subscribers = subscribers
+        self._matcher = None
+        # 合并后的关键词组编号 -> 订阅者下标
+        self._owners = []
+        self._matcher_key = None
+
+    @classmethod
+    def load(cls, registry_file, data_dir, default_chat_id=None, project_root=None):
+        """
+        Default subscriber (if default_chat_id is set, or nothing else is
+        configured) plus the subscribers listed in registry_file
+
+        Each chat belongs to one subscriber: entries whose chat id (or name)
+        is already taken, including by TELEGRAM_CHAT_ID, are skipped.
+        """
+        subscribers = []
+        # 一个聊天只能属于一个订阅者，否则送达记录会写错历史、同一条目会重复推送
+        chats = {str(default_chat_id)} if default_chat_id else set()
+        names = set()
+        entries = []
+        if registry_file and os.path.exists(registry_file):
+            try:
+                with open(registry_file, 'r', encoding='utf-8') as f:
+                    entries = json.load(f).get('subscribers', [])
+            except Exception as e:
+                logger.error(f"Failed to load subscribers from {registry_file}: {e}")
+
+        for entry in entries:
+            name = entry.get('name', '')
+            if not NAME_PATTERN.match(name) or name == DEFAULT_SUBSCRIBER:
+                logger.warning(f"Skipping subscriber with invalid name {name!r}")
+                continue
+            chat_id = entry.get('chat_id') or os.getenv(entry.get('chat_id_env', '') or '_')
+            if not chat_id:
+                logger.warning(f"Subscriber {name} has no chat id, skipping")
+                continue
+            if name in names or str(chat_id) in chats:
+                logger.error(f"Subscriber {name} duplicates the name or chat of another subscriber, skipping")
+                continue
+            names.add(name)
+            chats.add(str(chat_id))
+            groups = cls._keyword_groups(entry, project_root)
+            subscribers.append(Subscriber(name, chat_id, groups, os.path.join(data_dir, 'subscribers', name)))
+
+        if default_chat_id or not subscribers:
+            # 默认订阅者的关键词来自 KeywordSet（frequency_words.txt），在 route() 时传入
+            subscribers.insert(0, Subscriber(DEFAULT_SUBSCRIBER, default_chat_id, None, data_dir))
+
+        if len(subscribers) > 1:
+            logger.info(f"Loaded {len(subscribers)} subscribers: {', '.join(s.name for s in subscribers)}")
+        return cls(subscribers)
+
+    @staticmethod
+    def _keyword_groups(entry, project_root):
+        lines = list(entry.get('keywords', []))
+        keywords_file = entry.get('keywords_file')
+        if keywords_file:
+            path = keywords_file if os.path.isabs(keywords_file) else os.path.join(project_root or '.', keywords_file)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    lines.extend(f)
+            except OSError as e:
+                logger.error(f"Failed to read keywords for {entry.get('name')}: {e}")
+        groups = [group for group in map(parse_keyword_line, lines) if group]
+        return groups or None
+
+    @property
+    def default(self):
+        first = self.subscribers[0] if self.subscribers else None
+        return first if first and first.name == DEFAULT_SUBSCRIBER else None
+
+    def chat_ids(self):
+        return [subscriber.chat_id for subscriber in self.subscribers if subscriber.chat_id]
+
+    @property
+    def matcher(self):
+        """The shared matcher of the last multi-subscriber route() (None otherwise)"""
+        return self._matcher
+
+    def by_chat(self, chat_id):
+        chat_id = str(chat_id)
+        return next((subscriber for subscriber in self.subscribers if subscriber.chat_id == chat_id), None)
+
+    def open(self, config, default_history, default_near_dup):
+        """Attach history and near-duplicate windows (the default subscriber reuses the run's own)"""
+        for subscriber in self.subscribers:
+            if subscriber.name == DEFAULT_SUBSCRIBER:
+                subscriber.history, subscriber.near_dup = default_history, default_near_dup
+            else:
+                subscriber.history = HistoryManager.from_config(config, subscriber.data_dir)
+                subscriber.near_dup = NearDuplicateIndex.from_config(
+                    config, os.path.join(subscriber.data_dir, 'near_dup.json')
+                )
+
+    def close(self):
+        """Close per-subscriber stores (the default subscriber's are closed by the caller)"""
+        for subscriber in self.subscribers:
+            if subscriber.name == DEFAULT_SUBSCRIBER:
+                continue
+            if subscriber.history:
+                subscriber.history.close()
+            if subscriber.near_dup:
+                subscriber.near_dup.save()
+
+    def _shared_matcher(self, default_matcher):
+        """One matcher over every subscriber's groups, rebuilt only when a profile changes"""
+        key = (id(default_matcher), tuple(id(s.keyword_groups) for s in self.subscribers))
+        if self._matcher is not None and key == self._matcher_key:
+            return self._matcher
+
+        groups, owners = [], []
+        for index, subscriber in enumerate(self.subscribers):
+            subscriber_groups = default_matcher.keyword_groups if (
+                subscriber.name == DEFAULT_SUBSCRIBER and default_matcher
+            ) else subscriber.keyword_groups
+            for group in subscriber_groups or []:
+                groups.append(group)
+                owners.append(index)
+        self._matcher = KeywordMatcher(groups) if groups else None
+        self._owners = owners
+        self._matcher_key = key
+        return self._matcher
+
+    def route(self, trends, default_matcher=None):
+        """
+        Split fetched trends per subscriber with a single match pass per title
+
+        default_matcher is the compiled frequency_words.txt (None: the default
+        subscriber receives everything). Returns {subscriber: trends}.
+        """
+        # 只有默认订阅者时直接用它的匹配器，保持原有行为和统计
+        if len(self.subscribers) == 1 and self.default:
+            filtered = default_matcher.filter(trends) if default_matcher else trends
+            return {self.default: filtered}
+
+        unfiltered = [
+            index for index, subscriber in enumerate(self.subscribers)
+            if not (default_matcher if subscriber.name == DEFAULT_SUBSCRIBER else subscriber.keyword_groups)
+        ]
+        matcher = self._shared_matcher(default_matcher)
+        if matcher:
+            # 共享匹配器的统计只算本次运行（写入 metrics）
+            matcher.reset_stats()
+        start = time.perf_counter()
+        routed = {subscriber: {} for subscriber in self.subscribers}
+        for platform, items in trends.items():
+            for item in items:
+                owners = matcher.match_owners(item['title'], self._owners) if matcher else set()
+                owners.update(unfiltered)
+                for index in owners:
+                    # 每个订阅者一份浅拷贝：相似标题合并会写入 item['platforms']
+                    routed[self.subscribers[index]].setdefault(platform, []).append(dict(item))
+        if matcher:
+            matcher.eval_seconds += time.perf_counter() - start
+            if default_matcher and self.default:
+                self._fold_default_stats(matcher, default_matcher)
+        return routed
+
+    def _fold_default_stats(self, matcher, default_matcher):
+        """
+        Credit the default subscriber's share of the shared pass to its own
+        matcher, so KeywordSet keeps per-group stats for frequency_words.txt
+        """
+        default_index = self.subscribers.index(self.default)
+        local = 0
+        for group_index, owner in enumerate(self._owners):
+            if owner != default_index:
+                continue
+            default_matcher.checks[local] += matcher.checks[group_index]
+            default_matcher.hits[local] += matcher.hits[group_index]
+            local += 1
+        default_matcher.titles += matcher.titles
+        default_matcher.eval_seconds += matcher.eval_seconds
+
+    def get_summary(self, routed):
+        return "Subscribers: " + ", ".join(
+            f"{subscriber.name} {sum(len(items) for items in trends.values())}"
+            for subscriber, trends in routed.items()
+        )
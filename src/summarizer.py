@@ -1,7 +1,9 @@
-from datetime import datetime, timedelta
+import time
 from collections import Counter
 import logging
 
+from formatting import MARKDOWN, italic, render_entries
+
 logger = logging.getLogger(__name__)
 
 class DailySummarizer:
@@ -27,7 +29,7 @@ class DailySummarizer:
         title_data = {}  # Store first occurrence data for each title
         
         for trend in trends:
-            title = trend['title']
+            title = trend.title
             # Simple normalization: lowercase and strip
             normalized_title = title.lower().strip()
             
@@ -38,29 +40,25 @@ class DailySummarizer:
 
         # Calculate scores based on frequency and recency
         scored_trends = []
-        now = datetime.now()
+        now = time.time()
         
         for normalized_title, count in title_counter.items():
             trend = title_data[normalized_title]
             
             # Calculate recency score (newer = higher score)
-            try:
-                timestamp = datetime.fromisoformat(trend['timestamp'])
-                hours_old = (now - timestamp).total_seconds() / 3600
-                recency_score = max(0, 1 - (hours_old / 24))  # 0-1 score
-            except Exception:
-                recency_score = 0.5  # Default mid-range score
+            hours_old = (now - trend.ts) / 3600
+            recency_score = max(0, 1 - (hours_old / 24))  # 0-1 score
             
             # Combined score: frequency (70%) + recency (30%)
             score = (count * 0.7) + (recency_score * 0.3)
             
             scored_trends.append({
-                'title': trend['title'],  # Original title
-                'url': trend['url'],
-                'platform': trend['platform'],
+                'title': trend.title,  # Original title
+                'url': trend.url,
+                'platform': trend.platform or 'unknown',
                 'count': count,
                 'score': score,
-                'timestamp': trend['timestamp']
+                'timestamp': trend.timestamp
             })
 
         # Sort by score descending
@@ -76,32 +74,18 @@ class DailySummarizer:
         logger.info(f"Generated summary with {len(ranked_trends)} top trends")
         return ranked_trends
 
-    def format_daily_message(self, summary, hours=24):
-        """Format the daily summary for Telegram"""
-        from datetime import datetime
-        
+    def format_daily_message(self, summary, hours=24, mode=MARKDOWN):
+        """Format the daily summary for Telegram (Markdown by default; see formatting for other modes)"""
         if not summary:
             return "暂无热点信息"
         
-        message = f"_过去{hours}小时的热门话题 Top {len(summary)}_\n\n"
-        
-        for i, trend in enumerate(summary, 1):
-            title = trend['title']
-            url = trend['url']
-            count = trend['count']
-            
-            # Escape special characters for Markdown
-            title = title.replace('\\', '\\\\')
-            title = title.replace('[', '\\[')
-            title = title.replace(']', '\\]')
-            title = title.replace('(', '\\(')
-            title = title.replace(')', '\\)')
-            
-            # Add frequency indicator if appeared multiple times
-            freq_indicator = f" 🔥×{count}" if count > 1 else ""
-            
-            message += f"{i}. [{title}]({url}){freq_indicator}\n"
-        
-        message += f"\n_数据来源: TrendMonitor 多平台聚合_"
-        
-        return message
+        # Add frequency indicator if appeared multiple times
+        entries = [
+            (trend['title'], trend['url'], f" 🔥×{trend['count']}" if trend['count'] > 1 else "")
+            for trend in summary
+        ]
+        return "".join([
+            italic(f"过去{hours}小时的热门话题 Top {len(summary)}", mode), "\n\n",
+            render_entries(entries, mode, separator="\n"), "\n\n",
+            italic("数据来源: TrendMonitor 多平台聚合", mode)
+        ])
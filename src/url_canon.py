@@ -0,0 +1,217 @@
+"""
+URL canonicalization
+
+同一篇文章经由不同镜像、聚合节点和直连源抓到时，URL 往往只差追踪参数、
+http/https、末尾斜杠或主机名。抓取结果在入口处计算规范形式，存入
+item['canonical_url']，之后的去重（filter_new_items、HistoryManager、Outbox）
+都以它为键；推送和写入历史的链接 item['url'] 只去掉追踪参数，其余保持原样。
+规范形式（只用作去重键，不一定能访问）：
+- 解包已知跳转链接（link.zhihu.com/?target=... 等）
+- 去掉追踪参数（utm_*、spm、from 等，支持通配符），其余参数排序
+- 主机名小写、去掉 www. 和默认端口，按别名表归一（含 RSSHub 镜像）
+- 统一为 https，去掉末尾斜杠；fragment 只保留路由形式（#/...、#!...）
+"""
+import fnmatch
+import logging
+from urllib.parse import parse_qsl, quote, unquote, unquote_plus, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+DEFAULT_RULES = {
+    'strip_params': [
+        'utm_*', 'spm', 'spm_id_from', 'from', 'from_source', 'share_source', 'share_medium',
+        'share_from', 'vd_source', 'fbclid', 'gclid', 'mc_cid', 'mc_eid'
+    ],
+    'strip_www': True,
+    'force_https': True,
+    'host_aliases': {
+        'm.bilibili.com': 'bilibili.com',
+        'mobile.twitter.com': 'twitter.com'
+    },
+    # "host/path 前缀" -> 保存真实地址的查询参数
+    'redirectors': {
+        'link.zhihu.com/': 'target',
+        'link.juejin.cn/': 'target',
+        'sspai.com/link': 'target',
+        'weibo.cn/sinaurl': 'u',
+        'google.com/url': 'q'
+    }
+}
+
+# 跳转链接最多解包几层
+MAX_UNWRAP = 3
+
+# 单页应用的路由 fragment（#/article/123、#!/post/1），不同路由是不同页面
+ROUTE_FRAGMENT_PREFIXES = ('/', '!')
+
+
+class UrlCanonicalizer:
+    """Rewrite URLs to a canonical form according to configurable rules"""
+
+    def __init__(self, strip_params=(), strip_www=True, force_https=True, host_aliases=None, redirectors=None):
+        self.exact_params = {p.lower() for p in strip_params if not any(c in p for c in '*?[')}
+        self.param_patterns = [p.lower() for p in strip_params if any(c in p for c in '*?[')]
+        self.strip_www = strip_www
+        self.force_https = force_https
+        self.host_aliases = {host.lower(): alias.lower() for host, alias in (host_aliases or {}).items()}
+        self.redirectors = {prefix.lower(): param for prefix, param in (redirectors or {}).items()}
+        self._cache = {}
+
+    @classmethod
+    def from_config(cls, config):
+        """Build from the "url_canonicalization" section of ScrapingConfig"""
+        rules = config.get_url_canonicalization_rules()
+        return cls(
+            strip_params=rules.get('strip_params', DEFAULT_RULES['strip_params']),
+            strip_www=rules.get('strip_www', True),
+            force_https=rules.get('force_https', True),
+            host_aliases=rules.get('host_aliases', DEFAULT_RULES['host_aliases']),
+            redirectors=rules.get('redirectors', DEFAULT_RULES['redirectors'])
+        )
+
+    def add_host_aliases(self, urls, canonical_url):
+        """Map the hosts of `urls` (e.g. RSSHub mirrors) onto the host of `canonical_url`"""
+        canonical = self._host(urlsplit(canonical_url))
+        for url in urls:
+            host = self._host(urlsplit(url))
+            if host != canonical:
+                self.host_aliases[host] = canonical
+        self._cache.clear()
+
+    def _host(self, parts):
+        netloc = parts.netloc.lower()
+        if '@' in netloc:
+            netloc = netloc.rsplit('@', 1)[1]
+        host, _, port = netloc.rpartition(':')
+        if host and not host.endswith(']') and DEFAULT_PORTS.get(parts.scheme.lower()) == port:
+            netloc = host
+        if self.strip_www and netloc.startswith('www.'):
+            netloc = netloc[4:]
+        return self.host_aliases.get(netloc, netloc)
+
+    def _is_tracking(self, name):
+        name = name.lower()
+        return name in self.exact_params or any(fnmatch.fnmatchcase(name, p) for p in self.param_patterns)
+
+    def _unwrap(self, url):
+        """Follow known redirector links to the target URL they carry"""
+        for _ in range(MAX_UNWRAP):
+            parts = urlsplit(url)
+            netloc = parts.netloc.lower()
+            if netloc.startswith('www.'):
+                netloc = netloc[4:]
+            location = netloc + (parts.path or '/')
+            param = next(
+                (param for prefix, param in self.redirectors.items() if location.startswith(prefix)), None
+            )
+            if param is None:
+                return url
+            target = dict(parse_qsl(parts.query)).get(param)
+            if not target:
+                return url
+            target = unquote(target) if '://' not in target else target
+            if not target.startswith(('http://', 'https://')):
+                return url
+            url = target
+        return url
+
+    def strip_tracking(self, url):
+        """
+        `url` with tracking parameters removed and nothing else changed
+
+        Scheme, host, path, fragment and the encoding and order of the
+        remaining parameters are kept, so the link still opens as delivered.
+        """
+        try:
+            parts = urlsplit(url)
+        except ValueError:
+            return url
+        if not parts.query or parts.scheme.lower() not in ('http', 'https'):
+            return url
+        params = parts.query.split('&')
+        kept = [param for param in params if not self._is_tracking(unquote_plus(param.split('=', 1)[0]))]
+        if len(kept) == len(params):
+            return url
+        return urlunsplit(parts._replace(query='&'.join(kept)))
+
+    def canonicalize(self, url):
+        """Canonical form of `url`; non-HTTP or unparseable URLs are returned unchanged"""
+        cached = self._cache.get(url)
+        if cached is not None:
+            return cached
+
+        result = url
+        try:
+            parts = urlsplit(self._unwrap(url.strip()))
+            scheme = parts.scheme.lower()
+            if scheme in ('http', 'https'):
+                if self.force_https:
+                    scheme = 'https'
+                query = ''
+                if parts.query:
+                    params = [
+                        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                        if not self._is_tracking(name)
+                    ]
+                    query = urlencode(sorted(params), quote_via=quote)
+                fragment = parts.fragment if parts.fragment.startswith(ROUTE_FRAGMENT_PREFIXES) else ''
+                result = urlunsplit((scheme, self._host(parts), parts.path.rstrip('/'), query, fragment))
+        except ValueError:
+            pass
+
+        if len(self._cache) < 100000:
+            self._cache[url] = result
+        return result
+
+
+_default_canonicalizer = None
+
+
+def canonicalize_url(url):
+    """Canonicalize with the default rules (used for history index keys)"""
+    global _default_canonicalizer
+    if _default_canonicalizer is None:
+        _default_canonicalizer = UrlCanonicalizer(**DEFAULT_RULES)
+    return _default_canonicalizer.canonicalize(url)
+
+
+def canonicalize_trends(trends, canonicalizer):
+    """
+    Set item['canonical_url'] on every item (in place), strip tracking
+    parameters from item['url'] and drop items whose canonical URL was
+    already seen earlier in the same run
+
+    Returns:
+        (trends, stats): stats has 'rewritten' (canonical URL differs from
+        the delivered one), 'duplicates' (items dropped) and 'rewritten_urls'
+        (set of canonical URLs that differ from what the feed delivered)
+    """
+    seen = set()
+    rewritten_urls = set()
+    rewritten = 0
+    duplicates = 0
+    result = {}
+    for platform, items in trends.items():
+        kept = []
+        for item in items:
+            url = item.get('url')
+            if url:
+                canonical = canonicalizer.canonicalize(url)
+                item['url'] = canonicalizer.strip_tracking(url)
+                item['canonical_url'] = canonical
+                if canonical != url:
+                    rewritten += 1
+                    rewritten_urls.add(canonical)
+                if canonical in seen:
+                    duplicates += 1
+                    continue
+                seen.add(canonical)
+            kept.append(item)
+        if kept:
+            result[platform] = kept
+
+    if duplicates:
+        logger.info(f"URL canonicalization dropped {duplicates} duplicate items")
+    return result, {'rewritten': rewritten, 'duplicates': duplicates, 'rewritten_urls': rewritten_urls}
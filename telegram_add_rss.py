@@ -15,12 +15,15 @@ Telegram Bot - 一键添加 RSS 源到 TrendMonitor（全自动版）
 """
 
 import os
+import sys
 import re
-import requests
 import time
 import logging
 import subprocess
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from http_client import get_client
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -39,7 +42,7 @@ def get_updates(offset=None):
         params['offset'] = offset
     
     try:
-        resp = requests.get(url, params=params, timeout=35)
+        resp = get_client().get(url, params=params, timeout=35)
         return resp.json().get('result', [])
     except Exception as e:
         logger.error(f"获取更新失败: {e}")
@@ -49,11 +52,11 @@ def send_message(chat_id, text):
     """发送消息"""
     url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
     try:
-        requests.post(url, json={
+        get_client().post(url, json={
             'chat_id': chat_id,
             'text': text,
             'parse_mode': 'Markdown'
-        })
+        }, timeout=10)
     except Exception as e:
         logger.error(f"发送消息失败: {e}")
 
@@ -160,7 +163,7 @@ def git_commit_and_push(name):
 def validate_rss(url):
     """验证 RSS 是否可用"""
     try:
-        resp = requests.get(url, timeout=10, headers={
+        resp = get_client().get(url, timeout=10, headers={
             'User-Agent': 'Mozilla/5.0'
         })
         if resp.status_code == 200:
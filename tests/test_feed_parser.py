@@ -0,0 +1,52 @@
+from feed_parser import FeedStreamParser
+
+RSS_WITH_ATOM_LINKS = b"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
+<channel><title>c</title>
+<item>
+  <title>Self link first</title>
+  <atom:link rel="self" href="https://example.com/feed.xml"/>
+  <link>https://example.com/article/1</link>
+</item>
+<item>
+  <title>Enclosure and related links first</title>
+  <atom:link rel="enclosure" href="https://example.com/audio.mp3"/>
+  <atom:link rel="related" href="https://example.com/related"/>
+  <link>https://example.com/article/2</link>
+</item>
+<item>
+  <title>Only a self link</title>
+  <atom:link rel="self" href="https://example.com/feed.xml"/>
+  <guid>https://example.com/article/3</guid>
+</item>
+</channel></rss>
+"""
+
+
+def parse(data):
+    parser = FeedStreamParser(limit=10)
+    parser.feed(data)
+    return parser.finish()
+
+
+def test_text_link_wins_over_self_enclosure_and_related_links():
+    urls = [item['url'] for item in parse(RSS_WITH_ATOM_LINKS)]
+    assert urls == [
+        'https://example.com/article/1',
+        'https://example.com/article/2',
+        'https://example.com/article/3',
+    ]
+
+
+def test_atom_alternate_link_is_used():
+    data = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>f</title>
+<entry>
+  <title>Entry</title>
+  <link rel="self" href="https://example.com/entry.atom"/>
+  <link href="https://example.com/entry"/>
+  <id>tag:example.com,2024:1</id>
+</entry>
+</feed>
+"""
+    assert parse(data)[0]['url'] == 'https://example.com/entry'
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+from main import low_success_rate, record_fetch_results
+from metrics_tracker import MetricsTracker
+
+
+def make_fetcher(**outcomes):
+    fields = {'not_modified_feeds': [], 'not_due_feeds': [], 'failed_feeds': {}, 'skipped_feeds': [], 'cut_off_feeds': []}
+    fields.update(outcomes)
+    return SimpleNamespace(**fields)
+
+
+def test_not_modified_feeds_count_as_successes(tmp_path):
+    metrics = MetricsTracker(str(tmp_path / 'metrics.json'))
+    fetcher = make_fetcher(not_modified_feeds=['a', 'b', 'c'])
+
+    record_fetch_results(fetcher, {}, metrics)
+
+    run = metrics.current_run
+    assert run['total_platforms'] == 3
+    assert run['success_count'] == 3
+    assert run['total_items'] == 0
+    assert run['platforms']['a']['status'] == 'success'
+
+
+def test_mixed_run_includes_not_modified_feeds(tmp_path):
+    metrics = MetricsTracker(str(tmp_path / 'metrics.json'))
+    fetcher = make_fetcher(not_modified_feeds=['b'], failed_feeds={'c': 'timeout'})
+
+    record_fetch_results(fetcher, {'a': [{'title': 't', 'url': 'https://example.com/1'}]}, metrics)
+
+    run = metrics.current_run
+    assert run['total_platforms'] == 3
+    assert run['success_count'] == 2
+    assert run['failed_platforms'] == ['c']
+
+
+def test_idle_run_with_no_feed_due_does_not_alert(tmp_path):
+    metrics = MetricsTracker(str(tmp_path / 'metrics.json'))
+    fetcher = make_fetcher(not_due_feeds=['a', 'b', 'c'])
+
+    record_fetch_results(fetcher, {}, metrics)
+
+    assert metrics.current_run['total_platforms'] == 0
+    assert metrics.current_run['not_due'] == ['a', 'b', 'c']
+    assert low_success_rate(metrics, 0.7) is None
+
+
+def test_success_rate_counts_only_polled_feeds(tmp_path):
+    metrics = MetricsTracker(str(tmp_path / 'metrics.json'))
+    fetcher = make_fetcher(not_due_feeds=['b', 'c', 'd'], failed_feeds={'e': 'timeout'})
+
+    record_fetch_results(fetcher, {'a': [{'title': 't', 'url': 'https://example.com/1'}]}, metrics)
+
+    # 1 / 2 实际抓取的源成功；未到期的源不拉低成功率
+    assert low_success_rate(metrics, 0.7) == 0.5
+    assert low_success_rate(metrics, 0.5) is None
@@ -0,0 +1,26 @@
+from near_dup import NearDuplicateIndex
+
+
+def test_titles_differing_only_in_numbers_stay_distinct():
+    index = NearDuplicateIndex()
+    trends = {
+        'weibo': [{'title': 'A股三大指数收盘集体上涨3%', 'url': 'https://weibo.example/1'}],
+        'baidu': [
+            {'title': 'A股三大指数收盘集体上涨5%', 'url': 'https://baidu.example/1'},
+            {'title': 'A股三大指数收盘集体上涨3%！', 'url': 'https://baidu.example/2'},
+        ],
+    }
+
+    result = index.fold(trends, use_window=False)
+
+    assert [item['url'] for item in result['weibo']] == ['https://weibo.example/1']
+    assert result['weibo'][0]['platforms'] == ['weibo', 'baidu']
+    assert [item['url'] for item in result['baidu']] == ['https://baidu.example/1']
+
+
+def test_window_ignores_titles_with_other_numbers():
+    index = NearDuplicateIndex()
+    index.add({'title': '央行宣布下调存款准备金率0.5个百分点'}, 'weibo')
+
+    assert index.contains('央行宣布下调存款准备金率0.5个百分点')
+    assert not index.contains('央行宣布下调存款准备金率1个百分点')
@@ -0,0 +1,19 @@
+import shutil
+
+from outbox import Outbox
+
+
+def test_queued_messages_survive_in_the_db_file_alone(tmp_path):
+    """The workflow commits only outbox.db: a run killed before close must not lose queued rows"""
+    outbox = Outbox(str(tmp_path / 'outbox.db'))
+    outbox.enqueue('1', ['message'], [('p', {'title': 't', 'url': 'https://example.com/1'})])
+
+    # 不关闭连接（模拟运行被终止），只复制 .db 文件
+    committed = tmp_path / 'committed'
+    committed.mkdir()
+    shutil.copy(tmp_path / 'outbox.db', committed / 'outbox.db')
+
+    restored = Outbox(str(committed / 'outbox.db'))
+    assert [message.parts for message in restored.due()] == [['message']]
+    restored.close()
+    outbox.close()